@@ -12,8 +12,6 @@ class CustomUserAdmin(UserAdmin):
         "is_active",
         "is_staff",
         "has_logged_in",
-        "brownie_point_credit",
-        "brownie_point_debit",
     )
     list_filter = ("email", "username", "is_active", "is_staff")
     search_fields = ("email", "username")
@@ -36,13 +34,7 @@ class CustomUserAdmin(UserAdmin):
         ("Dates", {"fields": ("last_login", "date_joined")}),
         (
             "Additional Info",
-            {
-                "fields": (
-                    "brownie_point_credit",
-                    "brownie_point_debit",
-                    "has_logged_in",
-                )
-            },
+            {"fields": ("has_logged_in",)},
         ),
     )
     add_fieldsets = (
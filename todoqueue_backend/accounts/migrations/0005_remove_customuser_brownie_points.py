@@ -0,0 +1,22 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0004_customuser_has_logged_in"),
+        # Balances now live in tasks.BrowniePointBalance, and are copied there first
+        ("tasks", "0011_brownie_point_balance"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="customuser",
+            name="brownie_point_credit",
+        ),
+        migrations.RemoveField(
+            model_name="customuser",
+            name="brownie_point_debit",
+        ),
+    ]
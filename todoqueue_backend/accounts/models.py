@@ -7,9 +7,10 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 
-from profanity_check import predict as is_profane
 from logging import getLogger
 
+from todoqueue_backend.profanity import is_profane
+
 logger = getLogger(__name__)
 
 
@@ -32,7 +33,7 @@ class CustomUserManager(BaseUserManager):
 
 
 def validate_profanity(value):
-    if is_profane([value])[0] == 1:
+    if is_profane(value):
         raise ValidationError("Profanity is not allowed")
 
 
@@ -45,9 +46,6 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     has_logged_in = models.BooleanField(default=False)
 
-    brownie_point_credit = models.JSONField(default=dict)
-    brownie_point_debit = models.JSONField(default=dict)
-
     objects = CustomUserManager()
 
     USERNAME_FIELD = "email"
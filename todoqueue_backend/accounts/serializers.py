@@ -1,20 +1,27 @@
 from django.contrib.auth import get_user_model
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator, ValidationError
 
-from profanity_check import predict as is_profane
 from logging import getLogger
 
+from todoqueue_backend.profanity import ProfanityBatchMixin, is_profane
+
 logger = getLogger(__name__)
 
 
 def validate_profanity(value):
     logger.info("Validating profanity")
-    if is_profane([value])[0] == 1:
+    if is_profane(value):
         raise ValidationError("Profanity is not allowed")
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
+    # Balances are stored per household in their own table, but are presented as they always were:
+    # dicts keyed by household ID
+    brownie_point_credit = serializers.SerializerMethodField()
+    brownie_point_debit = serializers.SerializerMethodField()
+
     class Meta:
         model = get_user_model()
         fields = (
@@ -27,6 +34,24 @@ class CustomUserSerializer(serializers.ModelSerializer):
             "brownie_point_debit",
         )
 
+    def get_balances(self, obj):
+        # Both fields read the same balances, so they're only fetched once. Lists of users should
+        # prefetch brownie_point_balances, which this then uses.
+        prefetch_related_objects([obj], "brownie_point_balances")
+        return obj.brownie_point_balances.all()
+
+    def get_brownie_point_credit(self, obj):
+        return {
+            str(balance.household_id): balance.credit
+            for balance in self.get_balances(obj)
+        }
+
+    def get_brownie_point_debit(self, obj):
+        return {
+            str(balance.household_id): balance.debit
+            for balance in self.get_balances(obj)
+        }
+
 
 class CustomUserWithBrowniePointsSerializer(CustomUserSerializer):
     rolling_brownie_points = serializers.IntegerField(read_only=True, default=0)
@@ -35,7 +60,9 @@ class CustomUserWithBrowniePointsSerializer(CustomUserSerializer):
         fields = CustomUserSerializer.Meta.fields + ("rolling_brownie_points",)
 
 
-class CustomUserRegistrationSerializer(serializers.ModelSerializer):
+class CustomUserRegistrationSerializer(
+    ProfanityBatchMixin, serializers.ModelSerializer
+):
     email = serializers.EmailField(
         validators=[
             UniqueValidator(queryset=get_user_model().objects.all()),
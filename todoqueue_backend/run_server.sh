@@ -27,6 +27,6 @@ if [ -z "$DJANGO_HOST_PORT" ]; then
    export DJANGO_HOST_PORT=8000
 fi
 
-# Start the Django server
+# Start the Django server. This runs under ASGI, so that event streams don't each hold a worker
 echo "Starting the Django server..."
-exec gunicorn todoqueue_backend.wsgi:application --bind 0.0.0.0:$DJANGO_HOST_PORT
+exec gunicorn todoqueue_backend.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$DJANGO_HOST_PORT
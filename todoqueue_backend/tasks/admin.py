@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import FlexibleTask, WorkLog, Household, ScheduledTask, DummyTask
+from .models import (
+    BrowniePointBalance,
+    DummyTask,
+    FlexibleTask,
+    Household,
+    ScheduledTask,
+    WorkLog,
+)
 
 
 class HouseholdAdmin(admin.ModelAdmin):
@@ -41,11 +48,17 @@ class ScheduledTaskAdmin(admin.ModelAdmin):
     list_filter = ("last_completed",)
 
     def next_due(self, obj):
-        return obj.next_due.strftime("%Y-%m-%d %H:%M:%S")
+        return obj.get_due_times()[1].strftime("%Y-%m-%d %H:%M:%S")
 
     next_due.short_description = "Next Due"
 
 
+class BrowniePointBalanceAdmin(admin.ModelAdmin):
+    list_display = ("user", "household", "credit", "debit")
+    search_fields = ("user__email", "household__name")
+    list_filter = ("household",)
+
+
 # Custom admin view for WorkLog model
 class WorkLogAdmin(admin.ModelAdmin):
     list_display = (
@@ -68,3 +81,4 @@ admin.site.register(FlexibleTask, FlexibleTaskAdmin)
 admin.site.register(ScheduledTask, ScheduledTaskAdmin)
 admin.site.register(WorkLog, WorkLogAdmin)
 admin.site.register(Household, HouseholdAdmin)
+admin.site.register(BrowniePointBalance, BrowniePointBalanceAdmin)
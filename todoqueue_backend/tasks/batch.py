@@ -0,0 +1,192 @@
+"""Batches of task changes for one household, e.g. importing a template of chores.
+
+Every operation in a batch is validated before any of them are applied, with all of their text checked
+for profanity in one go. Then the whole batch is applied in one transaction, with a bulk insert and a
+bulk update per task type, rather than a request and a query for each task.
+"""
+
+import uuid
+from collections import defaultdict
+from itertools import chain
+from logging import getLogger
+
+from django.db import transaction
+from django.utils import timezone
+
+from todoqueue_backend import profanity
+
+from .events import publish_household_event
+from .models import (
+    TASK_SERIALIZERS,
+    FlexibleTask,
+    OneShotTask,
+    ScheduledTask,
+    bump_household_version,
+    get_tasks_by_ids,
+    register_tasks,
+)
+from .utils import get_cron_due_times
+
+logger = getLogger(__name__)
+
+# Task types that can be created in a batch, by the same names AllTasksSerializer gives them
+TASK_TYPES = {
+    "flexibletask": FlexibleTask,
+    "scheduledtask": ScheduledTask,
+    "oneshottask": OneShotTask,
+}
+
+OPERATIONS = ("create", "update", "delete")
+
+
+def _parse_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _get_serializer(model, *args, **kwargs):
+    serializer = TASK_SERIALIZERS[model](*args, **kwargs)
+    # Every task in the batch belongs to the household the batch is for
+    serializer.fields.pop("household")
+    return serializer
+
+
+def validate_task_operations(household, operations):
+    """Check a list of task operations for a household. Each is a dict with an "op" of "create" (with a
+    "type" and "data"), "update" (with an "id" and partial "data") or "delete" (with an "id").
+
+    Returns the validated operations, and a list with the errors for each operation (None if it is
+    valid), in the same order as they were given.
+    """
+    operations = [
+        operation if isinstance(operation, dict) else {} for operation in operations
+    ]
+    data = [operation.get("data") for operation in operations]
+    data = [item if isinstance(item, dict) else {} for item in data]
+
+    # Classify all the text in the batch at once, so the validators only hit the cache
+    profanity.prime(chain.from_iterable(item.values() for item in data))
+
+    existing = get_tasks_by_ids(
+        task_id
+        for task_id in (_parse_id(operation.get("id")) for operation in operations)
+        if task_id is not None
+    )
+
+    validated = []
+    errors = []
+    for operation, item in zip(operations, data):
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            errors.append({"op": [f"Must be one of: {', '.join(OPERATIONS)}."]})
+            continue
+
+        if op == "create":
+            model = TASK_TYPES.get(operation.get("type"))
+            if model is None:
+                errors.append({"type": [f"Must be one of: {', '.join(TASK_TYPES)}."]})
+                continue
+            serializer = _get_serializer(model, data=item)
+        else:
+            task = existing.get(_parse_id(operation.get("id")))
+            if (
+                task is None
+                or task.household_id != household.id
+                or type(task) not in TASK_TYPES.values()
+            ):
+                errors.append({"id": ["Task does not exist in this household."]})
+                continue
+            if op == "delete":
+                validated.append((op, task))
+                errors.append(None)
+                continue
+            serializer = _get_serializer(type(task), task, data=item, partial=True)
+
+        if serializer.is_valid():
+            # Unknown and read-only fields are dropped, which can leave nothing to change
+            if op == "update" and not serializer.validated_data:
+                errors.append({"data": ["No fields to update."]})
+                continue
+            validated.append((op, serializer))
+            errors.append(None)
+        else:
+            errors.append(serializer.errors)
+
+    return validated, errors
+
+
+def apply_task_operations(household, operations):
+    """Apply validated task operations in one transaction. Returns the task each operation acted on,
+    in order."""
+    now = timezone.now()
+
+    results = []
+    created = defaultdict(list)
+    updated = defaultdict(dict)
+    update_fields = defaultdict(set)
+    deleted = defaultdict(list)
+    for op, item in operations:
+        if op == "create":
+            task = item.Meta.model(household=household, **item.validated_data)
+            if isinstance(task, ScheduledTask):
+                task.last_due, task.next_due = get_cron_due_times(
+                    task.cron_schedule, now
+                )
+            created[type(task)].append(task)
+        elif op == "update":
+            task = item.instance
+            for field, value in item.validated_data.items():
+                setattr(task, field, value)
+            update_fields[type(task)].update(item.validated_data)
+            if (
+                isinstance(task, ScheduledTask)
+                and "cron_schedule" in item.validated_data
+            ):
+                task.last_due, task.next_due = get_cron_due_times(
+                    task.cron_schedule, now
+                )
+                update_fields[ScheduledTask].update(("last_due", "next_due"))
+            updated[type(task)][task.id] = task
+        else:
+            task = item
+            deleted[type(task)].append(task.id)
+        results.append(task)
+
+    with transaction.atomic():
+        for model, tasks in created.items():
+            model.objects.bulk_create(tasks)
+        # Bulk inserts and updates don't send signals, so do what the receivers would have done
+        register_tasks(chain.from_iterable(created.values()))
+
+        for model, tasks in updated.items():
+            model.objects.bulk_update(tasks.values(), update_fields[model])
+
+        # Deleting goes through the usual signals, which also remove the tasks from the index
+        for model, task_ids in deleted.items():
+            model.objects.filter(pk__in=task_ids).delete()
+
+        bump_household_version(
+            household.id,
+            [
+                task.id
+                for task in chain(
+                    chain.from_iterable(created.values()),
+                    chain.from_iterable(tasks.values() for tasks in updated.values()),
+                )
+            ],
+        )
+        for task in chain.from_iterable(created.values()):
+            publish_household_event(
+                household.id, "task", action="created", id=str(task.id)
+            )
+        for task in chain.from_iterable(tasks.values() for tasks in updated.values()):
+            publish_household_event(
+                household.id, "task", action="updated", id=str(task.id)
+            )
+
+    logger.info(
+        f"Applied {len(operations)} task operations to household {household.id}"
+    )
+    return results
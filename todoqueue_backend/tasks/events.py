@@ -0,0 +1,163 @@
+"""Change events pushed to clients, so they don't have to poll for updates.
+
+Events are published to named channels through a broker. The default broker only delivers events to
+subscribers in the same process, which is fine for a single ASGI worker. With more than one worker, use the
+Redis pub/sub broker so that every worker sees every event. The backend is chosen by the EVENT_BROKER
+setting, in the same way as the CACHES setting.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from logging import getLogger
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = getLogger(__name__)
+
+
+def household_channel(household_id):
+    return f"household-{household_id}"
+
+
+def user_channel(user_id):
+    return f"user-{user_id}"
+
+
+class InProcessSubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def get(self, timeout=None):
+        """Wait for the next event. Returns None if nothing arrives within the timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def deliver(self, event):
+        # Called from whichever thread published the event
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            # The subscriber's event loop has closed
+            self.broker.unsubscribe(self)
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Delivers events to subscribers in this process only."""
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    async def subscribe(self, channels):
+        subscription = InProcessSubscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout=None):
+        """Wait for the next event. Returns None if nothing arrives within the timeout."""
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+    async def close(self):
+        await self.pubsub.unsubscribe()
+        await self.pubsub.aclose()
+
+
+class RedisBroker:
+    """Delivers events to subscribers in every process, through Redis pub/sub."""
+
+    def __init__(self, LOCATION, **options):
+        import redis
+        import redis.asyncio
+
+        self.location = LOCATION
+        self._client = redis.Redis.from_url(LOCATION)
+        self._async_client = None
+        self._redis_asyncio = redis.asyncio
+
+    def publish(self, channel, event):
+        self._client.publish(channel, json.dumps(event))
+
+    async def subscribe(self, channels):
+        if self._async_client is None:
+            self._async_client = self._redis_asyncio.Redis.from_url(self.location)
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(*channels)
+        return RedisSubscription(pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Returns the broker configured by the EVENT_BROKER setting, creating it on first use."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            options = dict(settings.EVENT_BROKER)
+            backend = import_string(options.pop("BACKEND"))
+            logger.info(f"Using event broker: {backend.__name__}")
+            _broker = backend(**options)
+    return _broker
+
+
+def publish(channel, event):
+    """Publish an event once the current transaction commits, so subscribers never see a change before
+    it is visible in the database. Failing to publish never breaks the write that caused it.
+    """
+
+    def send():
+        try:
+            get_broker().publish(channel, event)
+        except Exception as e:
+            logger.error(f"Failed to publish event to {channel}. Error: {e}")
+
+    transaction.on_commit(send)
+
+
+def publish_household_event(household_id, event_type, **data):
+    publish(
+        household_channel(household_id),
+        {"type": event_type, "household": household_id, **data},
+    )
+
+
+def publish_user_event(user_id, event_type, **data):
+    publish(user_channel(user_id), {"type": event_type, **data})
@@ -0,0 +1,239 @@
+"""Read-only serialization of task lists, without model instances.
+
+The task ModelSerializers build a model instance for every row, then look up every field and call every
+SerializerMethodField through DRF's generic machinery. For list responses that is most of the time spent.
+The serializers here read plain .values() rows instead, and fill in staleness, due times and mean completion
+times from maps computed for the whole list at once. The output is the same as the ModelSerializers', down
+to the bytes once rendered, because each column is still converted by the DRF field that would have
+converted it, in the same order.
+
+These are only for reading. Anything that validates or saves still goes through the ModelSerializers.
+"""
+
+from abc import ABC, abstractmethod
+from logging import getLogger
+
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import (
+    FlexibleTask,
+    FlexibleTaskSerializer,
+    OneShotTask,
+    OneShotTaskSerializer,
+    ScheduledTask,
+    ScheduledTaskSerializer,
+    get_mean_completion_times,
+)
+from .staleness import (
+    datetimes_to_microseconds,
+    durations_to_microseconds,
+    flexible_staleness,
+    oneshot_staleness,
+    scheduled_staleness,
+)
+from .utils import get_cron_due_times
+
+logger = getLogger(__name__)
+
+
+def _identity(value):
+    return value
+
+
+class FastTaskSerializer(ABC):
+    """Serializes .values() rows of one task model the same way its ModelSerializer serializes instances"""
+
+    def __init__(self, model, serializer_class):
+        self.model = model
+        self.type = ContentType.objects.get_for_model(model).model
+
+        self.plan = []
+        self.columns = set()
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                # Filled in from the computed values
+                self.plan.append((name, None, None))
+                continue
+
+            column = field.source
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                column = self.model._meta.get_field(field.source).attname
+                convert = _identity
+            elif isinstance(field, (serializers.CharField, serializers.BooleanField)):
+                # Values from the database are already strings and booleans
+                convert = _identity
+            else:
+                convert = field.to_representation
+            self.plan.append((name, column, convert))
+            self.columns.add(column)
+
+    def get_rows(self, queryset):
+        return list(queryset.values(*self.get_columns()))
+
+    def get_columns(self):
+        return sorted(self.columns | set(self.required_columns))
+
+    @abstractmethod
+    def compute(self, rows, now):
+        """Returns a dict for each row, of the values of the fields that aren't read from a column"""
+
+    def serialize(self, rows, mean_completion_times, now):
+        computed = self.compute(rows, now)
+        data = []
+        for row, values in zip(rows, computed):
+            values["mean_completion_time"] = mean_completion_times.get(row["id"], 0.0)
+            item = {}
+            for name, column, convert in self.plan:
+                if column is None:
+                    item[name] = values[name]
+                else:
+                    value = row[column]
+                    item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class FastScheduledTaskSerializer(FastTaskSerializer):
+    required_columns = (
+        "id",
+        "cron_schedule",
+        "last_completed",
+        "last_due",
+        "next_due",
+        "max_interval",
+        "frozen",
+    )
+
+    def compute(self, rows, now):
+        last_dues = []
+        next_dues = []
+        moved_on = []
+        for row in rows:
+            # The same as ScheduledTask.get_due_times, including saving the due times when they move on
+            last_due, next_due = row["last_due"], row["next_due"]
+            if last_due is None or next_due is None or not (last_due <= now < next_due):
+                last_due, next_due = get_cron_due_times(row["cron_schedule"], now)
+                moved_on.append(
+                    ScheduledTask(id=row["id"], last_due=last_due, next_due=next_due)
+                )
+            last_dues.append(last_due.astimezone())
+            next_dues.append(next_due.astimezone())
+        # Many tasks can pass a due time at once, so save them all together
+        if moved_on:
+            ScheduledTask.objects.bulk_update(moved_on, ["last_due", "next_due"])
+
+        staleness = scheduled_staleness(
+            datetimes_to_microseconds([now])[0],
+            datetimes_to_microseconds(row["last_completed"] for row in rows),
+            datetimes_to_microseconds(last_dues),
+            durations_to_microseconds(row["max_interval"] for row in rows),
+            np.array([row["frozen"] for row in rows], dtype=bool),
+        )
+        return [
+            {"staleness": float(value), "last_due": last_due, "next_due": next_due}
+            for value, last_due, next_due in zip(staleness, last_dues, next_dues)
+        ]
+
+
+class FastFlexibleTaskSerializer(FastTaskSerializer):
+    required_columns = (
+        "id",
+        "last_completed",
+        "min_interval",
+        "max_interval",
+        "frozen",
+    )
+
+    def compute(self, rows, now):
+        staleness = flexible_staleness(
+            datetimes_to_microseconds([now])[0],
+            datetimes_to_microseconds(row["last_completed"] for row in rows),
+            durations_to_microseconds(row["min_interval"] for row in rows),
+            durations_to_microseconds(row["max_interval"] for row in rows),
+            np.array([row["frozen"] for row in rows], dtype=bool),
+        )
+        return [{"staleness": float(value)} for value in staleness]
+
+
+class FastOneShotTaskSerializer(FastTaskSerializer):
+    required_columns = (
+        "id",
+        "due_date",
+        "due_before",
+        "time_to_complete",
+        "frozen",
+        "has_completed",
+    )
+
+    def compute(self, rows, now):
+        staleness = oneshot_staleness(
+            datetimes_to_microseconds([now])[0],
+            datetimes_to_microseconds(row["due_date"] for row in rows),
+            np.array([row["due_before"] for row in rows], dtype=bool),
+            durations_to_microseconds(row["time_to_complete"] for row in rows),
+            np.array([row["frozen"] for row in rows], dtype=bool),
+            np.array([row["has_completed"] for row in rows], dtype=bool),
+        )
+        return [{"staleness": float(value)} for value in staleness]
+
+
+_serializers = {}
+
+
+def get_fast_serializer(model):
+    """The fast serializer for a task model. They're built on first use, since building one instantiates
+    the ModelSerializer to see its fields."""
+    if model not in _serializers:
+        serializer_class, fast_class = {
+            ScheduledTask: (ScheduledTaskSerializer, FastScheduledTaskSerializer),
+            FlexibleTask: (FlexibleTaskSerializer, FastFlexibleTaskSerializer),
+            OneShotTask: (OneShotTaskSerializer, FastOneShotTaskSerializer),
+        }[model]
+        _serializers[model] = fast_class(model, serializer_class)
+    return _serializers[model]
+
+
+def serialize_task_querysets(querysets, with_type=False, now=None):
+    """Serialize the tasks in each queryset, in order, as their ModelSerializers would. With with_type, each
+    task is tagged with its type like AllTasksSerializer does. Takes one query per queryset, and one for
+    the mean completion times of all of them."""
+    now = now or timezone.now()
+
+    rows_by_queryset = []
+    for queryset in querysets:
+        fast_serializer = get_fast_serializer(queryset.model)
+        rows_by_queryset.append((fast_serializer, fast_serializer.get_rows(queryset)))
+
+    mean_completion_times = get_mean_completion_times(
+        row["id"] for _, rows in rows_by_queryset for row in rows
+    )
+
+    data = []
+    for fast_serializer, rows in rows_by_queryset:
+        items = fast_serializer.serialize(rows, mean_completion_times, now)
+        if with_type:
+            for item in items:
+                item["type"] = fast_serializer.type
+        data.extend(items)
+
+    logger.debug(f"Serialized {len(data)} tasks from their rows")
+    return data
+
+
+def get_task_fields():
+    """The name of every field that a task of any type can have in a task list"""
+    return {
+        name
+        for model in (ScheduledTask, FlexibleTask, OneShotTask)
+        for name, _, _ in get_fast_serializer(model).plan
+    } | {"type"}
+
+
+def project_tasks(tasks, fields):
+    """Cut serialized tasks down to the given fields. Fields that a task's type doesn't have are left out."""
+    return [{field: task[field] for field in fields if field in task} for task in tasks]
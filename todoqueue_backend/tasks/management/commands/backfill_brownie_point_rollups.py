@@ -0,0 +1,68 @@
+from collections import defaultdict
+from datetime import datetime, time
+from logging import getLogger
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import BrowniePointRollup, WorkLog
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily brownie point rollups from the work logs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Only rebuild this many days back. By default, every rollup is rebuilt.",
+        )
+
+    def handle(self, *args, **options):
+        work_logs = WorkLog.objects.all()
+        rollups = BrowniePointRollup.objects.all()
+        if options["days"] is not None:
+            start_day = timezone.localdate() - timezone.timedelta(days=options["days"])
+            start = timezone.make_aware(datetime.combine(start_day, time.min))
+            work_logs = work_logs.filter(timestamp__gte=start)
+            rollups = rollups.filter(day__gte=start_day)
+
+        totals = defaultdict(lambda: [0, 0])
+        skipped = 0
+        for user_id, household_id, timestamp, points in work_logs.values_list(
+            "user_id", "household_id", "timestamp", "brownie_points"
+        ).iterator():
+            if household_id is None:
+                # The household has been deleted
+                skipped += 1
+                continue
+
+            total = totals[(user_id, household_id, timezone.localdate(timestamp))]
+            total[0] += points
+            total[1] += 1
+
+        with transaction.atomic():
+            rollups.delete()
+            BrowniePointRollup.objects.bulk_create(
+                [
+                    BrowniePointRollup(
+                        user_id=user_id,
+                        household_id=household_id,
+                        day=day,
+                        points=points,
+                        count=count,
+                    )
+                    for (user_id, household_id, day), (points, count) in totals.items()
+                ],
+                batch_size=1000,
+            )
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} work logs with no household")
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {len(totals)} brownie point rollups")
+        )
@@ -0,0 +1,125 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import (
+    AllTasksSerializer,
+    FlexibleTask,
+    Household,
+    OneShotTask,
+    ScheduledTask,
+    get_task_list_context,
+    register_tasks,
+)
+from tasks.snapshots import compute_task_list, get_household_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to serialize a household's task list with the ModelSerializers and with "
+        "the fast serializers. Works in a throwaway household, which is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tasks",
+            type=int,
+            default=1000,
+            help="How many tasks to put in the household, split evenly between the types.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="How many times to serialize the list with each serializer. The best time is reported.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            household = self.create_household(options["tasks"])
+
+            # Serialize both at the same moment, so that staleness comes out the same
+            now = timezone.now()
+            with mock.patch("django.utils.timezone.now", return_value=now):
+                model_time, expected = self.best_of(
+                    options["repeat"], lambda: self.model_serializers(household)
+                )
+                fast_time, actual = self.best_of(
+                    options["repeat"], lambda: compute_task_list(household)
+                )
+
+            transaction.set_rollback(True)
+
+        if JSONRenderer().render(expected) != JSONRenderer().render(actual):
+            raise CommandError("The serializers gave different output")
+
+        self.stdout.write(f"Model serializers: {model_time * 1000:.1f} ms")
+        self.stdout.write(f"Fast serializers:  {fast_time * 1000:.1f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Identical output for {len(actual)} tasks, {model_time / fast_time:.1f}x faster"
+            )
+        )
+
+    def create_household(self, count):
+        household = Household.objects.create(name="Serializer benchmark")
+        now = timezone.now()
+        per_type = count // 3
+
+        tasks = [
+            ScheduledTask(
+                task_name=f"Scheduled {i}",
+                household=household,
+                cron_schedule=f"{i % 60} {i % 24} * * *",
+                max_interval=timedelta(hours=3),
+            )
+            for i in range(per_type)
+        ]
+        for task in tasks:
+            task.get_due_times(now)
+        ScheduledTask.objects.bulk_create(tasks)
+        register_tasks(tasks)
+
+        tasks = FlexibleTask.objects.bulk_create(
+            FlexibleTask(
+                task_name=f"Flexible {i}",
+                household=household,
+                min_interval=timedelta(hours=i % 12),
+                max_interval=timedelta(hours=12 + i % 12),
+            )
+            for i in range(per_type)
+        )
+        register_tasks(tasks)
+
+        tasks = OneShotTask.objects.bulk_create(
+            OneShotTask(
+                task_name=f"One-shot {i}",
+                household=household,
+                due_date=now + timedelta(hours=i % 48 - 24),
+                time_to_complete=timedelta(hours=1),
+            )
+            for i in range(count - 2 * per_type)
+        )
+        register_tasks(tasks)
+
+        return household
+
+    def model_serializers(self, household):
+        tasks = get_household_tasks(household)
+        return AllTasksSerializer(
+            tasks, many=True, context=get_task_list_context(tasks)
+        ).data
+
+    def best_of(self, repeat, serialize):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serialize()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import Household
+from tasks.transfer import export_household
+
+
+class Command(BaseCommand):
+    help = "Export a household's tasks, work logs and members as JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("household_id", type=int)
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write the export to. Defaults to stdout.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            household = Household.objects.get(pk=options["household_id"])
+        except Household.DoesNotExist:
+            raise CommandError(f"No household with ID {options['household_id']}")
+
+        if options["output"] == "-":
+            for line in export_household(household):
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8") as output:
+            output.writelines(export_household(household))
+        self.stderr.write(
+            self.style.SUCCESS(f"Exported {household} to {options['output']}")
+        )
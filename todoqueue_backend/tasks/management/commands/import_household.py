@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.transfer import HouseholdImportError, import_household
+
+
+class Command(BaseCommand):
+    help = "Import a household exported by export_household, as a new household"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input", help="File to read the export from, or - to read stdin."
+        )
+        parser.add_argument(
+            "--name", help="Name for the new household, instead of the exported one."
+        )
+        parser.add_argument(
+            "--create-users",
+            action="store_true",
+            help="Create accounts, without passwords, for members who don't have one here.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["input"] == "-":
+                household = self.run(sys.stdin, options)
+            else:
+                with open(options["input"], encoding="utf-8") as lines:
+                    household = self.run(lines, options)
+        except HouseholdImportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported household {household.id}: {household}")
+        )
+
+    def run(self, lines, options):
+        return import_household(
+            lines,
+            name=options["name"],
+            create_users=options["create_users"],
+            match_members=True,
+        )
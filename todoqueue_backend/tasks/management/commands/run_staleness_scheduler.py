@@ -0,0 +1,49 @@
+import time
+from logging import getLogger
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.snapshots import refresh_active_snapshots
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Keep recomputing the task lists of households that people are looking at"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.STALENESS_SNAPSHOT_INTERVAL,
+            help="Seconds between recomputing snapshots.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Recompute the snapshots once, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        logger.info(f"Recomputing staleness snapshots every {interval} seconds")
+
+        while True:
+            started = time.monotonic()
+            # This runs for a long time, so don't hold on to connections the database has dropped
+            close_old_connections()
+            count = refresh_active_snapshots()
+            logger.debug(
+                f"Recomputed {count} snapshots in {time.monotonic() - started:.3f} seconds"
+            )
+
+            if options["once"]:
+                self.stdout.write(self.style.SUCCESS(f"Recomputed {count} snapshots"))
+                return
+
+            try:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,77 @@
+"""Household membership checks.
+
+Permission checks only need to know whether a user is in a household, so rather than loading the
+household's users on every request, the member IDs of each household are cached as a set. Each process
+keeps its own copy for a few seconds in front of the Django cache (Redis in production). Both are
+invalidated whenever a household's members change.
+"""
+
+import threading
+import time
+from logging import getLogger
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+logger = getLogger(__name__)
+
+_lock = threading.Lock()
+_local = {}
+
+
+def _cache_key(household_id):
+    return f"household-members-{household_id}"
+
+
+def get_member_ids(household_id):
+    """Returns the set of IDs of the users in a household. Households that don't exist have no members."""
+    household_id = int(household_id)
+    now = time.monotonic()
+
+    with _lock:
+        cached = _local.get(household_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    member_ids = cache.get(_cache_key(household_id))
+    if member_ids is None:
+        logger.debug(f"Loading members of household {household_id}")
+        member_ids = frozenset(
+            get_user_model()
+            .objects.filter(households=household_id)
+            .values_list("pk", flat=True)
+        )
+        cache.set(
+            _cache_key(household_id), member_ids, settings.MEMBERSHIP_CACHE_TIMEOUT
+        )
+
+    with _lock:
+        _local[household_id] = (now + settings.MEMBERSHIP_LOCAL_TTL, member_ids)
+    return member_ids
+
+
+def is_member(user, household_id):
+    try:
+        household_id = int(household_id)
+    except (TypeError, ValueError):
+        return False
+    return user.is_authenticated and user.pk in get_member_ids(household_id)
+
+
+def _forget(household_ids):
+    with _lock:
+        for household_id in household_ids:
+            _local.pop(household_id, None)
+    cache.delete_many([_cache_key(household_id) for household_id in household_ids])
+
+
+def invalidate(household_ids):
+    """Forget the cached members of the households. This is done again once the current transaction
+    commits, in case another request cached the old members in the meantime."""
+    household_ids = [int(household_id) for household_id in household_ids]
+    if not household_ids:
+        return
+    _forget(household_ids)
+    transaction.on_commit(lambda: _forget(household_ids))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0008_oneshottask_last_completed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduledtask",
+            name="last_due",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="scheduledtask",
+            name="next_due",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0009_scheduledtask_due_times"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="household",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_brownie_points(apps, schema_editor):
+    """Move each user's JSON credit and debit into balance rows, one per household they belong to or
+    have points in"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Household = apps.get_model("tasks", "Household")
+    BrowniePointBalance = apps.get_model("tasks", "BrowniePointBalance")
+
+    household_ids = set(Household.objects.values_list("pk", flat=True))
+
+    balances = []
+    for user in User.objects.prefetch_related("households"):
+        credit = user.brownie_point_credit or {}
+        debit = user.brownie_point_debit or {}
+        user_household_ids = {household.pk for household in user.households.all()}
+        for key in set(credit) | set(debit):
+            try:
+                user_household_ids.add(int(key))
+            except ValueError:
+                pass
+
+        for household_id in user_household_ids & household_ids:
+            balances.append(
+                BrowniePointBalance(
+                    user=user,
+                    household_id=household_id,
+                    credit=float(credit.get(str(household_id), 0.0)),
+                    debit=float(debit.get(str(household_id), 0.0)),
+                )
+            )
+
+    BrowniePointBalance.objects.bulk_create(balances, batch_size=1000)
+
+
+def copy_brownie_points_back(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    BrowniePointBalance = apps.get_model("tasks", "BrowniePointBalance")
+
+    for user in User.objects.all():
+        balances = BrowniePointBalance.objects.filter(user=user)
+        user.brownie_point_credit = {
+            str(balance.household_id): balance.credit for balance in balances
+        }
+        user.brownie_point_debit = {
+            str(balance.household_id): balance.debit for balance in balances
+        }
+        user.save(update_fields=["brownie_point_credit", "brownie_point_debit"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # The JSON balances are copied out of the user model before they are removed
+        ("accounts", "0004_customuser_has_logged_in"),
+        ("tasks", "0010_household_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BrowniePointBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("credit", models.FloatField(default=0.0)),
+                ("debit", models.FloatField(default=0.0)),
+                (
+                    "household",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="brownie_point_balances",
+                        to="tasks.household",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="brownie_point_balances",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["household", "-credit"],
+                        name="brownie_point_leaderboard",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="browniepointbalance",
+            constraint=models.UniqueConstraint(
+                fields=("user", "household"), name="unique_brownie_point_balance"
+            ),
+        ),
+        migrations.RunPython(copy_brownie_points, copy_brownie_points_back),
+    ]
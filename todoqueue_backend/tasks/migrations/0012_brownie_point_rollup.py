@@ -0,0 +1,54 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tasks", "0011_brownie_point_balance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BrowniePointRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("points", models.IntegerField(default=0)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "household",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="brownie_point_rollups",
+                        to="tasks.household",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="brownie_point_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="browniepointrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "household", "day"), name="unique_brownie_point_rollup"
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_households_from_tasks(apps, schema_editor):
+    """Fill in the household of every work log whose task still exists"""
+    WorkLog = apps.get_model("tasks", "WorkLog")
+
+    for model_name in ("ScheduledTask", "FlexibleTask", "OneShotTask", "DummyTask"):
+        model = apps.get_model("tasks", model_name)
+
+        task_ids_by_household = {}
+        for task_id, household_id in model.objects.values_list("id", "household_id"):
+            task_ids_by_household.setdefault(household_id, []).append(task_id)
+
+        for household_id, task_ids in task_ids_by_household.items():
+            for i in range(0, len(task_ids), 500):
+                WorkLog.objects.filter(object_id__in=task_ids[i : i + 500]).update(
+                    household_id=household_id
+                )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0012_brownie_point_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="worklog",
+            name="household",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="work_logs",
+                to="tasks.household",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="worklog",
+            index=models.Index(
+                fields=["object_id", "timestamp"], name="worklog_task_timestamp"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="worklog",
+            index=models.Index(
+                fields=["household", "timestamp", "user"],
+                name="worklog_household_timestamp",
+            ),
+        ),
+        migrations.RunPython(copy_households_from_tasks, migrations.RunPython.noop),
+    ]
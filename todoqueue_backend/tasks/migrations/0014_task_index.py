@@ -0,0 +1,62 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def index_existing_tasks(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaskIndex = apps.get_model("tasks", "TaskIndex")
+
+    for model_name in ("DummyTask", "FlexibleTask", "ScheduledTask", "OneShotTask"):
+        model = apps.get_model("tasks", model_name)
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label="tasks", model=model_name.lower()
+        )
+        TaskIndex.objects.bulk_create(
+            [
+                TaskIndex(
+                    id=task_id, content_type=content_type, household_id=household_id
+                )
+                for task_id, household_id in model.objects.values_list(
+                    "id", "household_id"
+                )
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasks", "0013_worklog_household"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskIndex",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "household",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_index",
+                        to="tasks.household",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(index_existing_tasks, migrations.RunPython.noop),
+    ]
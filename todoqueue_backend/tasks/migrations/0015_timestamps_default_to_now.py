@@ -0,0 +1,48 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:29
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0014_task_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dummytask",
+            name="last_completed",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="flexibletask",
+            name="last_completed",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="oneshottask",
+            name="last_completed",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="scheduledtask",
+            name="last_completed",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="worklog",
+            name="timestamp",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0015_timestamps_default_to_now"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="worklog",
+            index=models.Index(
+                fields=["user", "timestamp"], name="worklog_user_timestamp"
+            ),
+        ),
+    ]
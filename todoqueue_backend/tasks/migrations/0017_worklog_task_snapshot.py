@@ -0,0 +1,47 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:36
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_task_snapshots(apps, schema_editor):
+    """Fill in the type of every work log, and the name of every one whose task still exists"""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    WorkLog = apps.get_model("tasks", "WorkLog")
+
+    for model_name in ("ScheduledTask", "FlexibleTask", "OneShotTask", "DummyTask"):
+        content_type = ContentType.objects.filter(
+            app_label="tasks", model=model_name.lower()
+        ).first()
+        if content_type is None:
+            continue
+        work_logs = WorkLog.objects.filter(content_type=content_type)
+        work_logs.update(task_type=content_type.model)
+
+        if model_name != "DummyTask":
+            model = apps.get_model("tasks", model_name)
+            names = model.objects.filter(id=OuterRef("object_id")).values("task_name")
+            work_logs.filter(object_id__in=model.objects.values("id")).update(
+                task_name=Subquery(names[:1])
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tasks", "0016_worklog_user_timestamp"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="worklog",
+            name="task_name",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="worklog",
+            name="task_type",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.RunPython(copy_task_snapshots, migrations.RunPython.noop),
+    ]
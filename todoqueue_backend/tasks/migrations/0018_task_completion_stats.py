@@ -0,0 +1,47 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:39
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def total_work_logs(apps, schema_editor):
+    """Build the running totals from the existing work logs"""
+    WorkLog = apps.get_model("tasks", "WorkLog")
+    TaskCompletionStats = apps.get_model("tasks", "TaskCompletionStats")
+
+    totals = defaultdict(TaskCompletionStats)
+    for task_id, completion_time, grossness in WorkLog.objects.values_list(
+        "object_id", "completion_time", "grossness"
+    ).iterator(chunk_size=1000):
+        minutes = completion_time.total_seconds() / 60
+        stats = totals[task_id]
+        stats.task_id = task_id
+        stats.count += 1
+        stats.completion_time += minutes
+        stats.completion_time_squares += minutes**2
+        stats.grossness += grossness
+        stats.grossness_squares += grossness**2
+
+    TaskCompletionStats.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0017_worklog_task_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCompletionStats",
+            fields=[
+                ("task_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("completion_time", models.FloatField(default=0)),
+                ("completion_time_squares", models.FloatField(default=0)),
+                ("grossness", models.FloatField(default=0)),
+                ("grossness_squares", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunPython(total_work_logs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0018_task_completion_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskindex",
+            name="changed_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
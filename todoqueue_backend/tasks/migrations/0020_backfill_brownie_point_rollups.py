@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def rebuild_rollups(apps, schema_editor):
+    """Build the daily brownie point rollups from the existing work logs, as the
+    backfill_brownie_point_rollups command does. The rollup table was created empty, and work logs only
+    had households to roll up into once they were copied over from their tasks."""
+    WorkLog = apps.get_model("tasks", "WorkLog")
+    BrowniePointRollup = apps.get_model("tasks", "BrowniePointRollup")
+
+    totals = defaultdict(lambda: [0, 0])
+    for user_id, household_id, timestamp, points in (
+        WorkLog.objects.filter(household__isnull=False)
+        .values_list("user_id", "household_id", "timestamp", "brownie_points")
+        .iterator(chunk_size=1000)
+    ):
+        total = totals[(user_id, household_id, timezone.localdate(timestamp))]
+        total[0] += points
+        total[1] += 1
+
+    BrowniePointRollup.objects.all().delete()
+    BrowniePointRollup.objects.bulk_create(
+        [
+            BrowniePointRollup(
+                user_id=user_id,
+                household_id=household_id,
+                day=day,
+                points=points,
+                count=count,
+            )
+            for (user_id, household_id, day), (points, count) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0019_task_index_changed_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
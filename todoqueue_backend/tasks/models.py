@@ -1,26 +1,30 @@
-from datetime import datetime
+import math
 import uuid
+from collections import defaultdict
 from logging import getLogger
 
-import croniter
-from profanity_check import predict as is_profane
-from profanity_check import predict_prob as how_profane
-
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models.signals import m2m_changed
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.response import Response
 from rest_framework.validators import UniqueValidator
 
 from accounts.serializers import CustomUserSerializer
+from todoqueue_backend.profanity import ProfanityBatchMixin, is_profane
+
+from . import membership, response_cache
+from .events import publish_household_event, publish_user_event
+from .staleness import get_staleness
+from .utils import get_cron_due_times
 
 logger = getLogger(__name__)
 usermodel = get_user_model()
@@ -28,33 +32,33 @@ usermodel = get_user_model()
 
 def validate_profanity(value):
     logger.debug(f"Validating profanity for value: {value}")
-    if is_profane([value])[0] == 1:
+    if is_profane(value):
         logger.debug("Profanity detected!")
         raise ValidationError("Profanity is not allowed")
-    logger.debug(f"Value {value} is OK - profanity score: {how_profane([value])[0]}")
 
 
 class Household(models.Model):
     users = models.ManyToManyField(get_user_model(), related_name="households")
     name = models.CharField(max_length=255, validators=[validate_profanity])
 
+    # Bumped whenever the household's tasks, work logs or members change. Clients can send this back to
+    # find out if anything has changed since they last looked.
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
+        # The version is only ever changed with atomic increments, so never write back a stale copy of it
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "version"
+            ]
+
         super(Household, self).save(*args, **kwargs)
-        for user in self.users.all():
-            logger.debug(
-                f"Setting BP for user {user}. Current BP: {user.brownie_point_credit}"
-            )
-            if str(self.id) not in user.brownie_point_credit:
-                logger.debug(f"Setting BP credit for user {user}")
-                user.brownie_point_credit[str(self.id)] = 0.0
-            if str(self.id) not in user.brownie_point_debit:
-                logger.debug(f"Setting BP debit for user {user}")
-                user.brownie_point_debit[str(self.id)] = 0.0
-            logger.debug("saving user")
-            user.save()
+        create_brownie_point_balances(self.id, self.users.values_list("pk", flat=True))
 
         # If this household has NO dummy task associated with it, create one
         if self.dummy_tasks.count() == 0:
@@ -72,28 +76,247 @@ class Household(models.Model):
             return None
 
 
-@receiver(m2m_changed, sender=Household.users.through)
-def update_brownie_points(sender, instance, action, **kwargs):
-    if action == "post_add":
-        for user in instance.users.all():
-            logger.debug("Setting up brownie points for users in household")
-            logger.debug(f"Users in household: {instance.users.all()}")
-            for user in instance.users.all():
-                logger.debug(
-                    f"Setting BP for user {user}. Current BP: {user.brownie_point_credit}"
+def bump_household_version(household_id, task_ids=()):
+    """Mark that something in the household has changed. Any tasks given are marked as changed in the
+    new version, so that clients polling for changes know to fetch them again.
+
+    Both happen in one transaction, so nobody can see the new version without the tasks that changed in
+    it. Updating the household locks its row until then, so concurrent bumps can't share a version.
+    """
+    with transaction.atomic():
+        Household.objects.filter(pk=household_id).update(version=F("version") + 1)
+        if task_ids:
+            TaskIndex.objects.filter(pk__in=task_ids).update(
+                changed_version=Subquery(
+                    Household.objects.filter(pk=household_id).values("version")[:1]
                 )
-                if str(instance.id) not in user.brownie_point_credit:
-                    logger.debug(f"Setting BP credit for user {user}")
-                    user.brownie_point_credit[str(instance.id)] = 0.0
-                if str(instance.id) not in user.brownie_point_debit:
-                    logger.debug(f"Setting BP debit for user {user}")
-                    user.brownie_point_debit[str(instance.id)] = 0.0
-                logger.debug("saving user")
-                user.save()
+            )
+
+
+@receiver(m2m_changed, sender=Household.users.through)
+def membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Membership can be changed from either side of the relation
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            household_ids = [instance.pk]
+        else:
+            return
+    elif action in ("post_add", "post_remove"):
+        household_ids = list(pk_set or ())
+    elif action == "pre_clear":
+        # Once the user's households are cleared, there's no telling which they were
+        household_ids = list(instance.households.values_list("pk", flat=True))
+    else:
+        return
+
+    membership.invalidate(household_ids)
+    for household_id in household_ids:
+        bump_household_version(household_id)
+
+
+@receiver(post_save, sender=Household)
+@receiver(post_delete, sender=Household)
+def forget_household_members(sender, instance, created=True, **kwargs):
+    # Don't trust anything cached about a new or deleted household's members, in case its ID is reused
+    if created:
+        membership.invalidate([instance.pk])
+
+
+@receiver(m2m_changed, sender=Household.users.through)
+def update_brownie_points(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != "post_add":
+        return
+
+    logger.debug("Setting up brownie points for users in household")
+    if reverse:
+        # A user was added to some households
+        for household_id in pk_set:
+            create_brownie_point_balances(household_id, [instance.pk])
+    else:
+        create_brownie_point_balances(instance.pk, pk_set)
+
+
+class BrowniePointBalance(models.Model):
+    """How many brownie points a user has earned and spent in one household. Always change the totals
+    with credit_brownie_points or F() expressions, never by saving a modified instance, so concurrent
+    updates can't overwrite each other."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="brownie_point_balances",
+    )
+    household = models.ForeignKey(
+        Household, on_delete=models.CASCADE, related_name="brownie_point_balances"
+    )
+    credit = models.FloatField(default=0.0)
+    debit = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "household"], name="unique_brownie_point_balance"
+            )
+        ]
+        indexes = [
+            # Household leaderboards
+            models.Index(
+                fields=["household", "-credit"],
+                name="brownie_point_leaderboard",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.household}: {self.credit - self.debit} BP"
+
+
+def create_brownie_point_balances(household_id, user_ids):
+    """Make sure each of the users has a (zeroed) balance in the household"""
+    BrowniePointBalance.objects.bulk_create(
+        [
+            BrowniePointBalance(user_id=user_id, household_id=household_id)
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class BrowniePointRollup(models.Model):
+    """The brownie points a user earned in a household on one day, so rolling totals can be read from
+    a handful of rows instead of summing the work logs. Kept up to date as work is logged.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="brownie_point_rollups",
+    )
+    household = models.ForeignKey(
+        Household, on_delete=models.CASCADE, related_name="brownie_point_rollups"
+    )
+    day = models.DateField()
+    points = models.IntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "household", "day"], name="unique_brownie_point_rollup"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.household} on {self.day}: {self.points} BP"
+
+
+def _increment(model, lookup, **amounts):
+    """Atomically add to fields of the row matching the lookup, creating the row first if it doesn't
+    exist yet"""
+    increments = {field: F(field) + amount for field, amount in amounts.items()}
+    with transaction.atomic():
+        if not model.objects.filter(**lookup).update(**increments):
+            # Another request may create the row at the same time, so create it then increment it
+            model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+            model.objects.filter(**lookup).update(**increments)
+
+
+def credit_brownie_points(user_id, household_id, points):
+    """Atomically add points to a user's credit in a household"""
+    _increment(
+        BrowniePointBalance,
+        {"user_id": user_id, "household_id": household_id},
+        credit=points,
+    )
+    logger.debug(
+        f"User {user_id} was credited with {points} BP in household {household_id}"
+    )
+
+
+def record_brownie_point_rollup(user_id, household_id, day, points, count=1):
+    """Add completed work to the user's daily rollup"""
+    _increment(
+        BrowniePointRollup,
+        {"user_id": user_id, "household_id": household_id, "day": day},
+        points=points,
+        count=count,
+    )
+
+
+class TaskCompletionStats(models.Model):
+    """Running totals of the work logged against a task, so its history can be summarised without
+    reading every work log. Kept up to date as work is logged. Completion times are in minutes.
+    """
+
+    task_id = models.UUIDField(primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    completion_time = models.FloatField(default=0)
+    completion_time_squares = models.FloatField(default=0)
+    grossness = models.FloatField(default=0)
+    grossness_squares = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Task {self.task_id}: {self.count} completions"
+
+    def _mean(self, total):
+        return total / self.count if self.count else 0.0
+
+    def _std(self, total, squares):
+        if not self.count:
+            return 0.0
+        # Rounding can leave the variance a hair below zero
+        return math.sqrt(max(0.0, squares / self.count - self._mean(total) ** 2))
+
+    @property
+    def completion_time_mean(self):
+        return self._mean(self.completion_time)
+
+    @property
+    def completion_time_std(self):
+        return self._std(self.completion_time, self.completion_time_squares)
+
+    @property
+    def grossness_mean(self):
+        return self._mean(self.grossness)
+
+    @property
+    def grossness_std(self):
+        return self._std(self.grossness, self.grossness_squares)
 
-        logger.debug("OK")
 
-        return Response("OK", 200)
+def record_task_completion_stats(work_logs, sign=1):
+    """Add newly saved work logs to their tasks' running totals. Each task's totals are only updated
+    once, however many of the logs are for it. With a sign of -1, takes the logs back out instead.
+    """
+    totals = defaultdict(lambda: defaultdict(float))
+    for work_log in work_logs:
+        minutes = work_log.completion_time.total_seconds() / 60
+        task_totals = totals[work_log.object_id]
+        task_totals["count"] += sign
+        task_totals["completion_time"] += sign * minutes
+        task_totals["completion_time_squares"] += sign * minutes**2
+        task_totals["grossness"] += sign * work_log.grossness
+        task_totals["grossness_squares"] += sign * work_log.grossness**2
+
+    with transaction.atomic():
+        for task_id, task_totals in totals.items():
+            task_totals["count"] = int(task_totals["count"])
+            _increment(TaskCompletionStats, {"task_id": task_id}, **task_totals)
+
+
+def rolling_brownie_points(household, days=7):
+    """An aggregate of the points each user earned in the household over the last few days, to annotate
+    users with. Whole days are counted, in the server's time zone."""
+    start_day = timezone.localdate() - timezone.timedelta(days=days)
+    return Coalesce(
+        Sum(
+            "brownie_point_rollups__points",
+            filter=Q(
+                brownie_point_rollups__household=household,
+                brownie_point_rollups__day__gte=start_day,
+            ),
+        ),
+        0,
+    )
 
 
 class ScheduledTask(models.Model):
@@ -109,7 +332,7 @@ class ScheduledTask(models.Model):
 
     task_name = models.CharField(max_length=255, validators=[validate_profanity])
     description = models.TextField(default="", validators=[validate_profanity])
-    last_completed = models.DateTimeField(auto_now_add=True)
+    last_completed = models.DateTimeField(default=timezone.now, editable=False)
     household = models.ForeignKey(
         Household, on_delete=models.CASCADE, related_name="scheduled_tasks"
     )
@@ -119,34 +342,49 @@ class ScheduledTask(models.Model):
     cron_schedule = models.CharField(max_length=255, default="0 * * * *")
     max_interval = models.DurationField(default="0:0")
 
-    @property
-    def last_due(self):
-        """Returns the previous time this task was due, as a datetime object."""
-        cron = croniter.croniter(
-            self.cron_schedule, timezone.now().astimezone(), ret_type=datetime
-        )
-        prev_due = cron.get_prev()
-        logger.debug(f"The last time this task was due was: {prev_due}")
-        return prev_due
+    # The due times either side of now, cached from the cron schedule. These only need to be
+    # recomputed once the next due time has passed, or the schedule changes.
+    last_due = models.DateTimeField(null=True, blank=True, editable=False)
+    next_due = models.DateTimeField(null=True, blank=True, editable=False)
+
+    def get_due_times(self, now=None):
+        """Returns the previous and next times this task is due, as datetime objects."""
+        now = now or timezone.now()
+
+        if (
+            self.last_due is None
+            or self.next_due is None
+            or not (self.last_due <= now < self.next_due)
+        ):
+            self.last_due, self.next_due = get_cron_due_times(self.cron_schedule, now)
+            logger.debug(
+                f"Task {self.id} is now due between {self.last_due} and {self.next_due}"
+            )
+            if not self._state.adding:
+                ScheduledTask.objects.filter(pk=self.pk).update(
+                    last_due=self.last_due, next_due=self.next_due
+                )
 
-    @property
-    def next_due(self):
-        """Returns the next time this task will occur, as a datetime object."""
-        cron = croniter.croniter(
-            self.cron_schedule, timezone.now().astimezone(), ret_type=datetime
-        )
-        next_due = cron.get_next()
-        logger.debug(f"The next time this task is due is: {next_due}")
-        return next_due
+        return self.last_due.astimezone(), self.next_due.astimezone()
+
+    def save(self, *args, **kwargs):
+        # The schedule may have changed, so refresh the stored due times along with it
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "cron_schedule" in update_fields:
+            self.last_due, self.next_due = get_cron_due_times(self.cron_schedule)
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"last_due", "next_due"}
+
+        super(ScheduledTask, self).save(*args, **kwargs)
 
     # Calculate the staleness of this task
     @property
     def staleness(self):
         if self.frozen:
-            return 0
+            return 0.0
 
-        last_due = self.last_due
         now = timezone.now()
+        last_due, _ = self.get_due_times(now)
         logger.debug(f"Time is now: {now.astimezone()}")
         logger.debug(f"The task was last completed at {self.last_completed}")
         logger.debug(f"The task was last due at {last_due}")
@@ -178,15 +416,7 @@ class ScheduledTask(models.Model):
 
     @property
     def mean_completion_time(self):
-        work_logs = WorkLog.objects.filter(object_id=self.id)
-        if work_logs.count() == 0:
-            return timezone.timedelta(seconds=0)
-
-        total_completion_time = sum(
-            [work_log.completion_time for work_log in work_logs], timezone.timedelta()
-        )
-        mean_completion_time = total_completion_time / work_logs.count()
-        return mean_completion_time.total_seconds()
+        return get_mean_completion_times([self.id]).get(self.id, 0.0)
 
 
 class FlexibleTask(models.Model):
@@ -196,7 +426,7 @@ class FlexibleTask(models.Model):
     description = models.TextField(default="", validators=[validate_profanity])
     max_interval = models.DurationField(default="0:0")
     min_interval = models.DurationField(default="0:0")
-    last_completed = models.DateTimeField(auto_now_add=True)
+    last_completed = models.DateTimeField(default=timezone.now, editable=False)
     household = models.ForeignKey(
         Household, on_delete=models.CASCADE, related_name="flexible_tasks"
     )
@@ -206,13 +436,13 @@ class FlexibleTask(models.Model):
     @property
     def staleness(self):
         if self.frozen:
-            return 0
+            return 0.0
 
         time_since_last_completed = timezone.now() - self.last_completed
         if time_since_last_completed < self.min_interval:
-            return 0
+            return 0.0
         if time_since_last_completed > self.max_interval:
-            return 1
+            return 1.0
 
         # Calculate how many intervals have passed since the task was last completed
         staleness = (time_since_last_completed - self.min_interval) / (
@@ -223,15 +453,7 @@ class FlexibleTask(models.Model):
 
     @property
     def mean_completion_time(self):
-        work_logs = WorkLog.objects.filter(object_id=self.id)
-        if work_logs.count() == 0:
-            return timezone.timedelta(seconds=0)
-
-        total_completion_time = sum(
-            [work_log.completion_time for work_log in work_logs], timezone.timedelta()
-        )
-        mean_completion_time = total_completion_time / work_logs.count()
-        return mean_completion_time.total_seconds()
+        return get_mean_completion_times([self.id]).get(self.id, 0.0)
 
     def __str__(self):
         return self.task_name
@@ -251,13 +473,13 @@ class OneShotTask(models.Model):
         Household, on_delete=models.CASCADE, related_name="oneshot_tasks"
     )
     frozen = models.BooleanField(default=False)
-    last_completed = models.DateTimeField(auto_now_add=True)
+    last_completed = models.DateTimeField(default=timezone.now, editable=False)
     has_completed = models.BooleanField(default=False)
 
     @property
     def staleness(self):
         if self.frozen or self.has_completed:
-            return 0
+            return 0.0
 
         now = timezone.now()
         remaining = None
@@ -266,32 +488,24 @@ class OneShotTask(models.Model):
             deadline = self.due_date - self.time_to_complete
 
             if now < deadline:
-                return 0
+                return 0.0
             remaining = now - deadline
 
         else:
             if now < self.due_date:
-                return 0
+                return 0.0
             remaining = now - self.due_date
 
         logger.debug(f"Remaining: {remaining}")
         logger.debug(f"")
 
         # Normalize staleness to a value between 0 and 1
-        staleness = min(remaining / self.time_to_complete, 1)
+        staleness = min(remaining / self.time_to_complete, 1.0)
         return staleness
 
     @property
     def mean_completion_time(self):
-        work_logs = WorkLog.objects.filter(object_id=self.id)
-        if work_logs.count() == 0:
-            return timezone.timedelta(seconds=0)
-
-        total_completion_time = sum(
-            [work_log.completion_time for work_log in work_logs], timezone.timedelta()
-        )
-        mean_completion_time = total_completion_time / work_logs.count()
-        return mean_completion_time.total_seconds()
+        return get_mean_completion_times([self.id]).get(self.id, 0.0)
 
     def __str__(self):
         return self.task_name
@@ -302,7 +516,7 @@ class DummyTask(models.Model):
     household = models.ForeignKey(
         Household, on_delete=models.CASCADE, related_name="dummy_tasks"
     )
-    last_completed = models.DateTimeField(auto_now_add=True)
+    last_completed = models.DateTimeField(default=timezone.now, editable=False)
     frozen = models.BooleanField(default=False)
 
     @property
@@ -317,11 +531,46 @@ class DummyTask(models.Model):
         return "Dummy task for household {}".format(self.household.name)
 
 
+# Every kind of task. Tasks of all of these types share one ID space, registered in TaskIndex.
+TASK_MODELS = [DummyTask, FlexibleTask, ScheduledTask, OneShotTask]
+
+
+class TaskIndex(models.Model):
+    """Records which model each task ID belongs to, so a task can be found from its ID alone in one
+    lookup. Kept in sync with the task tables by signals."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    household = models.ForeignKey(
+        Household, on_delete=models.CASCADE, related_name="task_index"
+    )
+    # The household version in which the task last changed
+    changed_version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.content_type.model} {self.id}"
+
+
+def register_tasks(tasks):
+    TaskIndex.objects.bulk_create(
+        [
+            TaskIndex(
+                id=task.id,
+                content_type=ContentType.objects.get_for_model(task),
+                household_id=task.household_id,
+            )
+            for task in tasks
+        ],
+        ignore_conflicts=True,
+    )
+
+
 class WorkLog(models.Model):
     # Link to the User model
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Defaults to now rather than using auto_now_add, so that imported history keeps its times
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     grossness = models.FloatField(
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
@@ -333,22 +582,44 @@ class WorkLog(models.Model):
     object_id = models.UUIDField()
     content_object = GenericForeignKey("content_type", "object_id")
 
+    # Copied from the task, so logs can be found by household without going through the generic
+    # relation, and are still attributed after the task is deleted. The household_timestamp index
+    # covers lookups by household alone, so the foreign key doesn't need its own.
+    household = models.ForeignKey(
+        Household,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="work_logs",
+    )
+    # Also copied from the task, so history can be shown without looking the task up
+    task_name = models.CharField(max_length=255, blank=True, default="")
+    task_type = models.CharField(max_length=32, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Per-task history
+            models.Index(
+                fields=["object_id", "timestamp"], name="worklog_task_timestamp"
+            ),
+            # Per-household windows
+            models.Index(
+                fields=["household", "timestamp", "user"],
+                name="worklog_household_timestamp",
+            ),
+            # A user's history
+            models.Index(fields=["user", "timestamp"], name="worklog_user_timestamp"),
+        ]
+
     def __str__(self):
-        return (
-            f"{self.user.username} completed {self.content_object} at {self.timestamp}"
-        )
+        return f"{self.user.username} completed {self.task_name or self.task_type} at {self.timestamp}"
 
     def save(self, *args, **kwargs):
         # If the task has been deleted, it'll be None
         if self.content_object:
             try:
-                # Tasks MUST have a last_completed field
-                self.content_object.last_completed = timezone.now()
-
-                # Check if the task is a OneShotTask and set has_completed to True
-                if isinstance(self.content_object, OneShotTask):
-                    self.content_object.has_completed = True
-
+                mark_task_completed(self.content_object)
                 self.content_object.save()
             except AttributeError:
                 logger.error(
@@ -360,45 +631,289 @@ class WorkLog(models.Model):
             try:
                 # Tasks MUST have a household field
                 household = self.content_object.household
-                logger.debug(
-                    f"Crediting user {self.user.email} in household {household.id}"
-                )
-                logger.debug(f"Current BP: {self.user.brownie_point_credit}")
-                self.user.brownie_point_credit[str(household.id)] += self.brownie_points
-                self.user.save()
-                logger.debug(
-                    f"User {self.user.username} was credited with {self.brownie_points} BP, and now has a total credit of {self.user.brownie_point_credit} BP"
-                )
             except AttributeError:
                 logger.error(
-                    f"Task {self.content_object} does not have a household field or user does not have brownie_point_credit field."
+                    f"Task {self.content_object} does not have a household field."
                 )
+            else:
+                snapshot_task(self, self.content_object)
+                with transaction.atomic():
+                    super(WorkLog, self).save(*args, **kwargs)
+                    credit_work_logs([self])
+                    record_task_completion_stats([self])
+                return
+
+        # Editing a work log can move its points to another user or day, or change how many there are
+        # or how long the task took, so take back what the old values added and add the new ones
+        old = WorkLog.objects.filter(pk=self.pk).first()
+        with transaction.atomic():
+            super(WorkLog, self).save(*args, **kwargs)
+            if old is not None and any(
+                getattr(old, field) != getattr(self, field) for field in CREDITED_FIELDS
+            ):
+                credit_work_logs([old], sign=-1)
+                credit_work_logs([self])
+            if old is not None and any(
+                getattr(old, field) != getattr(self, field) for field in RECORDED_FIELDS
+            ):
+                record_task_completion_stats([old], sign=-1)
+                record_task_completion_stats([self])
+
+
+# The fields of a work log that its user's balance and rollups depend on
+CREDITED_FIELDS = ("user_id", "household_id", "timestamp", "brownie_points")
+# The fields of a work log that its task's completion stats depend on
+RECORDED_FIELDS = ("content_type_id", "object_id", "completion_time", "grossness")
+
+
+@receiver(post_delete, sender=WorkLog)
+def uncredit_work_log(sender, instance, **kwargs):
+    credit_work_logs([instance], sign=-1)
+    record_task_completion_stats([instance], sign=-1)
+
+
+def snapshot_task(work_log, task):
+    """Copy what a work log needs to know about its task onto it. Doesn't save it."""
+    work_log.household_id = task.household_id
+    # Dummy tasks have no name
+    work_log.task_name = getattr(task, "task_name", "")
+    work_log.task_type = task._meta.model_name
+
+
+def mark_task_completed(task, when=None):
+    """Update a task for having just been done. Doesn't save it."""
+    # Tasks MUST have a last_completed field
+    task.last_completed = when or timezone.now()
+
+    # One-shots only need doing once
+    if isinstance(task, OneShotTask):
+        task.has_completed = True
+
+
+def credit_work_logs(work_logs, sign=1):
+    """Credit the users of newly saved work logs with their brownie points, in both their balances and
+    their daily rollups. Each balance and rollup is only updated once, however many logs add to it.
+    With a sign of -1, takes back the points of work logs that are being deleted or changed instead.
+    """
+    credits = defaultdict(int)
+    rollups = defaultdict(lambda: [0, 0])
+    for work_log in work_logs:
+        # The household has been deleted, along with its balances and rollups
+        if work_log.household_id is None:
+            continue
+        credits[(work_log.user_id, work_log.household_id)] += (
+            sign * work_log.brownie_points
+        )
+        rollup = rollups[
+            (
+                work_log.user_id,
+                work_log.household_id,
+                timezone.localdate(work_log.timestamp),
+            )
+        ]
+        rollup[0] += sign * work_log.brownie_points
+        rollup[1] += sign
+
+    with transaction.atomic():
+        for (user_id, household_id), points in credits.items():
+            credit_brownie_points(user_id, household_id, points)
+        for (user_id, household_id, day), (points, count) in rollups.items():
+            record_brownie_point_rollup(user_id, household_id, day, points, count)
+
 
-        super(WorkLog, self).save(*args, **kwargs)
+def create_work_logs(work_logs):
+    """Save many new work logs at once, with the same effects as saving each of them in turn, but in a
+    handful of queries. Every work log must have its content_object set to an existing task.
 
-    # TODO: Worklogs should carry a JSON payload of their tasks, in case the task gets deleted?
+    Work logs can be timestamped in the past, e.g. when they were made offline. Each task is marked as
+    completed at its latest work log, unless it had already been completed more recently.
+    """
+    tasks = {}
+    completed = {}
+    for work_log in work_logs:
+        task = work_log.content_object
+        snapshot_task(work_log, task)
+        tasks[task.id] = task
+        completed[task.id] = max(
+            completed.get(task.id, work_log.timestamp), work_log.timestamp
+        )
+
+    tasks_by_model = defaultdict(list)
+    for task in tasks.values():
+        when = completed[task.id]
+        if task.last_completed is not None:
+            when = max(when, task.last_completed)
+        mark_task_completed(task, when)
+        tasks_by_model[type(task)].append(task)
+
+    with transaction.atomic():
+        for model, model_tasks in tasks_by_model.items():
+            fields = ["last_completed"]
+            if model is OneShotTask:
+                fields.append("has_completed")
+            model.objects.bulk_update(model_tasks, fields)
+
+        WorkLog.objects.bulk_create(work_logs)
+        credit_work_logs(work_logs)
+        record_task_completion_stats(work_logs)
+
+        # Bulk operations don't send signals, so do what the receivers would have done
+        task_ids_by_household = defaultdict(list)
+        for task in tasks.values():
+            task_ids_by_household[task.household_id].append(task.id)
+        for household_id, task_ids in task_ids_by_household.items():
+            bump_household_version(household_id, task_ids)
+        for task in tasks.values():
+            if not isinstance(task, DummyTask):
+                publish_household_event(
+                    task.household_id, "task", action="updated", id=str(task.id)
+                )
+        for work_log in work_logs:
+            publish_household_event(
+                work_log.household_id,
+                "worklog",
+                task=str(work_log.object_id),
+                user=work_log.user_id,
+            )
+
+    logger.info(f"Created {len(work_logs)} work logs for {len(tasks)} tasks")
+    return work_logs
 
 
 def get_task_by_id(task_id):
     """Returns both the Task object, and the ContentType object for the given task ID, as a tuple."""
-    # Add other task models to this list as needed
-    task_models = [DummyTask, FlexibleTask, ScheduledTask, OneShotTask]
+    entry = TaskIndex.objects.filter(pk=task_id).first()
+    if entry is not None:
+        type = ContentType.objects.get_for_id(entry.content_type_id)
+        model = type.model_class()
+        try:
+            return model.objects.get(id=task_id), type
+        except model.DoesNotExist:
+            logger.error(f"Task index entry for {task_id} is stale, removing it")
+            entry.delete()
 
-    for model in task_models:
+    # Not in the index. Look in every task table, and fix the index if it turns up.
+    for model in TASK_MODELS:
         try:
             task = model.objects.get(id=task_id)
-            type = ContentType.objects.get_for_model(model)
-            return task, type
         except model.DoesNotExist:
             continue
-        except ContentType.DoesNotExist:
-            logger.error(f"No content type found for model: {model}")
-            continue
+        logger.error(f"Task {task_id} was missing from the task index")
+        register_tasks([task])
+        return task, ContentType.objects.get_for_model(model)
 
     logger.error(f"No task found with ID: {task_id}")
     return None, None
 
 
+def get_tasks_by_ids(task_ids):
+    """Returns a dict mapping task ID to task, for each of the IDs that exist. This takes one query for
+    the index, and one for each type of task found."""
+    ids_by_type = defaultdict(list)
+    for task_id, content_type_id in TaskIndex.objects.filter(
+        pk__in=set(task_ids)
+    ).values_list("id", "content_type_id"):
+        ids_by_type[content_type_id].append(task_id)
+
+    tasks = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        tasks.update((task.id, task) for task in model.objects.filter(pk__in=ids))
+    return tasks
+
+
+def get_mean_completion_times(task_ids):
+    """Returns a dict mapping task ID to the mean completion time of its work logs, in seconds.
+    This is a single grouped query, no matter how many tasks are asked for. Tasks with no work
+    logs are left out of the dict."""
+    work_logs = (
+        WorkLog.objects.filter(object_id__in=list(task_ids))
+        .order_by()
+        .values("object_id")
+        .annotate(mean_completion_time=Avg("completion_time"))
+    )
+    return {
+        work_log["object_id"]: work_log["mean_completion_time"].total_seconds()
+        for work_log in work_logs
+    }
+
+
+def get_user_statistics(household_ids, days=30):
+    """Returns a list of work done in the given households over the last `days` days, one entry per
+    user, each with a breakdown by task. The work logs are aggregated in a single grouped query, and
+    carry their tasks' names, so tasks that have since been deleted are still named."""
+    since = timezone.now() - timezone.timedelta(days=days)
+    # Tasks can be renamed, so their logs may not all have the same name. Use the most recent one.
+    latest_names = WorkLog.objects.filter(object_id=OuterRef("object_id")).order_by(
+        "-timestamp", "-id"
+    )
+    work_logs = (
+        WorkLog.objects.filter(household_id__in=household_ids, timestamp__gte=since)
+        .order_by()
+        .values("user_id", "object_id")
+        .annotate(
+            task_name=Subquery(latest_names.values("task_name")[:1]),
+            task_type=Max("task_type"),
+            count=Count("id"),
+            completion_time=Sum("completion_time"),
+            grossness=Sum("grossness"),
+            brownie_points=Sum("brownie_points"),
+        )
+    )
+
+    by_user = defaultdict(list)
+    for row in work_logs:
+        by_user[row["user_id"]].append(row)
+
+    # Members who haven't done anything are listed too, as is anyone who did work before leaving
+    users = (
+        get_user_model()
+        .objects.filter(Q(households__in=household_ids) | Q(pk__in=by_user.keys()))
+        .distinct()
+    )
+
+    statistics = []
+    for user_id, username in users.order_by("username").values_list("pk", "username"):
+        rows = by_user.get(user_id, [])
+        count = sum(row["count"] for row in rows)
+        statistics.append(
+            {
+                "id": user_id,
+                "username": username,
+                "completed_tasks": count,
+                "completion_time": sum(
+                    (row["completion_time"] for row in rows), timezone.timedelta()
+                ),
+                "average_grossness": (
+                    sum(row["grossness"] for row in rows) / count if count else None
+                ),
+                "brownie_points": sum(row["brownie_points"] for row in rows),
+                "tasks": [
+                    {
+                        "task_id": row["object_id"],
+                        "task_name": row["task_name"],
+                        "task_type": row["task_type"],
+                        "count": row["count"],
+                        "completion_time": row["completion_time"],
+                        "brownie_points": row["brownie_points"],
+                    }
+                    for row in sorted(rows, key=lambda row: -row["count"])
+                ],
+            }
+        )
+    return statistics
+
+
+def get_task_list_context(tasks):
+    """Precompute the values that task serializers would otherwise query for one task at a time.
+    Pass the result in as serializer context when serializing many tasks at once."""
+    tasks = list(tasks)
+    return {
+        "mean_completion_times": get_mean_completion_times(task.id for task in tasks),
+        "staleness": get_staleness(tasks),
+    }
+
+
 class Invitation(models.Model):
     household = models.ForeignKey("Household", on_delete=models.CASCADE)
     sender = models.ForeignKey(
@@ -418,10 +933,121 @@ class Invitation(models.Model):
         return f"Invitation from {self.sender} to {self.recipient} for {self.household}"
 
 
+@receiver(post_save, sender=DummyTask)
+@receiver(post_save, sender=ScheduledTask)
+@receiver(post_save, sender=FlexibleTask)
+@receiver(post_save, sender=OneShotTask)
+def index_task(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        register_tasks([instance])
+    elif update_fields is None or "household" in update_fields:
+        TaskIndex.objects.filter(pk=instance.pk).exclude(
+            household_id=instance.household_id
+        ).update(household_id=instance.household_id)
+
+
+@receiver(post_delete, sender=DummyTask)
+@receiver(post_delete, sender=ScheduledTask)
+@receiver(post_delete, sender=FlexibleTask)
+@receiver(post_delete, sender=OneShotTask)
+def unindex_task(sender, instance, **kwargs):
+    TaskIndex.objects.filter(pk=instance.pk).delete()
+    TaskCompletionStats.objects.filter(pk=instance.pk).delete()
+
+
+@receiver(post_save, sender=ScheduledTask)
+@receiver(post_save, sender=FlexibleTask)
+@receiver(post_save, sender=OneShotTask)
+@receiver(post_save, sender=WorkLog)
+@receiver(post_delete, sender=ScheduledTask)
+@receiver(post_delete, sender=FlexibleTask)
+@receiver(post_delete, sender=OneShotTask)
+@receiver(post_delete, sender=WorkLog)
+def forget_household_responses(sender, instance, **kwargs):
+    # Work logs of deleted households have none
+    if instance.household_id is not None:
+        response_cache.invalidate(instance.household_id)
+
+
+# Tell anyone watching a household that something in it has changed
+
+
+@receiver(post_save, sender=ScheduledTask)
+@receiver(post_save, sender=FlexibleTask)
+@receiver(post_save, sender=OneShotTask)
+def publish_task_saved(sender, instance, created, **kwargs):
+    bump_household_version(instance.household_id, [instance.id])
+    publish_household_event(
+        instance.household_id,
+        "task",
+        action="created" if created else "updated",
+        id=str(instance.id),
+    )
+
+
+@receiver(post_delete, sender=ScheduledTask)
+@receiver(post_delete, sender=FlexibleTask)
+@receiver(post_delete, sender=OneShotTask)
+def publish_task_deleted(sender, instance, **kwargs):
+    bump_household_version(instance.household_id)
+    publish_household_event(
+        instance.household_id, "task", action="deleted", id=str(instance.id)
+    )
+
+
+@receiver(post_save, sender=WorkLog)
+def publish_worklog_created(sender, instance, created, **kwargs):
+    # If the task has been deleted, there's no household to tell
+    if not created or instance.content_object is None:
+        return
+
+    bump_household_version(instance.content_object.household_id)
+    publish_household_event(
+        instance.content_object.household_id,
+        "worklog",
+        task=str(instance.object_id),
+        user=instance.user_id,
+    )
+
+
+@receiver(post_save, sender=Invitation)
+def publish_invitation_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    publish_household_event(instance.household_id, "invitation", id=instance.id)
+    # The recipient isn't in the household yet, so tell them directly
+    publish_user_event(
+        instance.recipient_id,
+        "invitation",
+        id=instance.id,
+        household=instance.household_id,
+    )
+
+
 # Serializers have to live here, to avoid circular imports :(
 
 
-class ScheduledTaskSerializer(serializers.ModelSerializer):
+class TaskSerializerMixin:
+    """Reads precomputed values from the serializer context when they are there, and falls back to the
+    per-task properties when they are not (e.g. when serializing a single task)."""
+
+    def get_staleness(self, obj):
+        staleness = self.context.get("staleness")
+        if staleness is None or obj.id not in staleness:
+            return obj.staleness
+        return staleness[obj.id]
+
+    def get_mean_completion_time(self, obj):
+        mean_completion_times = self.context.get("mean_completion_times")
+        if mean_completion_times is None:
+            return obj.mean_completion_time
+        return mean_completion_times.get(obj.id, 0.0)
+
+
+class ScheduledTaskSerializer(
+    ProfanityBatchMixin, TaskSerializerMixin, serializers.ModelSerializer
+):
     staleness = serializers.SerializerMethodField()
     next_due = serializers.SerializerMethodField()
     last_due = serializers.SerializerMethodField()
@@ -434,20 +1060,16 @@ class ScheduledTaskSerializer(serializers.ModelSerializer):
         model = ScheduledTask
         fields = "__all__"
 
-    def get_staleness(self, obj):
-        return obj.staleness
-
     def get_next_due(self, obj):
-        return obj.next_due
+        return obj.get_due_times()[1]
 
     def get_last_due(self, obj):
-        return obj.last_due
-
-    def get_mean_completion_time(self, obj):
-        return obj.mean_completion_time
+        return obj.get_due_times()[0]
 
 
-class FlexibleTaskSerializer(serializers.ModelSerializer):
+class FlexibleTaskSerializer(
+    ProfanityBatchMixin, TaskSerializerMixin, serializers.ModelSerializer
+):
     staleness = serializers.SerializerMethodField()
     mean_completion_time = serializers.SerializerMethodField()
     description = serializers.CharField(
@@ -458,14 +1080,10 @@ class FlexibleTaskSerializer(serializers.ModelSerializer):
         model = FlexibleTask
         fields = "__all__"
 
-    def get_staleness(self, obj):
-        return obj.staleness
-
-    def get_mean_completion_time(self, obj):
-        return obj.mean_completion_time
-
 
-class OneShotTaskSerializer(serializers.ModelSerializer):
+class OneShotTaskSerializer(
+    ProfanityBatchMixin, TaskSerializerMixin, serializers.ModelSerializer
+):
     staleness = serializers.SerializerMethodField()
     mean_completion_time = serializers.SerializerMethodField()
     description = serializers.CharField(
@@ -476,12 +1094,6 @@ class OneShotTaskSerializer(serializers.ModelSerializer):
         model = OneShotTask
         fields = "__all__"
 
-    def get_staleness(self, obj):
-        return obj.staleness
-
-    def get_mean_completion_time(self, obj):
-        return obj.mean_completion_time
-
 
 class DummyTaskSerializer(serializers.ModelSerializer):
     staleness = serializers.SerializerMethodField()
@@ -498,36 +1110,43 @@ class DummyTaskSerializer(serializers.ModelSerializer):
         return obj.mean_completion_time
 
 
+# Add other task types here as needed. Don't forget!!
+TASK_SERIALIZERS = {
+    FlexibleTask: FlexibleTaskSerializer,
+    ScheduledTask: ScheduledTaskSerializer,
+    OneShotTask: OneShotTaskSerializer,
+    DummyTask: DummyTaskSerializer,
+}
+
+
 def get_serializer_for_task(
     task_instance: FlexibleTask | ScheduledTask | OneShotTask | DummyTask,
 ) -> FlexibleTaskSerializer | ScheduledTaskSerializer | OneShotTaskSerializer | DummyTaskSerializer:
     # Return the appropriate serializer based on the type of task_instance
-    if isinstance(task_instance, FlexibleTask):
-        return FlexibleTaskSerializer
-    if isinstance(task_instance, ScheduledTask):
-        return ScheduledTaskSerializer
-    if isinstance(task_instance, OneShotTask):
-        return OneShotTaskSerializer
-    if isinstance(DummyTask):
-        return DummyTaskSerializer
+    try:
+        return TASK_SERIALIZERS[type(task_instance)]
+    except KeyError:
+        raise TypeError("Task instance is not a valid task type.")
 
-    # Add other conditions for other task types. Don't forget!!
 
-    raise TypeError("Task instance is not a valid task type.")
+class AllTasksSerializer(serializers.BaseSerializer):
+    """Serializes any kind of task instance, tagging it with its content type.
 
+    The instance is serialized as-is, so callers must pass in the concrete task objects
+    rather than IDs. ContentType lookups go through the ContentType manager cache, so
+    listing a household costs the same number of queries no matter how many tasks it has.
+    """
 
-class AllTasksSerializer(serializers.BaseSerializer):
     def to_representation(self, obj):
-        task, type = get_task_by_id(obj.id)
-        if task is None:
-            raise serializers.ValidationError("Task with the given ID does not exist.")
-
         try:
-            serialized_data = get_serializer_for_task(task)(task).data
-            serialized_data["type"] = type.model
+            serialized_data = get_serializer_for_task(obj)(
+                obj, context=self.context
+            ).data
         except TypeError:
             raise serializers.ValidationError("Failed to serialize task.")
 
+        serialized_data["type"] = ContentType.objects.get_for_model(obj).model
+
         return serialized_data
 
 
@@ -538,6 +1157,7 @@ class WorkLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkLog
         fields = (
+            "id",
             "task_id",
             "user",
             "completion_time",
@@ -546,8 +1166,16 @@ class WorkLogSerializer(serializers.ModelSerializer):
             "timestamp",
             "content_type",
             "object_id",
+            "task_name",
+            "task_type",
+        )
+        read_only_fields = (
+            "timestamp",
+            "content_type",
+            "object_id",
+            "task_name",
+            "task_type",
         )
-        read_only_fields = ("timestamp", "content_type", "object_id")
 
     def create(self, validated_data):
         task_id = validated_data.pop("task_id")
@@ -565,42 +1193,52 @@ class WorkLogSerializer(serializers.ModelSerializer):
         return super(WorkLogSerializer, self).create(validated_data)
 
 
-class UserStatisticsSerializer(serializers.ModelSerializer):
-    completed_tasks = serializers.SerializerMethodField()
-    brownie_points = serializers.IntegerField(source="brownie_point_credit")
+class WorkLogItemSerializer(serializers.Serializer):
+    """One work log in a bulk submission. Tasks and users are checked for the whole batch at once by
+    the view, rather than one at a time here."""
 
-    class Meta:
-        model = get_user_model()
-        fields = ("username", "completed_tasks", "brownie_points")
+    task_id = serializers.UUIDField()
+    user = serializers.IntegerField()
+    completion_time = serializers.DurationField()
+    grossness = serializers.FloatField(min_value=0, max_value=5)
+    brownie_points = serializers.IntegerField()
+    # When the task was done, for work logged offline and sent later. Defaults to now.
+    timestamp = serializers.DateTimeField(required=False)
 
-    def get_completed_tasks(self, obj):
-        # Get the logs for the user, from the last 30 days
-        work_logs = WorkLog.objects.filter(
-            user=obj, timestamp__gte=timezone.now() - timezone.timedelta(days=30)
-        )
+    def validate_timestamp(self, value):
+        if value > timezone.now():
+            raise serializers.ValidationError("Can't be in the future.")
+        return value
 
-        # If the task was deleted, fetch the data from the JSON field. If the task still exists, get it from the task object
-        return [
-            {
-                "task_name": log.task.task_name
-                if log.task
-                else log.task_json["task_name"],
-                "completion_time": log.completion_time.total_seconds(),
-                "grossness": log.grossness,
-                "brownie_points": log.brownie_points,
-                "timestamp": log.timestamp,
-            }
-            for log in work_logs
-        ]
+
+class TaskStatisticsSerializer(serializers.Serializer):
+    task_id = serializers.UUIDField()
+    task_name = serializers.CharField()
+    task_type = serializers.CharField()
+    count = serializers.IntegerField()
+    completion_time = serializers.DurationField()
+    brownie_points = serializers.IntegerField()
+
+
+class UserStatisticsSerializer(serializers.Serializer):
+    """Serializes the output of get_user_statistics"""
+
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    completed_tasks = serializers.IntegerField()
+    completion_time = serializers.DurationField()
+    average_grossness = serializers.FloatField(allow_null=True)
+    brownie_points = serializers.IntegerField()
+    tasks = TaskStatisticsSerializer(many=True)
 
 
-class HouseholdSerializer(serializers.ModelSerializer):
+class HouseholdSerializer(ProfanityBatchMixin, serializers.ModelSerializer):
     class Meta:
         model = Household
         fields = "__all__"
 
 
-class CreateHouseholdSerializer(serializers.ModelSerializer):
+class CreateHouseholdSerializer(ProfanityBatchMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         max_length=255,
         validators=[
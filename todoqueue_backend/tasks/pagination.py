@@ -0,0 +1,88 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Pages through a queryset newest first, by timestamp and then primary key.
+
+    Each page carries on from the last row of the previous one, which the database can find straight
+    from an index on the timestamp. Unlike offset pagination, nothing has to count past the rows before
+    the page, so every page costs the same however far back it is.
+    """
+
+    timestamp_field = "timestamp"
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        position = f"{getattr(obj, self.timestamp_field).isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(position.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, cursor):
+        try:
+            position = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
+            timestamp, pk = position.split("|")
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f"{self.timestamp_field}__lt": timestamp})
+                | Q(**{self.timestamp_field: timestamp, "pk__lt": pk})
+            )
+
+        # Fetch one extra row to find out if there's another page
+        page = list(
+            queryset.order_by(f"-{self.timestamp_field}", "-pk")[: page_size + 1]
+        )
+        self.next_cursor = (
+            self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        )
+        return page[:page_size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,14 @@
+from rest_framework.permissions import BasePermission
+
+from .membership import is_member
+from .models import Household
+
+
+class IsHouseholdMember(BasePermission):
+    """Only allows access to households, and things in a household, that the user is a member of"""
+
+    message = "Not allowed."
+
+    def has_object_permission(self, request, view, obj):
+        household_id = obj.pk if isinstance(obj, Household) else obj.household_id
+        return is_member(request.user, household_id)
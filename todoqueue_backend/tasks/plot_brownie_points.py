@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-from utils import bp_function as calc_Z
+from utils import bp_function_batch as calc_Z
 
 # def calc_Z(A, B):
 #     return np.sqrt(A) * np.sqrt(B)
@@ -13,9 +13,8 @@ Bmin, Bmax = 0, 5
 # Create a meshgrid for A and B
 A, B = np.meshgrid(np.linspace(Amin, Amax, 100), np.linspace(Bmin, Bmax, 100))
 
-# Compute Z values. Function needs to be vectorised
-vect_func = np.vectorize(calc_Z)
-Z = vect_func(A, B)
+# Compute Z values, all in one go
+Z = calc_Z(A, B, rng=np.random.default_rng(0))
 
 # Create a surface plot
 fig = plt.figure()
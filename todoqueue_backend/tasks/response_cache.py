@@ -0,0 +1,101 @@
+"""A cache of rendered JSON responses for household task lists.
+
+Serializing a task list is the bulk of the work of answering a poll, and the result is the same for every
+member of the household. So the rendered bytes are stored in the Django cache, and handed straight back
+until the household changes or the staleness window moves on. Entries are deleted as soon as a task or
+work log in the household is saved or deleted. Bulk writes don't send signals, but they do bump the
+household's version, which every entry is checked against before it's served.
+
+Hits and misses are counted in the cache too, so that they add up across workers. See get_metrics().
+"""
+
+import time
+from logging import getLogger
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+logger = getLogger(__name__)
+
+# Every kind of response that's cached
+NAMES = ("tasks",)
+
+
+def _cache_key(name, household_id):
+    return f"household-response-{name}-{household_id}"
+
+
+def _metric_key(name, outcome):
+    return f"response-cache-{name}-{outcome}"
+
+
+def _window():
+    # Staleness drifts with the clock, so responses only last as long as the household's ETag does
+    return int(time.time() // settings.STALENESS_ETAG_WINDOW)
+
+
+def _count(name, outcome):
+    key = _metric_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Two workers can both get here first, but add() only lets one of them reset the count
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def cached_json_response(name, household, get_data):
+    """Respond with the rendered JSON cached for this household, if it's still current. Otherwise, render
+    the data from get_data and cache that."""
+    key = _cache_key(name, household.id)
+    window = _window()
+
+    entry = cache.get(key)
+    if (
+        entry is not None
+        and entry["version"] == household.version
+        and entry["window"] == window
+    ):
+        logger.debug(f"Serving cached {name} response for household {household.id}")
+        _count(name, "hits")
+        content = entry["content"]
+        outcome = "HIT"
+    else:
+        _count(name, "misses")
+        content = JSONRenderer().render(get_data())
+        cache.set(
+            key,
+            {"version": household.version, "window": window, "content": content},
+            settings.STALENESS_ETAG_WINDOW,
+        )
+        outcome = "MISS"
+
+    response = HttpResponse(content, content_type="application/json")
+    response["X-Cache"] = outcome
+    return response
+
+
+def invalidate(household_id):
+    """Forget the cached responses for a household. This happens straight away, and again once the
+    current transaction commits, so that nothing rendered from before the commit survives it.
+    """
+    keys = [_cache_key(name, household_id) for name in NAMES]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_metrics():
+    """The number of hits and misses for each kind of cached response"""
+    counts = cache.get_many(
+        [_metric_key(name, outcome) for name in NAMES for outcome in ("hits", "misses")]
+    )
+    return {
+        name: {
+            outcome: counts.get(_metric_key(name, outcome), 0)
+            for outcome in ("hits", "misses")
+        }
+        for name in NAMES
+    }
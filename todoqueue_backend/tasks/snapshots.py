@@ -0,0 +1,130 @@
+"""Precomputed task lists for households that people are looking at.
+
+Listing a household's tasks means working out every task's staleness and due times, which gets slower with
+more tasks and more complicated cron schedules. Instead, the run_staleness_scheduler command recomputes
+the task lists of active households in the background, and stores them in the cache. A household is
+active while someone has listed its tasks within the last HOUSEHOLD_ACTIVE_TIMEOUT seconds.
+
+A snapshot is only served while the household's version matches the one it was computed from, and for at
+most STALENESS_SNAPSHOT_MAX_AGE seconds, since staleness drifts with the clock. Otherwise it is computed on
+the request, and stored for the next one, so everything still works without the scheduler running.
+"""
+
+import threading
+import time
+from logging import getLogger
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .fast_serializers import serialize_task_querysets
+from .models import FlexibleTask, Household, OneShotTask, ScheduledTask
+
+logger = getLogger(__name__)
+
+ACTIVE_HOUSEHOLDS_KEY = "active-households"
+
+# When this process last marked each household as active, so it needn't touch the cache every request
+_lock = threading.Lock()
+_marked = {}
+
+
+def _snapshot_key(household_id):
+    return f"household-tasks-{household_id}"
+
+
+def get_household_task_querysets(household):
+    """The tasks that are listed for a household, by type. Only incomplete one-shots are listed."""
+    return [
+        ScheduledTask.objects.filter(household=household),
+        FlexibleTask.objects.filter(household=household),
+        OneShotTask.objects.filter(household=household, has_completed=False),
+    ]
+
+
+def get_household_tasks(household):
+    """Every task that's listed for a household"""
+    return [
+        task
+        for queryset in get_household_task_querysets(household)
+        for task in queryset
+    ]
+
+
+def compute_task_list(household):
+    """Serialize a household's task list, as the all-tasks endpoint returns it"""
+    return serialize_task_querysets(
+        get_household_task_querysets(household), with_type=True
+    )
+
+
+def store_snapshot(household):
+    """Compute a household's task list and store it in the cache. Returns the task list."""
+    tasks = compute_task_list(household)
+    cache.set(
+        _snapshot_key(household.id),
+        {"version": household.version, "computed_at": time.time(), "tasks": tasks},
+        settings.STALENESS_SNAPSHOT_MAX_AGE,
+    )
+    return tasks
+
+
+def get_task_list(household):
+    """A household's task list, from its snapshot if there's a current one"""
+    snapshot = cache.get(_snapshot_key(household.id))
+    if (
+        snapshot is not None
+        and snapshot["version"] == household.version
+        and time.time() - snapshot["computed_at"] < settings.STALENESS_SNAPSHOT_MAX_AGE
+    ):
+        logger.debug(f"Serving the task list snapshot of household {household.id}")
+        return snapshot["tasks"]
+
+    logger.debug(f"No current task list snapshot for household {household.id}")
+    return store_snapshot(household)
+
+
+def mark_active(household_id):
+    """Note that someone is looking at a household, so the scheduler keeps its snapshot fresh"""
+    now = time.time()
+    with _lock:
+        if now - _marked.get(household_id, 0) < settings.HOUSEHOLD_ACTIVE_TIMEOUT / 2:
+            return
+        _marked[household_id] = now
+
+    # Two processes can race to update this, but a household that gets lost is added back as soon as
+    # the process that lost it marks it again
+    active = cache.get(ACTIVE_HOUSEHOLDS_KEY) or {}
+    active[household_id] = now
+    cache.set(ACTIVE_HOUSEHOLDS_KEY, active, settings.HOUSEHOLD_ACTIVE_TIMEOUT)
+
+
+def get_active_household_ids():
+    """The households that someone has looked at recently. Forgets about the rest."""
+    active = cache.get(ACTIVE_HOUSEHOLDS_KEY) or {}
+    cutoff = time.time() - settings.HOUSEHOLD_ACTIVE_TIMEOUT
+    current = {
+        household_id: seen for household_id, seen in active.items() if seen >= cutoff
+    }
+    if len(current) < len(active):
+        cache.set(ACTIVE_HOUSEHOLDS_KEY, current, settings.HOUSEHOLD_ACTIVE_TIMEOUT)
+    return list(current)
+
+
+def refresh_active_snapshots():
+    """Recompute the snapshot of every active household. Returns how many were refreshed."""
+    households = Household.objects.filter(pk__in=get_active_household_ids())
+    count = 0
+    for household in households:
+        try:
+            store_snapshot(household)
+            count += 1
+        except Exception as e:
+            logger.error(f"Failed to snapshot household {household.id}. Error: {e}")
+    return count
+
+
+def forget_marks():
+    """Forget which households this process has marked as active"""
+    with _lock:
+        _marked.clear()
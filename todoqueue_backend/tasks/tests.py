@@ -0,0 +1,2164 @@
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+import croniter
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from logging import getLogger
+
+from todoqueue_backend import profanity
+
+logger = getLogger(__name__)
+
+from .models import (
+    AllTasksSerializer,
+    BrowniePointBalance,
+    BrowniePointRollup,
+    FlexibleTask,
+    Household,
+    Invitation,
+    OneShotTask,
+    ScheduledTask,
+    TaskCompletionStats,
+    TaskIndex,
+    WorkLog,
+    bump_household_version,
+    credit_brownie_points,
+    get_mean_completion_times,
+    get_task_by_id,
+    get_task_list_context,
+)
+from . import response_cache, snapshots
+from .events import InProcessBroker, get_broker
+from .membership import is_member
+from .staleness import get_household_staleness, get_staleness
+from .utils import bp_function, bp_function_batch, get_cron_due_times
+
+
+# Matches a single-row lookup of a task by its primary key, in any SQL quoting style
+TASK_BY_ID_QUERY = re.compile(
+    r"""FROM ["`]tasks_(dummytask|flexibletask|scheduledtask|oneshottask)["`] """
+    r"""WHERE ["`]tasks_\w+["`]\.["`]id["`] ="""
+)
+
+
+class HouseholdTestCase(APITestCase):
+    """Base class that sets up a household with an authenticated member"""
+
+    def setUp(self):
+        # Nothing cached by one test should be seen by another
+        cache.clear()
+        snapshots.forget_marks()
+
+        self.user = get_user_model().objects.create_user(
+            email="member@example.com", username="member", password="testpass123"
+        )
+        self.household = Household.objects.create(name="Test household")
+        self.household.users.add(self.user)
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+
+    def create_tasks(self, count):
+        """Create `count` tasks of each type in the test household"""
+        for i in range(count):
+            FlexibleTask.objects.create(
+                task_name=f"Flexible {i}",
+                household=self.household,
+                min_interval=timedelta(hours=1),
+                max_interval=timedelta(hours=2),
+            )
+            ScheduledTask.objects.create(
+                task_name=f"Scheduled {i}",
+                household=self.household,
+                cron_schedule="0 9 * * *",
+                max_interval=timedelta(hours=3),
+            )
+            OneShotTask.objects.create(
+                task_name=f"One-shot {i}",
+                household=self.household,
+                due_date=timezone.now() + timedelta(days=1),
+                time_to_complete=timedelta(hours=1),
+            )
+
+    def log_work(self, task, minutes, user=None):
+        return WorkLog.objects.create(
+            user=user or self.user,
+            content_object=task,
+            completion_time=timedelta(minutes=minutes),
+            grossness=1,
+            brownie_points=10,
+        )
+
+
+class AllTasksViewSetTests(HouseholdTestCase):
+    def list_tasks(self):
+        return self.client.get(
+            reverse("all-tasks-list"), {"household": self.household.id}
+        )
+
+    def test_list_includes_type(self):
+        self.create_tasks(1)
+        response = self.list_tasks()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(task["type"] for task in response.json()),
+            ["flexibletask", "oneshottask", "scheduledtask"],
+        )
+
+    def test_list_does_not_refetch_tasks(self):
+        self.create_tasks(5)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.list_tasks()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 15)
+
+        refetches = [q["sql"] for q in queries if TASK_BY_ID_QUERY.search(q["sql"])]
+        self.assertEqual(refetches, [])
+
+    def test_list_query_count_is_independent_of_task_count(self):
+        def count_queries():
+            # Compute the list, rather than serving it from a cache
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.list_tasks()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.create_tasks(1)
+        for task in FlexibleTask.objects.all():
+            self.log_work(task, 5)
+        # The first request caches the household's members
+        self.list_tasks()
+        few_tasks = count_queries()
+
+        self.create_tasks(4)
+        for task in FlexibleTask.objects.all():
+            self.log_work(task, 5)
+        many_tasks = count_queries()
+
+        self.assertEqual(few_tasks, many_tasks)
+
+    def test_retrieve(self):
+        self.create_tasks(1)
+        task = FlexibleTask.objects.get()
+        response = self.client.get(reverse("all-tasks-detail", args=[task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["task_name"], task.task_name)
+        self.assertEqual(response.data["type"], "flexibletask")
+
+
+class MeanCompletionTimeTests(HouseholdTestCase):
+    def test_mean_completion_times(self):
+        self.create_tasks(1)
+        task = FlexibleTask.objects.get()
+        self.log_work(task, 10)
+        self.log_work(task, 20)
+
+        with self.assertNumQueries(1):
+            mean_times = get_mean_completion_times([task.id])
+        self.assertEqual(mean_times, {task.id: 900.0})
+        self.assertEqual(task.mean_completion_time, 900.0)
+
+    def test_no_work_logs(self):
+        self.create_tasks(1)
+        task = ScheduledTask.objects.get()
+        self.assertEqual(get_mean_completion_times([task.id]), {})
+        self.assertEqual(task.mean_completion_time, 0.0)
+
+    def test_list_endpoints_use_aggregate(self):
+        self.create_tasks(2)
+        for task in FlexibleTask.objects.all():
+            self.log_work(task, 2)
+
+        response = self.client.get(
+            reverse("flexibletask-list"), {"household": self.household.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task["mean_completion_time"] for task in response.data], [120.0, 120.0]
+        )
+
+        response = self.client.get(
+            reverse("household-list-tasks", args=[self.household.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(task["mean_completion_time"] for task in response.json()),
+            [0.0, 0.0, 0.0, 0.0, 120.0, 120.0],
+        )
+
+
+class ScheduledTaskDueTimeTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = ScheduledTask.objects.create(
+            task_name="Bins",
+            household=self.household,
+            cron_schedule="0 9 * * *",
+            max_interval=timedelta(hours=3),
+        )
+
+    def test_due_times_match_croniter(self):
+        now = timezone.now()
+        last_due, next_due = self.task.get_due_times(now)
+        local_now = now.astimezone()
+        self.assertEqual(
+            last_due,
+            croniter.croniter("0 9 * * *", local_now, ret_type=datetime).get_prev(),
+        )
+        self.assertEqual(
+            next_due,
+            croniter.croniter("0 9 * * *", local_now, ret_type=datetime).get_next(),
+        )
+
+    def test_due_times_are_persisted(self):
+        task = ScheduledTask.objects.get(id=self.task.id)
+        self.assertIsNotNone(task.last_due)
+        self.assertIsNotNone(task.next_due)
+
+        # Inside the stored window, nothing is recomputed or written
+        with mock.patch("tasks.models.get_cron_due_times") as get_due_times:
+            with self.assertNumQueries(0):
+                task.get_due_times(task.next_due - timedelta(seconds=1))
+            get_due_times.assert_not_called()
+
+    def test_due_times_recomputed_after_boundary(self):
+        task = ScheduledTask.objects.get(id=self.task.id)
+        old_next_due = task.next_due
+
+        with self.assertNumQueries(1):
+            last_due, next_due = task.get_due_times(old_next_due + timedelta(seconds=1))
+        self.assertEqual(last_due, old_next_due)
+        self.assertEqual(next_due, old_next_due + timedelta(days=1))
+
+        task.refresh_from_db()
+        self.assertEqual(task.last_due, old_next_due)
+
+    def test_changing_schedule_refreshes_due_times(self):
+        self.task.cron_schedule = "*/5 * * * *"
+        self.task.save()
+        task = ScheduledTask.objects.get(id=self.task.id)
+        self.assertLessEqual(task.next_due - task.last_due, timedelta(minutes=5))
+
+    def test_cron_evaluation_is_cached(self):
+        now = timezone.now().replace(second=10)
+        with mock.patch(
+            "tasks.utils.croniter.croniter", wraps=croniter.croniter
+        ) as cron:
+            get_cron_due_times("17 4 * * 1", now)
+            get_cron_due_times("17 4 * * 1", now + timedelta(seconds=20))
+        self.assertEqual(cron.call_count, 2)
+
+
+class BatchStalenessTests(HouseholdTestCase):
+    """The batch staleness engine must agree exactly with the per-object properties"""
+
+    def setUp(self):
+        super().setUp()
+        self.rng = random.Random(1234)
+        self.now = timezone.now()
+
+    def random_time(self, spread=timedelta(days=3)):
+        return self.now + self.rng.uniform(-1, 1) * spread
+
+    def random_duration(self, spread=timedelta(days=2)):
+        # Include some zero and exactly-equal durations to exercise the boundaries
+        return self.rng.choice(
+            [timedelta(0), timedelta(hours=1), self.rng.random() * spread]
+        )
+
+    def assertMatchesProperties(self, tasks):
+        with mock.patch("django.utils.timezone.now", return_value=self.now):
+            batch = get_staleness(tasks, self.now)
+            checked = 0
+            for task in tasks:
+                try:
+                    expected = float(task.staleness)
+                except ZeroDivisionError:
+                    # The properties can't cope with zero-length intervals, the batch engine can
+                    continue
+                self.assertEqual(expected.hex(), batch[task.id].hex(), task)
+                checked += 1
+        self.assertGreater(checked, len(tasks) // 2)
+
+    def test_flexible_tasks(self):
+        tasks = []
+        for _ in range(500):
+            min_interval = self.random_duration()
+            tasks.append(
+                FlexibleTask(
+                    household=self.household,
+                    last_completed=self.random_time(),
+                    min_interval=min_interval,
+                    max_interval=min_interval + self.random_duration(),
+                    frozen=self.rng.random() < 0.1,
+                )
+            )
+        self.assertMatchesProperties(tasks)
+
+    def test_scheduled_tasks(self):
+        schedules = ["0 * * * *", "*/15 * * * *", "30 9 * * *", "0 18 * * 1,4"]
+        tasks = [
+            ScheduledTask(
+                household=self.household,
+                last_completed=self.random_time(),
+                cron_schedule=self.rng.choice(schedules),
+                max_interval=self.random_duration(),
+                frozen=self.rng.random() < 0.1,
+            )
+            for _ in range(500)
+        ]
+        self.assertMatchesProperties(tasks)
+
+    def test_oneshot_tasks(self):
+        tasks = [
+            OneShotTask(
+                household=self.household,
+                due_date=self.random_time(),
+                due_before=self.rng.random() < 0.5,
+                time_to_complete=self.random_duration(),
+                frozen=self.rng.random() < 0.1,
+                has_completed=self.rng.random() < 0.1,
+            )
+            for _ in range(500)
+        ]
+        self.assertMatchesProperties(tasks)
+
+    def test_household_staleness(self):
+        self.create_tasks(3)
+        staleness = get_household_staleness(self.household.id)
+        self.assertEqual(len(staleness), 9)
+        self.assertEqual(get_household_staleness(), staleness)
+
+    def test_single_and_list_serialize_the_same(self):
+        self.create_tasks(2)
+        # One of each type frozen, and the other long overdue
+        for model in (FlexibleTask, ScheduledTask, OneShotTask):
+            frozen, overdue = model.objects.all()
+            frozen.frozen = True
+            frozen.save()
+        FlexibleTask.objects.filter(frozen=False).update(
+            last_completed=self.now - timedelta(days=10)
+        )
+        ScheduledTask.objects.filter(frozen=False).update(
+            last_completed=self.now - timedelta(days=400),
+            cron_schedule="0 0 1 1 *",
+            last_due=None,
+            next_due=None,
+        )
+        OneShotTask.objects.filter(frozen=False).update(
+            due_date=self.now - timedelta(days=10)
+        )
+
+        tasks = snapshots.get_household_tasks(self.household)
+        with mock.patch("django.utils.timezone.now", return_value=self.now):
+            context = get_task_list_context(tasks)
+            for task in tasks:
+                single = AllTasksSerializer(task).data
+                listed = AllTasksSerializer(task, context=context).data
+                self.assertIn(single["staleness"], (0.0, 1.0))
+                self.assertEqual(
+                    JSONRenderer().render(single["staleness"]),
+                    JSONRenderer().render(listed["staleness"]),
+                    task,
+                )
+
+
+class EventTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+        self.broker = mock.Mock()
+        patcher = mock.patch("tasks.events.get_broker", return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def published(self):
+        return [call.args for call in self.broker.publish.call_args_list]
+
+    def test_events_wait_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.save()
+        self.assertEqual(self.published(), [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            self.published(),
+            [
+                (
+                    f"household-{self.household.id}",
+                    {
+                        "type": "task",
+                        "household": self.household.id,
+                        "action": "updated",
+                        "id": str(self.task.id),
+                    },
+                )
+            ],
+        )
+
+    def test_toggle_frozen_publishes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("toggle_frozen", args=[self.task.id]))
+        self.assertEqual(self.published()[0][1]["type"], "task")
+
+    def test_dismiss_task_publishes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("dismiss_task", args=[self.task.id]))
+        self.assertEqual(self.published()[0][1]["type"], "task")
+
+    def test_worklog_publishes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.log_work(self.task, 5)
+        event_types = [event["type"] for _, event in self.published()]
+        self.assertIn("worklog", event_types)
+
+    def test_invitation_publishes_to_household_and_recipient(self):
+        recipient = get_user_model().objects.create_user(
+            email="invitee@example.com", username="invitee", password="testpass123"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Invitation.objects.create(
+                household=self.household, sender=self.user, recipient=recipient
+            )
+        channels = [channel for channel, _ in self.published()]
+        self.assertEqual(
+            channels, [f"household-{self.household.id}", f"user-{recipient.id}"]
+        )
+
+
+class InProcessBrokerTests(APITestCase):
+    def test_publish_from_another_thread(self):
+        broker = InProcessBroker()
+
+        async def receive():
+            subscription = await broker.subscribe(["household-1"])
+            publisher = threading.Thread(
+                target=broker.publish, args=("household-1", {"type": "task"})
+            )
+            publisher.start()
+            event = await subscription.get(timeout=5)
+            nothing = await subscription.get(timeout=0.01)
+            await subscription.close()
+            publisher.join()
+            return event, nothing
+
+        event, nothing = asyncio.run(receive())
+        self.assertEqual(event, {"type": "task"})
+        self.assertIsNone(nothing)
+        self.assertEqual(dict(broker._subscriptions), {})
+
+
+class EventStreamViewTests(HouseholdTestCase):
+    def test_needs_asgi(self):
+        response = self.client.get(reverse("event_stream"))
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    def get_ticket(self):
+        response = self.client.post(reverse("event_stream_ticket"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["ticket"]
+
+    async def test_stream(self):
+        ticket = await sync_to_async(self.get_ticket)()
+        url = reverse("event_stream")
+
+        response = await self.async_client.get(url, {"household": self.household.id})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(
+            url, {"household": self.household.id, "ticket": ticket}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunk = await anext(aiter(response.streaming_content))
+        self.assertEqual(chunk, b"retry: 5000\n\n")
+
+    async def test_stream_ends_after_max_age(self):
+        token = str(AccessToken.for_user(self.user))
+        with override_settings(EVENT_STREAM_MAX_AGE=0.1, EVENT_STREAM_HEARTBEAT=0.05):
+            response = await self.async_client.get(
+                reverse("event_stream"),
+                {"household": self.household.id},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks[0], b"retry: 5000\n\n")
+        self.assertEqual(set(chunks[1:]), {b": keepalive\n\n"})
+        self.assertEqual(dict(get_broker()._subscriptions), {})
+
+    async def test_stream_with_authorization_header(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            reverse("event_stream"), headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_rejects_access_tokens_and_expired_tickets(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            reverse("event_stream"), {"token": token}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Access tokens aren't tickets either
+        response = await self.async_client.get(
+            reverse("event_stream"), {"ticket": token}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        ticket = await sync_to_async(self.get_ticket)()
+        with override_settings(EVENT_STREAM_TICKET_MAX_AGE=-1):
+            response = await self.async_client.get(
+                reverse("event_stream"), {"ticket": ticket}
+            )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ticket_needs_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(reverse("event_stream_ticket"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_non_member(self):
+        outsider = await get_user_model().objects.acreate(
+            email="outsider@example.com", username="outsider"
+        )
+        token = str(AccessToken.for_user(outsider))
+        response = await self.async_client.get(
+            reverse("event_stream"),
+            {"household": self.household.id},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ConditionalGetTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+
+    def get(self, url, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def all_tasks_url(self):
+        return reverse("all-tasks-list") + f"?household={self.household.id}"
+
+    def test_unchanged_household_is_not_modified(self):
+        for url in [
+            self.all_tasks_url(),
+            reverse("household-list-users", args=[self.household.id]),
+            reverse("household-list-tasks", args=[self.household.id]),
+        ]:
+            response = self.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response["ETag"]
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get(url, etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], etag)
+            self.assertFalse(
+                any("_flexibletask" in query["sql"] for query in queries), url
+            )
+
+    def assertChangesETag(self, change):
+        etag = self.get(self.all_tasks_url())["ETag"]
+        change()
+        response = self.get(self.all_tasks_url(), etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_task_write_changes_etag(self):
+        task = FlexibleTask.objects.first()
+        self.assertChangesETag(lambda: task.save())
+
+    def test_task_delete_changes_etag(self):
+        self.assertChangesETag(lambda: FlexibleTask.objects.first().delete())
+
+    def test_worklog_changes_etag(self):
+        self.assertChangesETag(lambda: self.log_work(FlexibleTask.objects.first(), 5))
+
+    def test_membership_changes_etag(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="testpass123"
+        )
+        self.assertChangesETag(lambda: self.household.users.add(other))
+        self.assertChangesETag(lambda: other.households.remove(self.household))
+
+    def test_staleness_window_changes_etag(self):
+        with self.settings(STALENESS_ETAG_WINDOW=60):
+            with mock.patch("tasks.views.time.time", return_value=1000.0):
+                etag = self.get(self.all_tasks_url())["ETag"]
+                response = self.get(self.all_tasks_url(), etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            with mock.patch("tasks.views.time.time", return_value=1000.0 + 60):
+                response = self.get(self.all_tasks_url(), etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_saving_stale_household_keeps_version(self):
+        household = Household.objects.get(id=self.household.id)
+        FlexibleTask.objects.first().save()
+        version = Household.objects.get(id=self.household.id).version
+        self.assertGreater(version, household.version)
+
+        household.name = "Renamed"
+        household.save()
+        household.refresh_from_db()
+        self.assertEqual(household.name, "Renamed")
+        self.assertEqual(household.version, version)
+
+
+class ProfanityTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        profanity.clear_cache()
+        self.addCleanup(profanity.clear_cache)
+
+        self.classified = []
+
+        def predict_prob(texts):
+            self.classified.append(list(texts))
+            return [0.9 if "rude" in text else 0.1 for text in texts]
+
+        patcher = mock.patch(
+            "todoqueue_backend.profanity._get_classifier", return_value=predict_prob
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_task(self, task_name, description):
+        return self.client.post(
+            reverse("flexibletask-list"),
+            {
+                "task_name": task_name,
+                "description": description,
+                "household": self.household.id,
+                "min_interval": "01:00:00",
+                "max_interval": "02:00:00",
+            },
+            format="json",
+        )
+
+    def test_request_is_classified_in_one_batch(self):
+        response = self.create_task("Hoover", "The stairs too")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.classified), 1)
+        self.assertIn("Hoover", self.classified[0])
+        self.assertIn("The stairs too", self.classified[0])
+
+    def test_verdicts_are_remembered(self):
+        self.create_task("Hoover", "The stairs too")
+        self.create_task("Hoover", "The stairs too")
+        self.assertEqual(len(self.classified), 1)
+
+    def test_profanity_is_rejected(self):
+        response = self.create_task("Something rude", "")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("task_name", response.data)
+
+    def test_cache_is_bounded(self):
+        with self.settings(PROFANITY_CACHE_SIZE=2):
+            profanity.prime(["one", "two", "three"])
+            self.assertFalse(profanity.is_profane("three"))
+            self.assertEqual(len(self.classified), 1)
+            self.assertFalse(profanity.is_profane("one"))
+            self.assertEqual(self.classified[-1], ["one"])
+
+
+class BrowniePointBalanceTests(HouseholdTestCase):
+    def balance(self, user=None):
+        return BrowniePointBalance.objects.get(
+            user=user or self.user, household=self.household
+        )
+
+    def test_members_start_with_zero_balance(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="testpass123"
+        )
+        other.households.add(self.household)
+
+        self.assertEqual(self.balance().credit, 0.0)
+        self.assertEqual(self.balance(other).credit, 0.0)
+        self.assertEqual(self.balance(other).debit, 0.0)
+
+    def test_work_log_credits_user(self):
+        self.create_tasks(1)
+        task = FlexibleTask.objects.get()
+        self.log_work(task, 10)
+        self.log_work(task, 20)
+
+        self.assertEqual(self.balance().credit, 20.0)
+
+    def test_credit_is_an_increment(self):
+        # Saving a stale copy of the balance must not be how credit is applied
+        stale = self.balance()
+        credit_brownie_points(self.user.id, self.household.id, 5)
+        credit_brownie_points(self.user.id, self.household.id, 7)
+
+        self.assertEqual(stale.credit, 0.0)
+        self.assertEqual(self.balance().credit, 12.0)
+
+    def test_credit_creates_missing_balance(self):
+        BrowniePointBalance.objects.all().delete()
+        credit_brownie_points(self.user.id, self.household.id, 3)
+
+        self.assertEqual(self.balance().credit, 3.0)
+
+    def test_users_list_shows_balances_by_household(self):
+        credit_brownie_points(self.user.id, self.household.id, 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("household-list-users", args=[self.household.id])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        (user,) = response.data
+        self.assertEqual(user["brownie_point_credit"], {str(self.household.id): 4.0})
+        self.assertEqual(user["brownie_point_debit"], {str(self.household.id): 0.0})
+
+        # Balances are prefetched, not fetched per user
+        balance_queries = [
+            q for q in queries.captured_queries if "browniepointbalance" in q["sql"]
+        ]
+        self.assertEqual(len(balance_queries), 1)
+
+    def test_pending_invitations_query_count(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("pending_invitations"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries), response.data
+
+        def invite(i):
+            sender = get_user_model().objects.create_user(
+                email=f"sender{i}@example.com", username=f"sender{i}", password="pass"
+            )
+            household = Household.objects.create(name=f"Household {i}")
+            household.users.add(sender)
+            Invitation.objects.create(
+                household=household, sender=sender, recipient=self.user
+            )
+
+        invite(0)
+        one, _ = count_queries()
+        for i in range(1, 5):
+            invite(i)
+        five, invitations = count_queries()
+        self.assertEqual(one, five)
+        self.assertEqual(len(invitations), 5)
+        self.assertEqual(
+            invitations[0]["recipient"]["brownie_point_credit"],
+            {str(self.household.id): 0.0},
+        )
+
+
+class BrowniePointRollupTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+
+    def list_users(self):
+        response = self.client.get(
+            reverse("household-list-users", args=[self.household.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {user["id"]: user for user in response.data}
+
+    def test_work_log_updates_rollup(self):
+        self.log_work(self.task, 10)
+        self.log_work(self.task, 10)
+
+        rollup = BrowniePointRollup.objects.get()
+        self.assertEqual(rollup.user, self.user)
+        self.assertEqual(rollup.household, self.household)
+        self.assertEqual(rollup.day, timezone.localdate())
+        self.assertEqual(rollup.points, 20)
+        self.assertEqual(rollup.count, 2)
+
+    def test_rolling_points_come_from_recent_rollups(self):
+        self.log_work(self.task, 10)
+        BrowniePointRollup.objects.create(
+            user=self.user,
+            household=self.household,
+            day=timezone.localdate() - timedelta(days=30),
+            points=1000,
+            count=1,
+        )
+
+        users = self.list_users()
+        self.assertEqual(users[self.user.id]["rolling_brownie_points"], 10)
+
+    def test_rolling_points_are_per_household(self):
+        other_household = Household.objects.create(name="Other household")
+        other_household.users.add(self.user)
+        other_task = FlexibleTask.objects.create(
+            task_name="Elsewhere",
+            household=other_household,
+            min_interval=timedelta(hours=1),
+            max_interval=timedelta(hours=2),
+        )
+        self.log_work(other_task, 10)
+
+        users = self.list_users()
+        self.assertEqual(users[self.user.id]["rolling_brownie_points"], 0)
+
+    def rollups(self):
+        return {
+            rollup.day: (rollup.points, rollup.count)
+            for rollup in BrowniePointRollup.objects.all()
+        }
+
+    def credit(self, user=None):
+        return BrowniePointBalance.objects.get(
+            user=user or self.user, household=self.household
+        ).credit
+
+    def test_deleting_work_log_takes_back_points(self):
+        self.log_work(self.task, 10)
+        work_log = self.log_work(self.task, 10)
+
+        response = self.client.delete(reverse("worklog-detail", args=[work_log.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.credit(), 10)
+        self.assertEqual(self.rollups(), {timezone.localdate(): (10, 1)})
+        users = self.list_users()
+        self.assertEqual(users[self.user.id]["rolling_brownie_points"], 10)
+
+    def test_editing_work_log_moves_points(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="pass"
+        )
+        self.household.users.add(other_user)
+        work_log = self.log_work(self.task, 10)
+
+        response = self.client.patch(
+            reverse("worklog-detail", args=[work_log.id]), {"brownie_points": 25}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.credit(), 25)
+        self.assertEqual(self.rollups(), {timezone.localdate(): (25, 1)})
+
+        earlier = timezone.now() - timedelta(days=3)
+        work_log.refresh_from_db()
+        work_log.timestamp = earlier
+        work_log.user = other_user
+        work_log.save()
+        self.assertEqual(self.credit(), 0)
+        self.assertEqual(self.credit(other_user), 25)
+        self.assertEqual(
+            {
+                (rollup.user_id, rollup.day): (rollup.points, rollup.count)
+                for rollup in BrowniePointRollup.objects.all()
+            },
+            {
+                (self.user.id, timezone.localdate()): (0, 0),
+                (other_user.id, timezone.localdate(earlier)): (25, 1),
+            },
+        )
+
+    def test_backfill(self):
+        self.log_work(self.task, 10)
+        self.log_work(self.task, 10)
+        old_log = self.log_work(self.task, 10)
+        WorkLog.objects.filter(pk=old_log.pk).update(
+            timestamp=timezone.now() - timedelta(days=3)
+        )
+        BrowniePointRollup.objects.all().delete()
+
+        call_command("backfill_brownie_point_rollups", stdout=open(os.devnull, "w"))
+
+        rollups = {
+            rollup.day: (rollup.points, rollup.count)
+            for rollup in BrowniePointRollup.objects.all()
+        }
+        self.assertEqual(
+            rollups,
+            {
+                timezone.localdate(): (20, 2),
+                timezone.localdate(timezone.now() - timedelta(days=3)): (10, 1),
+            },
+        )
+
+
+class WorkLogIndexTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+        self.log_work(self.task, 10)
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            return " ".join(str(row) for row in cursor.fetchall())
+
+    def assertWorkLogQueriesUseIndex(self, queries, index_name):
+        work_log_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if re.search(r"""FROM ["`]tasks_worklog["`]""", query["sql"])
+        ]
+        self.assertTrue(work_log_queries)
+        for sql in work_log_queries:
+            self.assertIn(index_name, self.query_plan(sql), sql)
+
+    def test_work_log_has_household(self):
+        self.assertEqual(WorkLog.objects.get().household, self.household)
+
+        # Still attributed after the task is gone
+        self.task.delete()
+        self.assertEqual(WorkLog.objects.get().household, self.household)
+
+    def test_task_list_plan(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("all-tasks-list"), {"household": self.household.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWorkLogQueriesUseIndex(queries, "worklog_task_timestamp")
+
+    def test_household_window_plan(self):
+        work_logs = WorkLog.objects.filter(
+            household=self.household,
+            timestamp__gte=timezone.now() - timedelta(days=7),
+        )
+        self.assertIn("worklog_household_timestamp", work_logs.explain())
+
+
+class TaskIndexTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+
+    def test_every_task_is_indexed(self):
+        tasks = [
+            self.household.get_dummy_task(),
+            FlexibleTask.objects.get(),
+            ScheduledTask.objects.get(),
+            OneShotTask.objects.get(),
+        ]
+        entries = {entry.id: entry for entry in TaskIndex.objects.all()}
+        self.assertEqual(set(entries), {task.id for task in tasks})
+        for task in tasks:
+            self.assertEqual(entries[task.id].content_type.model_class(), type(task))
+            self.assertEqual(entries[task.id].household, self.household)
+
+    def test_lookup_only_queries_the_right_table(self):
+        task = OneShotTask.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            found, type = get_task_by_id(task.id)
+        self.assertEqual(found, task)
+        self.assertEqual(type.model_class(), OneShotTask)
+
+        probes = [q["sql"] for q in queries if TASK_BY_ID_QUERY.search(q["sql"])]
+        self.assertEqual(len(probes), 1)
+        self.assertIn("tasks_oneshottask", probes[0])
+
+    def test_deleted_task_is_unindexed(self):
+        task = FlexibleTask.objects.get()
+        task.delete()
+        self.assertFalse(TaskIndex.objects.filter(pk=task.id).exists())
+        self.assertEqual(get_task_by_id(task.id), (None, None))
+
+    def test_missing_entry_is_restored(self):
+        task = ScheduledTask.objects.get()
+        TaskIndex.objects.filter(pk=task.id).delete()
+
+        self.assertEqual(get_task_by_id(task.id)[0], task)
+        self.assertTrue(TaskIndex.objects.filter(pk=task.id).exists())
+
+
+class MembershipTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="testpass123"
+        )
+
+    def test_check_is_cached(self):
+        self.assertTrue(is_member(self.user, self.household.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_member(self.user, self.household.id))
+            self.assertFalse(is_member(self.other, self.household.id))
+
+    def test_membership_changes_invalidate(self):
+        self.assertFalse(is_member(self.other, self.household.id))
+        self.household.users.add(self.other)
+        self.assertTrue(is_member(self.other, self.household.id))
+
+        # From the other side of the relation
+        self.other.households.remove(self.household)
+        self.assertFalse(is_member(self.other, self.household.id))
+        self.other.households.add(self.household)
+        self.assertTrue(is_member(self.other, self.household.id))
+        self.other.households.clear()
+        self.assertFalse(is_member(self.other, self.household.id))
+
+    def test_non_member_is_forbidden(self):
+        self.client.force_authenticate(user=self.other)
+        for name in (
+            "household-detail",
+            "household-list-users",
+            "household-list-tasks",
+        ):
+            response = self.client.get(reverse(name, args=[self.household.id]))
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, name)
+
+        response = self.client.get(
+            reverse("flexibletask-list"), {"household": self.household.id}
+        )
+        self.assertEqual(response.data, [])
+
+    def test_households_list_only_shows_memberships(self):
+        Household.objects.create(name="Someone else's household")
+        response = self.client.get(reverse("household-list"))
+        self.assertEqual(
+            [household["id"] for household in response.data], [self.household.id]
+        )
+
+
+class BulkWorkLogTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.flexible = FlexibleTask.objects.get()
+        self.oneshot = OneShotTask.objects.get()
+
+    def item(self, task, **overrides):
+        item = {
+            "task_id": str(task.id),
+            "user": self.user.id,
+            "completion_time": "00:10:00",
+            "grossness": 1,
+            "brownie_points": 10,
+        }
+        item.update(overrides)
+        return item
+
+    def post(self, items):
+        return self.client.post(reverse("worklog-bulk"), items, format="json")
+
+    def test_creates_all(self):
+        response = self.post(
+            [
+                self.item(self.flexible),
+                self.item(self.flexible),
+                self.item(self.oneshot),
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result["status"] for result in response.data], [201] * 3)
+
+        self.assertEqual(WorkLog.objects.count(), 3)
+        self.assertTrue(
+            all(log.household == self.household for log in WorkLog.objects.all())
+        )
+        self.assertEqual(
+            set(WorkLog.objects.values_list("task_name", "task_type")),
+            {
+                (self.flexible.task_name, "flexibletask"),
+                (self.oneshot.task_name, "oneshottask"),
+            },
+        )
+
+        self.oneshot.refresh_from_db()
+        self.assertTrue(self.oneshot.has_completed)
+        self.flexible.refresh_from_db()
+        self.assertGreater(
+            self.flexible.last_completed, timezone.now() - timedelta(minutes=1)
+        )
+
+        balance = BrowniePointBalance.objects.get(
+            user=self.user, household=self.household
+        )
+        self.assertEqual(balance.credit, 30.0)
+        rollup = BrowniePointRollup.objects.get()
+        self.assertEqual((rollup.points, rollup.count), (30, 3))
+
+    def test_query_count_is_independent_of_batch_size(self):
+        def count_queries(size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post([self.item(self.flexible)] * size)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        # The first request caches the household's members and creates today's rollup
+        self.post([self.item(self.flexible)])
+        self.assertEqual(count_queries(2), count_queries(20))
+
+    def test_per_item_results(self):
+        elsewhere = Household.objects.create(name="Elsewhere")
+        outsider = get_user_model().objects.create_user(
+            email="outsider@example.com", username="outsider", password="testpass123"
+        )
+        response = self.post(
+            [
+                self.item(self.flexible),
+                self.item(self.flexible, grossness=10),
+                self.item(self.flexible, task_id=str(uuid.uuid4())),
+                self.item(elsewhere.get_dummy_task()),
+                self.item(self.flexible, user=outsider.id),
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [result["status"] for result in response.data], [201, 400, 404, 403, 400]
+        )
+        self.assertIn("grossness", response.data[1]["errors"])
+        self.assertEqual(WorkLog.objects.count(), 1)
+
+    def test_offline_timestamps(self):
+        done_at = timezone.now() - timedelta(days=2)
+        FlexibleTask.objects.filter(pk=self.flexible.pk).update(
+            last_completed=done_at - timedelta(days=1)
+        )
+        response = self.post(
+            [
+                self.item(self.flexible, timestamp=done_at.isoformat()),
+                self.item(self.oneshot, timestamp=done_at.isoformat()),
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(WorkLog.objects.values_list("timestamp", flat=True)), {done_at}
+        )
+        self.flexible.refresh_from_db()
+        self.assertEqual(self.flexible.last_completed, done_at)
+        rollup = BrowniePointRollup.objects.get()
+        self.assertEqual(rollup.day, timezone.localdate(done_at))
+
+        # A completion synced late doesn't undo a more recent one
+        self.post([self.item(self.flexible)])
+        self.post([self.item(self.flexible, timestamp=done_at.isoformat())])
+        self.flexible.refresh_from_db()
+        self.assertGreater(self.flexible.last_completed, done_at)
+
+    def test_rejects_future_timestamps(self):
+        future = timezone.now() + timedelta(hours=1)
+        response = self.post([self.item(self.flexible, timestamp=future.isoformat())])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("timestamp", response.data[0]["errors"])
+        self.assertFalse(WorkLog.objects.exists())
+
+    def test_all_invalid_is_bad_request(self):
+        response = self.post(
+            [
+                self.item(self.flexible, grossness=10),
+                self.item(self.flexible, task_id=str(uuid.uuid4())),
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([result["status"] for result in response.data], [400, 404])
+
+    def test_needs_a_list(self):
+        response = self.post(self.item(self.flexible))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BatchTaskTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        profanity.clear_cache()
+        self.addCleanup(profanity.clear_cache)
+
+        self.classified = []
+
+        def predict_prob(texts):
+            self.classified.append(list(texts))
+            return [0.1 for text in texts]
+
+        patcher = mock.patch(
+            "todoqueue_backend.profanity._get_classifier", return_value=predict_prob
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, operations):
+        return self.client.post(
+            reverse("household-batch-tasks", args=[self.household.id]),
+            operations,
+            format="json",
+        )
+
+    def create_operation(self, i):
+        return {
+            "op": "create",
+            "type": "flexibletask",
+            "data": {
+                "task_name": f"Chore {i}",
+                "min_interval": "1:00:00",
+                "max_interval": "2:00:00",
+            },
+        }
+
+    def test_mixed_operations(self):
+        self.create_tasks(1)
+        flexible = FlexibleTask.objects.get()
+        oneshot = OneShotTask.objects.get()
+
+        response = self.post(
+            [
+                self.create_operation(0),
+                {
+                    "op": "create",
+                    "type": "scheduledtask",
+                    "data": {
+                        "task_name": "Bins",
+                        "cron_schedule": "0 7 * * 1",
+                        "max_interval": "12:00:00",
+                    },
+                },
+                {"op": "update", "id": str(flexible.id), "data": {"frozen": True}},
+                {"op": "delete", "id": str(oneshot.id)},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data], [201, 201, 200, 204]
+        )
+        self.assertEqual(response.data[1]["task"]["type"], "scheduledtask")
+        self.assertIsNotNone(response.data[1]["task"]["next_due"])
+
+        # All of the batch's text is checked for profanity at once
+        self.assertEqual(len(self.classified), 1)
+        self.assertIn("Bins", self.classified[0])
+        self.assertIn("Chore 0", self.classified[0])
+
+        self.assertTrue(FlexibleTask.objects.filter(task_name="Chore 0").exists())
+        bins = ScheduledTask.objects.get(task_name="Bins")
+        self.assertEqual(bins.household, self.household)
+        self.assertIsNotNone(bins.next_due)
+        self.assertEqual(get_task_by_id(bins.id)[0], bins)
+
+        flexible.refresh_from_db()
+        self.assertTrue(flexible.frozen)
+        self.assertFalse(OneShotTask.objects.exists())
+        self.assertFalse(TaskIndex.objects.filter(pk=oneshot.id).exists())
+
+    def test_query_count_is_independent_of_batch_size(self):
+        def count_queries(size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post([self.create_operation(i) for i in range(size)])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        # The first request caches the household's members
+        count_queries(1)
+        self.assertEqual(count_queries(2), count_queries(20))
+
+    def test_invalid_batch_changes_nothing(self):
+        other_task = FlexibleTask.objects.create(
+            task_name="Not yours",
+            household=Household.objects.create(name="Elsewhere"),
+            min_interval=timedelta(hours=1),
+            max_interval=timedelta(hours=2),
+        )
+        response = self.post(
+            [
+                self.create_operation(0),
+                {"op": "create", "type": "flexibletask", "data": {}},
+                {"op": "delete", "id": str(other_task.id)},
+                {"op": "explode"},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        errors = response.data["errors"]
+        self.assertIsNone(errors[0])
+        self.assertIn("task_name", errors[1])
+        self.assertIn("id", errors[2])
+        self.assertIn("op", errors[3])
+
+        self.assertFalse(FlexibleTask.objects.filter(task_name="Chore 0").exists())
+        self.assertTrue(FlexibleTask.objects.filter(pk=other_task.pk).exists())
+
+    def test_update_with_nothing_to_change(self):
+        self.create_tasks(1)
+        flexible = FlexibleTask.objects.get()
+        response = self.post(
+            [
+                {"op": "update", "id": str(flexible.id), "data": {}},
+                {"op": "update", "id": str(flexible.id), "data": {"staleness": 1}},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["errors"],
+            [{"data": ["No fields to update."]}, {"data": ["No fields to update."]}],
+        )
+
+
+class HouseholdTransferTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+        self.task = FlexibleTask.objects.first()
+        self.old_log = self.log_work(self.task, 10)
+        WorkLog.objects.filter(pk=self.old_log.pk).update(
+            timestamp=timezone.now() - timedelta(days=3)
+        )
+        self.log_work(self.household.get_dummy_task(), 0)
+
+    def export(self):
+        response = self.client.get(
+            reverse("household-export", args=[self.household.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content)
+
+    def import_(self, export, **params):
+        url = reverse("household-create-from-export")
+        if params:
+            url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+        return self.client.generic(
+            "POST", url, export, content_type="application/x-ndjson"
+        )
+
+    def test_round_trip(self):
+        response = self.import_(self.export(), name="Copy")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        copy = Household.objects.get(pk=response.data["id"])
+        self.assertEqual(copy.name, "Copy")
+        self.assertEqual(list(copy.users.all()), [self.user])
+
+        # Tasks are copied with new IDs, and can be found through the index
+        self.assertEqual(copy.flexible_tasks.count(), 2)
+        self.assertEqual(copy.scheduled_tasks.count(), 2)
+        self.assertEqual(copy.oneshot_tasks.count(), 2)
+        copied_task = copy.flexible_tasks.get(task_name=self.task.task_name)
+        self.assertNotEqual(copied_task.id, self.task.id)
+        self.assertEqual(
+            copied_task.last_completed,
+            FlexibleTask.objects.get(pk=self.task.pk).last_completed,
+        )
+        self.assertEqual(get_task_by_id(copied_task.id)[0], copied_task)
+        self.assertIsNotNone(copy.scheduled_tasks.first().next_due)
+
+        # Work logs point at the copies and keep their times
+        copied_logs = WorkLog.objects.filter(household=copy).order_by("timestamp")
+        self.assertEqual(
+            [log.object_id for log in copied_logs],
+            [copied_task.id, copy.get_dummy_task().id],
+        )
+        self.assertEqual(
+            copied_logs[0].timestamp, WorkLog.objects.get(pk=self.old_log.pk).timestamp
+        )
+
+        balance = BrowniePointBalance.objects.get(user=self.user, household=copy)
+        self.assertEqual(balance.credit, 20.0)
+        self.assertEqual(
+            sum(rollup.points for rollup in copy.brownie_point_rollups.all()), 20
+        )
+
+    def test_export_is_json_lines(self):
+        lines = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual(lines[0]["kind"], "household")
+        kinds = [line["kind"] for line in lines]
+        self.assertEqual(kinds.count("member"), 1)
+        self.assertEqual(kinds.count("worklog"), 2)
+        self.assertEqual(kinds.count("flexibletask"), 2)
+
+    def test_import_only_keeps_the_importer(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="testpass123"
+        )
+        self.household.users.add(other)
+        self.log_work(self.task, 5, user=other)
+
+        response = self.import_(self.export())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        copy = Household.objects.get(pk=response.data["id"])
+        self.assertEqual(list(copy.users.all()), [self.user])
+        self.assertNotIn(other.id, response.data["users"])
+        self.assertFalse(WorkLog.objects.filter(household=copy, user=other).exists())
+        self.assertFalse(
+            BrowniePointBalance.objects.filter(household=copy, user=other).exists()
+        )
+        self.assertFalse(copy.brownie_point_rollups.filter(user=other).exists())
+
+    def test_invalid_export(self):
+        response = self.import_(b'{"kind": "flexibletask"}\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Household.objects.count(), 1)
+
+    def test_imported_tasks_are_validated(self):
+        lines = self.export().decode().splitlines()
+        for i, line in enumerate(lines):
+            record = json.loads(line)
+            if record["kind"] == "flexibletask":
+                record["task_name"] = "x" * 300
+                lines[i] = json.dumps(record)
+                break
+
+        response = self.import_("\n".join(lines).encode())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("task_name", response.data["detail"])
+        self.assertEqual(Household.objects.count(), 1)
+
+    async def test_export_streams_under_asgi(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            reverse("household-export", args=[self.household.id]),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # An async iterator is streamed as it goes, rather than read into memory first
+        self.assertTrue(response.is_async)
+        lines = [json.loads(line) async for line in response.streaming_content]
+        self.assertEqual(lines[0]["kind"], "household")
+        self.assertEqual([line["kind"] for line in lines].count("worklog"), 2)
+
+    def test_commands(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "household.jsonl")
+            call_command(
+                "export_household",
+                self.household.id,
+                output=path,
+                stderr=open(os.devnull, "w"),
+            )
+            call_command(
+                "import_household",
+                path,
+                name="From a file",
+                stdout=open(os.devnull, "w"),
+            )
+
+        copy = Household.objects.get(name="From a file")
+        self.assertEqual(WorkLog.objects.filter(household=copy).count(), 2)
+        self.assertEqual(list(copy.users.all()), [self.user])
+
+
+class WorkLogHistoryTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+        self.other_task = ScheduledTask.objects.get()
+
+        # Some logs share a timestamp, so pages must tie-break on ID
+        now = timezone.now()
+        for i in range(12):
+            log = self.log_work(self.task if i % 2 else self.other_task, 5)
+            WorkLog.objects.filter(pk=log.pk).update(
+                timestamp=now - timedelta(minutes=i // 3)
+            )
+
+    def list(self, **params):
+        response = self.client.get(reverse("worklog-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def all_pages(self, **params):
+        ids = []
+        page = self.list(**params)
+        while True:
+            ids.extend(log["id"] for log in page["results"])
+            if page["next"] is None:
+                return ids
+            response = self.client.get(page["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            page = response.data
+
+    def test_pages_cover_everything_once(self):
+        ids = self.all_pages(household=self.household.id, page_size=5)
+        expected = list(
+            WorkLog.objects.order_by("-timestamp", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_filters(self):
+        logs = self.list(task=self.task.id)["results"]
+        self.assertEqual(len(logs), 6)
+        self.assertTrue(all(log["object_id"] == str(self.task.id) for log in logs))
+
+        self.assertEqual(len(self.list(user=self.user.id)["results"]), 12)
+        self.assertEqual(self.list(user=self.user.id + 1)["results"], [])
+        self.assertEqual(self.list(task="not-a-task")["results"], [])
+
+    def test_only_shows_own_households(self):
+        outsider = get_user_model().objects.create_user(
+            email="outsider@example.com", username="outsider", password="testpass123"
+        )
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.list()["results"], [])
+        self.assertEqual(self.list(household=self.household.id)["results"], [])
+
+    def test_logs_describe_their_task(self):
+        task_id = self.task.id
+        self.task.delete()
+        with CaptureQueriesContext(connection) as queries:
+            logs = self.list(task=task_id)["results"]
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(
+            {(log["task_name"], log["task_type"]) for log in logs},
+            {("Flexible 0", "flexibletask")},
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("worklog-list"), {"cursor": "nonsense"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_later_pages_use_the_household_index(self):
+        page = self.list(household=self.household.id, page_size=5)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(page["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        (sql,) = [
+            query["sql"]
+            for query in queries.captured_queries
+            if re.search(r"""FROM ["`]tasks_worklog["`]""", query["sql"])
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("worklog_household_timestamp", plan)
+
+
+class UserStatisticsTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+        self.other_task = ScheduledTask.objects.get()
+        self.housemate = get_user_model().objects.create_user(
+            email="housemate@example.com", username="housemate", password="testpass123"
+        )
+        self.household.users.add(self.housemate)
+
+    def statistics(self, **params):
+        response = self.client.get(reverse("user_statistics"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {user["username"]: user for user in response.data}
+
+    def test_statistics(self):
+        self.log_work(self.task, 10)
+        self.log_work(self.task, 20)
+        self.log_work(self.other_task, 30)
+        old = self.log_work(self.task, 40)
+        WorkLog.objects.filter(pk=old.pk).update(
+            timestamp=timezone.now() - timedelta(days=31)
+        )
+
+        statistics = self.statistics()
+        member = statistics["member"]
+        self.assertEqual(member["completed_tasks"], 3)
+        self.assertEqual(member["completion_time"], "01:00:00")
+        self.assertEqual(member["average_grossness"], 1)
+        self.assertEqual(member["brownie_points"], 30)
+        self.assertEqual(
+            [(task["task_name"], task["count"]) for task in member["tasks"]],
+            [("Flexible 0", 2), ("Scheduled 0", 1)],
+        )
+
+        self.assertEqual(statistics["housemate"]["completed_tasks"], 0)
+        self.assertEqual(statistics["housemate"]["tasks"], [])
+
+    def test_deleted_tasks_keep_their_name(self):
+        self.log_work(self.task, 10)
+        self.task.delete()
+        (task,) = self.statistics()["member"]["tasks"]
+        self.assertEqual(task["task_name"], "Flexible 0")
+        self.assertEqual(task["task_type"], "flexibletask")
+
+    def test_renamed_tasks_use_their_latest_name(self):
+        self.log_work(self.task, 10)
+        # Alphabetically after the new name, so the latest name isn't just the largest
+        self.task.task_name = "Dishes"
+        self.task.save()
+        self.log_work(self.task, 10)
+        (task,) = [
+            task
+            for task in self.statistics()["member"]["tasks"]
+            if task["task_id"] == str(self.task.id)
+        ]
+        self.assertEqual(task["task_name"], "Dishes")
+        self.assertEqual(task["count"], 2)
+
+    def test_only_counts_own_households(self):
+        other_household = Household.objects.create(name="Other household")
+        other_household.users.add(self.housemate)
+        other_task = FlexibleTask.objects.create(
+            task_name="Elsewhere",
+            household=other_household,
+            min_interval=timedelta(hours=1),
+            max_interval=timedelta(hours=2),
+        )
+        self.log_work(other_task, 10, user=self.housemate)
+
+        statistics = self.statistics()
+        self.assertEqual(statistics["housemate"]["completed_tasks"], 0)
+
+        response = self.client.get(
+            reverse("user_statistics"), {"household": other_household.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_query_count_does_not_grow_with_users(self):
+        for i in range(5):
+            user = get_user_model().objects.create_user(
+                email=f"user{i}@example.com", username=f"user{i}", password="pass"
+            )
+            self.household.users.add(user)
+            self.log_work(self.task, 10, user=user)
+            self.log_work(self.other_task, 10, user=user)
+
+        # Warm the membership cache
+        self.statistics(household=self.household.id)
+        with CaptureQueriesContext(connection) as queries:
+            statistics = self.statistics(household=self.household.id)
+        self.assertEqual(len(statistics), 7)
+        # The grouped work logs, and the users
+        self.assertEqual(len(queries.captured_queries), 2)
+
+
+class TaskCompletionStatsTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(1)
+        self.task = FlexibleTask.objects.get()
+
+    def calculate(self, completion_time):
+        default_rng = np.random.default_rng
+        with mock.patch("numpy.random.default_rng", side_effect=lambda: default_rng(0)):
+            response = self.client.post(
+                reverse("calculate_brownie_points"),
+                {
+                    "task_id": str(self.task.id),
+                    "completion_time": completion_time,
+                    "grossness": 1,
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["brownie_points"]
+
+    def test_totals_follow_work_logs(self):
+        for minutes in (10, 20, 30):
+            self.log_work(self.task, minutes)
+        self.client.post(
+            reverse("worklog-bulk"),
+            [
+                {
+                    "task_id": str(self.task.id),
+                    "user": self.user.id,
+                    "completion_time": "00:40:00",
+                    "grossness": 3,
+                    "brownie_points": 10,
+                }
+            ],
+            format="json",
+        )
+
+        stats = TaskCompletionStats.objects.get(pk=self.task.id)
+        self.assertEqual(stats.count, 4)
+        self.assertAlmostEqual(stats.completion_time_mean, 25)
+        self.assertAlmostEqual(stats.completion_time_std, math.sqrt(125))
+        self.assertAlmostEqual(stats.grossness_mean, 1.5)
+
+        self.task.delete()
+        self.assertFalse(TaskCompletionStats.objects.exists())
+
+    def test_totals_follow_deleted_and_edited_work_logs(self):
+        for minutes in (10, 20, 30):
+            self.log_work(self.task, minutes)
+        work_logs = list(WorkLog.objects.order_by("completion_time"))
+
+        response = self.client.delete(reverse("worklog-detail", args=[work_logs[2].id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        stats = TaskCompletionStats.objects.get(pk=self.task.id)
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.completion_time_mean, 15)
+        self.assertAlmostEqual(stats.completion_time_std, 5)
+
+        response = self.client.patch(
+            reverse("worklog-detail", args=[work_logs[0].id]),
+            {"completion_time": "00:40:00", "grossness": 3},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats.refresh_from_db()
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.completion_time_mean, 30)
+        self.assertAlmostEqual(stats.completion_time_std, 10)
+        self.assertAlmostEqual(stats.grossness_mean, 2)
+
+    def test_history_caps_completion_time(self):
+        history = TaskCompletionStats(
+            count=5, completion_time=50, completion_time_squares=500
+        )
+
+        def points(minutes, history=None):
+            return bp_function(minutes, 1, history, np.random.default_rng(0))
+
+        self.assertEqual(points(60, history), points(10))
+        self.assertEqual(points(5, history), points(5))
+
+        # Too little history to go on
+        history.count = 4
+        self.assertEqual(points(60, history), points(60))
+
+    def test_endpoint_reads_totals_not_history(self):
+        for _ in range(5):
+            self.log_work(self.task, 10)
+        self.assertEqual(self.calculate("01:00:00"), self.calculate("00:10:00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.calculate("00:10:00")
+        # The task's household, to check membership, and its totals
+        self.assertEqual(len(queries.captured_queries), 2)
+        for query in queries.captured_queries:
+            self.assertNotIn("tasks_worklog", query["sql"])
+
+
+class BrowniePointScoringTests(HouseholdTestCase):
+    def score(self, **data):
+        return self.client.post(reverse("score_brownie_points"), data, format="json")
+
+    def test_batch_matches_single_completions(self):
+        minutes = np.array([0, 1, 10, 30, 90])
+        grossness = np.array([0, 1, 2.5, 4, 5])
+        rng = np.random.default_rng(1)
+        expected = [bp_function(m, g, rng=rng) for m, g in zip(minutes, grossness)]
+
+        points = bp_function_batch(minutes, grossness, rng=np.random.default_rng(1))
+        self.assertEqual(points.tolist(), expected)
+        self.assertEqual(points[0], 0)
+
+    def test_scores_pairs(self):
+        response = self.score(completion_times=[5, 10, 20], grossness=2, seed=3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["brownie_points"],
+            bp_function_batch([5, 10, 20], 2, rng=np.random.default_rng(3)).tolist(),
+        )
+
+    def test_scores_grid(self):
+        response = self.score(completion_times=[5, 10, 20], grossness=[1, 4], grid=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = np.array(response.data["brownie_points"])
+        self.assertEqual(points.shape, (2, 3))
+        # Grosser and longer is worth more, whatever the random part
+        self.assertGreater(points[1, 2], points[0, 0])
+
+    def test_grid_false_as_a_string(self):
+        response = self.score(
+            completion_times=[5, 10], grossness=[1, 4], grid="false", seed=1
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(np.array(response.data["brownie_points"]).shape, (2,))
+
+    def test_task_history_is_for_members(self):
+        elsewhere = Household.objects.create(name="Elsewhere")
+        other_task = FlexibleTask.objects.create(
+            task_name="Not yours",
+            household=elsewhere,
+            min_interval=timedelta(hours=1),
+            max_interval=timedelta(hours=2),
+        )
+        response = self.score(completion_times=[5], grossness=1, task_id=other_task.id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(
+            reverse("calculate_brownie_points"),
+            {
+                "task_id": str(other_task.id),
+                "completion_time": "00:05:00",
+                "grossness": 1,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.score(completion_times=[5], grossness=1, task_id=uuid.uuid4())
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_seed_repeats(self):
+        first = self.score(completion_times=list(range(1, 50)), grossness=3, seed=7)
+        second = self.score(completion_times=list(range(1, 50)), grossness=3, seed=7)
+        self.assertEqual(first.data, second.data)
+
+    def test_rejects_bad_input(self):
+        for data in (
+            {"completion_times": [1, 2]},
+            {"completion_times": [1, 2], "grossness": [1, 2, 3]},
+            {"completion_times": ["soon"], "grossness": 1},
+            {"completion_times": [[1]], "grossness": 1},
+            {"completion_times": [1], "grossness": 1, "task_id": "nope"},
+            {
+                "completion_times": list(range(1000)),
+                "grossness": list(range(1000)),
+                "grid": True,
+            },
+        ):
+            response = self.score(**data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+
+    def test_rejects_large_grids_before_building_them(self):
+        with mock.patch("numpy.meshgrid") as meshgrid:
+            response = self.score(
+                completion_times=list(range(10000)),
+                grossness=list(range(10000)),
+                grid=True,
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        meshgrid.assert_not_called()
+
+
+class StalenessSnapshotTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+
+    def list_tasks(self):
+        response = self.client.get(
+            reverse("all-tasks-list"), {"household": self.household.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def snapshot(self):
+        return cache.get(f"household-tasks-{self.household.id}")
+
+    def test_serves_snapshot(self):
+        computed = self.list_tasks()
+        response_cache.invalidate(self.household.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.list_tasks(), computed)
+        # Only the household itself is loaded
+        self.assertEqual(len(queries), 1)
+
+    def test_changes_replace_snapshot(self):
+        self.list_tasks()
+        task = FlexibleTask.objects.first()
+        task.task_name = "Renamed"
+        task.save()
+
+        names = {task["task_name"] for task in self.list_tasks()}
+        self.assertIn("Renamed", names)
+
+    def test_old_snapshots_are_recomputed(self):
+        self.list_tasks()
+        snapshot = self.snapshot()
+        computed_at = snapshot["computed_at"] - settings.STALENESS_SNAPSHOT_MAX_AGE
+        cache.set(
+            f"household-tasks-{self.household.id}",
+            {**snapshot, "computed_at": computed_at},
+        )
+        response_cache.invalidate(self.household.id)
+
+        self.list_tasks()
+        self.assertGreater(self.snapshot()["computed_at"], computed_at)
+
+    def test_scheduler_refreshes_active_households(self):
+        idle = Household.objects.create(name="Idle household")
+        self.list_tasks()
+        computed_at = self.snapshot()["computed_at"]
+
+        call_command("run_staleness_scheduler", "--once", stdout=open(os.devnull, "w"))
+
+        self.assertGreater(self.snapshot()["computed_at"], computed_at)
+        self.assertIsNone(cache.get(f"household-tasks-{idle.id}"))
+
+    def test_households_stop_being_active(self):
+        self.list_tasks()
+        self.assertEqual(snapshots.get_active_household_ids(), [self.household.id])
+
+        with override_settings(HOUSEHOLD_ACTIVE_TIMEOUT=-1):
+            self.assertEqual(snapshots.get_active_household_ids(), [])
+
+
+class ResponseCacheTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+
+    def list_tasks(self, name="all-tasks-list"):
+        if name == "all-tasks-list":
+            response = self.client.get(reverse(name), {"household": self.household.id})
+        else:
+            response = self.client.get(reverse(name, args=[self.household.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_hits_after_miss(self):
+        first = self.list_tasks()
+        second = self.list_tasks()
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.content, second.content)
+
+        # Both endpoints serve the same feed
+        third = self.list_tasks("household-list-tasks")
+        self.assertEqual(third["X-Cache"], "HIT")
+        self.assertEqual(third.content, first.content)
+
+        self.assertEqual(
+            response_cache.get_metrics(), {"tasks": {"hits": 2, "misses": 1}}
+        )
+
+    def test_saving_tasks_and_work_logs_invalidates(self):
+        self.list_tasks()
+        task = FlexibleTask.objects.first()
+        task.task_name = "Renamed"
+        task.save()
+        self.assertIsNone(
+            cache.get(f"household-response-all-tasks-{self.household.id}")
+        )
+
+        response = self.list_tasks()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("Renamed", {task["task_name"] for task in response.json()})
+
+        self.log_work(task, 5)
+        self.assertEqual(self.list_tasks()["X-Cache"], "MISS")
+
+        task.delete()
+        self.assertEqual(self.list_tasks()["X-Cache"], "MISS")
+
+    def test_bulk_writes_change_the_version(self):
+        self.list_tasks()
+        task = FlexibleTask.objects.first()
+        response = self.client.post(
+            reverse("worklog-bulk"),
+            [
+                {
+                    "task_id": str(task.id),
+                    "user": self.user.id,
+                    "completion_time": "00:05:00",
+                    "grossness": 1,
+                    "brownie_points": 10,
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.list_tasks()["X-Cache"], "MISS")
+
+    def test_metrics_are_for_admins(self):
+        response = self.client.get(reverse("response_cache_metrics"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("response_cache_metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("tasks", response.data)
+
+
+class FastSerializerTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(3)
+        FlexibleTask.objects.filter(task_name="Flexible 1").update(frozen=True)
+        # Due times that have to be worked out again
+        ScheduledTask.objects.filter(task_name="Scheduled 1").update(
+            last_due=None, next_due=None
+        )
+        OneShotTask.objects.filter(task_name="One-shot 2").update(due_before=True)
+        for task in FlexibleTask.objects.all():
+            self.log_work(task, 7)
+
+    def assertSameJSON(self, expected, actual):
+        self.assertEqual(JSONRenderer().render(expected), JSONRenderer().render(actual))
+
+    def test_all_tasks_are_identical(self):
+        now = timezone.now() + timedelta(hours=1, minutes=30)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            tasks = snapshots.get_household_tasks(self.household)
+            expected = AllTasksSerializer(
+                tasks, many=True, context=get_task_list_context(tasks)
+            ).data
+            actual = snapshots.compute_task_list(self.household)
+        self.assertEqual(len(actual), 9)
+        self.assertSameJSON(expected, actual)
+
+    def test_task_feed_is_identical(self):
+        now = timezone.now() + timedelta(days=3)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            tasks = snapshots.get_household_tasks(self.household)
+            expected = AllTasksSerializer(
+                tasks, many=True, context=get_task_list_context(tasks)
+            ).data
+            response = self.client.get(
+                reverse("household-list-tasks", args=[self.household.id])
+            )
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_query_count(self):
+        self.create_tasks(5)
+        ScheduledTask.objects.update(last_due=None, next_due=None)
+        snapshots.compute_task_list(self.household)
+
+        with CaptureQueriesContext(connection) as queries:
+            snapshots.compute_task_list(self.household)
+        # One query per type of task, and one for the mean completion times
+        self.assertEqual(len(queries), 4)
+
+    def test_due_times_are_saved_in_one_query(self):
+        self.create_tasks(5)
+        ScheduledTask.objects.update(last_due=None, next_due=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            snapshots.compute_task_list(self.household)
+        updates = [query for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(ScheduledTask.objects.filter(next_due__isnull=True).exists())
+
+    def test_benchmark(self):
+        out = open(os.devnull, "w")
+        self.addCleanup(out.close)
+        call_command(
+            "benchmark_task_serializers", "--tasks", 30, "--repeat", 1, stdout=out
+        )
+        self.assertEqual(Household.objects.count(), 1)
+
+
+class HouseholdTaskFeedTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+        OneShotTask.objects.filter(task_name="One-shot 1").update(has_completed=True)
+
+    def feed(self, **params):
+        return self.client.get(
+            reverse("household-list-tasks", args=[self.household.id]), params
+        )
+
+    def test_lists_every_type(self):
+        response = self.feed()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted((task["type"], task["task_name"]) for task in response.json()),
+            [
+                ("flexibletask", "Flexible 0"),
+                ("flexibletask", "Flexible 1"),
+                ("oneshottask", "One-shot 0"),
+                ("scheduledtask", "Scheduled 0"),
+                ("scheduledtask", "Scheduled 1"),
+            ],
+        )
+
+    def test_sparse_fields(self):
+        full = self.feed().json()
+        response = self.feed(fields="id,staleness")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [{"id": task["id"], "staleness": task["staleness"]} for task in full],
+        )
+
+        # Fields are only given for the types that have them
+        response = self.feed(fields="id,cron_schedule")
+        self.assertEqual(sum("cron_schedule" in task for task in response.data), 2)
+
+    def test_unknown_fields(self):
+        response = self.feed(fields="id,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskStalenessDeltaTests(HouseholdTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+
+    def staleness(self, **params):
+        return self.client.get(
+            reverse("household-task-staleness", args=[self.household.id]), params
+        )
+
+    def test_without_since_every_task_has_changed(self):
+        feed = self.client.get(
+            reverse("household-list-tasks", args=[self.household.id])
+        ).json()
+        response = self.staleness()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["staleness"],
+            {task["id"]: task["staleness"] for task in feed},
+        )
+        self.assertCountEqual(response.data["changed"], [task["id"] for task in feed])
+
+    def test_only_lists_tasks_changed_since(self):
+        version = self.staleness().data["version"]
+        response = self.staleness(since=version)
+        self.assertEqual(response.data["version"], version)
+        self.assertEqual(response.data["changed"], [])
+
+        task = FlexibleTask.objects.get(task_name="Flexible 0")
+        task.frozen = True
+        task.save()
+        response = self.staleness(since=version)
+        self.assertGreater(response.data["version"], version)
+        self.assertEqual(response.data["changed"], [str(task.id)])
+
+    def test_bulk_work_logs_mark_tasks_changed(self):
+        version = self.staleness().data["version"]
+        task = ScheduledTask.objects.get(task_name="Scheduled 1")
+        self.client.post(
+            reverse("worklog-bulk"),
+            [
+                {
+                    "task_id": str(task.id),
+                    "user": self.user.id,
+                    "completion_time": "00:05:00",
+                    "grossness": 1,
+                    "brownie_points": 10,
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(self.staleness(since=version).data["changed"], [str(task.id)])
+
+    def test_deleted_tasks_are_not_listed(self):
+        task = OneShotTask.objects.get(task_name="One-shot 0")
+        task_id = str(task.id)
+        task.delete()
+        response = self.staleness(since=0)
+        self.assertNotIn(task_id, response.data["staleness"])
+        self.assertNotIn(task_id, response.data["changed"])
+
+    def test_version_and_changed_tasks_move_together(self):
+        version = self.staleness().data["version"]
+        task = FlexibleTask.objects.get(task_name="Flexible 0")
+        with mock.patch.object(
+            TaskIndex.objects, "filter", side_effect=RuntimeError("Connection lost")
+        ):
+            with self.assertRaises(RuntimeError):
+                bump_household_version(self.household.id, [task.id])
+        self.household.refresh_from_db()
+        self.assertEqual(self.household.version, version)
+
+    def test_invalid_since(self):
+        response = self.staleness(since="yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,387 @@
+"""Export and import of whole households, as JSON Lines.
+
+An export is a stream of JSON objects, one per line, each with a "kind":
+
+    household       The household itself. Always the first line.
+    member          A member, identified by email address.
+    <task type>     A task, by the same type names AllTasksSerializer uses.
+    worklog         A work log, with its task's ID, name and type, and its user's email address.
+    balance         A member's brownie point balance.
+
+Exports are generated lazily, and work logs are read from the database in chunks, so exporting takes the
+same memory however much history a household has. Imports read the stream in chunks too, and insert each
+chunk in bulk. Tasks are given new IDs on import, so a household can be imported alongside the one it was
+exported from.
+
+Anyone can upload an export, and it can say whatever they like, so by default an import only keeps the
+records of the users it's told about. Matching the rest of the members to accounts by email address is
+only for operators, through the import_household command.
+"""
+
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from logging import getLogger
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    TASK_SERIALIZERS,
+    BrowniePointBalance,
+    BrowniePointRollup,
+    DummyTask,
+    FlexibleTask,
+    Household,
+    OneShotTask,
+    ScheduledTask,
+    WorkLog,
+    record_task_completion_stats,
+    register_tasks,
+    validate_profanity,
+)
+
+logger = getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# How many rows to read or write at a time
+CHUNK_SIZE = 1000
+
+TASK_TYPES = {
+    "dummytask": DummyTask,
+    "flexibletask": FlexibleTask,
+    "scheduledtask": ScheduledTask,
+    "oneshottask": OneShotTask,
+}
+
+# Due times are worked out again from the schedule on import
+SKIPPED_TASK_FIELDS = {"household", "last_due", "next_due"}
+
+WORKLOG_FIELDS = ("timestamp", "grossness", "completion_time", "brownie_points")
+
+
+class HouseholdImportError(ValueError):
+    pass
+
+
+def _task_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.name not in SKIPPED_TASK_FIELDS
+    ]
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds times to the millisecond
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _line(kind, **data):
+    return json.dumps({"kind": kind, **data}, cls=ExportEncoder) + "\n"
+
+
+def export_household(household):
+    """Generates the lines of a household's export"""
+    yield _line(
+        "household", format=FORMAT_VERSION, id=household.id, name=household.name
+    )
+
+    emails = {}
+    for user_id, email, username in household.users.values_list(
+        "pk", "email", "username"
+    ):
+        emails[user_id] = email
+        yield _line("member", email=email, username=username)
+
+    for kind, model in TASK_TYPES.items():
+        fields = _task_fields(model)
+        for task in (
+            model.objects.filter(household=household)
+            .only(*(field.name for field in fields))
+            .iterator(chunk_size=CHUNK_SIZE)
+        ):
+            yield _line(
+                kind,
+                **{field.attname: getattr(task, field.attname) for field in fields},
+            )
+
+    content_types = {
+        content_type_id: ContentType.objects.get_for_id(content_type_id).model
+        for content_type_id in WorkLog.objects.filter(household=household)
+        .order_by()
+        .values_list("content_type_id", flat=True)
+        .distinct()
+    }
+    for work_log in (
+        WorkLog.objects.filter(household=household)
+        .order_by("timestamp", "id")
+        .values("user_id", "content_type_id", "object_id", "task_name", *WORKLOG_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    ):
+        email = emails.get(work_log["user_id"])
+        if email is None:
+            # Work done by someone who has since left the household
+            email = get_user_model().objects.get(pk=work_log["user_id"]).email
+            emails[work_log["user_id"]] = email
+        yield _line(
+            "worklog",
+            user=email,
+            task=work_log["object_id"],
+            type=content_types[work_log["content_type_id"]],
+            task_name=work_log["task_name"],
+            **{field: work_log[field] for field in WORKLOG_FIELDS},
+        )
+
+    for user_id, credit, debit in BrowniePointBalance.objects.filter(
+        household=household
+    ).values_list("user_id", "credit", "debit"):
+        if user_id in emails:
+            yield _line("balance", user=emails[user_id], credit=credit, debit=debit)
+
+
+def _next_lines(lines):
+    return list(islice(lines, CHUNK_SIZE))
+
+
+async def aexport_household(household):
+    """Generates the lines of a household's export for an ASGI server. Django reads the whole of a sync
+    iterator into memory before streaming it under ASGI, so this reads a chunk of lines at a time in a
+    worker thread instead."""
+    lines = export_household(household)
+    while True:
+        chunk = await sync_to_async(_next_lines)(lines)
+        if not chunk:
+            return
+        for line in chunk:
+            yield line
+
+
+class HouseholdImporter:
+    """Reads an export, line by line, into a new household"""
+
+    def __init__(self, name=None, create_users=False, members=(), match_members=False):
+        self.name = name
+        self.create_users = create_users
+        self.match_members = match_members
+        self.household = None
+        self.members = list(members)
+        self.users = {member.email: member for member in self.members}
+        self.task_ids = {}
+        self.pending = defaultdict(list)
+        self.rollups = defaultdict(lambda: [0, 0])
+        self.counts = defaultdict(int)
+
+    def run(self, lines):
+        with transaction.atomic():
+            for number, line in enumerate(lines, 1):
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    self.read(record)
+                except (ValueError, KeyError, TypeError) as e:
+                    raise HouseholdImportError(f"Line {number}: {e}") from e
+
+            if self.household is None:
+                raise HouseholdImportError("The export is empty")
+            self.flush()
+            self.finish()
+
+        logger.info(f"Imported household {self.household.id}: {dict(self.counts)}")
+        return self.household
+
+    def read(self, record):
+        kind = record.pop("kind")
+        if kind == "household":
+            self.start(record)
+            return
+        if self.household is None:
+            raise HouseholdImportError("The export must start with the household")
+
+        # Members are needed before anything can refer to them, and tasks before their work logs
+        if kind != "member":
+            self.flush_members()
+        if kind in ("worklog", "balance"):
+            self.flush_tasks()
+
+        if kind == "member":
+            self.pending["member"].append(record)
+        elif kind in TASK_TYPES:
+            self.read_task(kind, TASK_TYPES[kind], record)
+        elif kind == "worklog":
+            self.read_work_log(record)
+        elif kind == "balance":
+            self.pending["balance"].append(record)
+        else:
+            raise HouseholdImportError(f"Unknown kind of record: {kind}")
+
+        if any(len(records) >= CHUNK_SIZE for records in self.pending.values()):
+            self.flush()
+
+    def start(self, record):
+        if self.household is not None:
+            raise HouseholdImportError("The export has more than one household")
+        if record.get("format") != FORMAT_VERSION:
+            raise HouseholdImportError(
+                f"Unsupported export format: {record.get('format')}"
+            )
+        name = self.name or record["name"]
+        try:
+            validate_profanity(name)
+        except ValidationError as e:
+            raise HouseholdImportError(e.messages[0])
+        self.household = Household.objects.create(name=name)
+        # Whoever imported the household should be able to see it
+        if self.members:
+            self.household.users.add(*self.members)
+
+    def read_task(self, kind, model, record):
+        if model is DummyTask:
+            # The new household already has a dummy task, so use that one
+            self.task_ids[uuid.UUID(record["id"])] = self.household.get_dummy_task().id
+            return
+
+        # Tasks are checked just like when they're created through the API
+        serializer = TASK_SERIALIZERS[model](data=record)
+        # The task belongs to the new household, whatever the export says
+        serializer.fields.pop("household")
+        if not serializer.is_valid():
+            raise HouseholdImportError(f"Invalid {kind}: {serializer.errors}")
+
+        task = model(household=self.household, **serializer.validated_data)
+        # Fields that can't be written through the API, like the ID and when it was last completed
+        for field in _task_fields(model):
+            if field.name not in serializer.validated_data and field.attname in record:
+                setattr(task, field.attname, field.to_python(record[field.attname]))
+        new_id = uuid.uuid4()
+        self.task_ids[task.id] = new_id
+        task.id = new_id
+        if isinstance(task, ScheduledTask):
+            task.get_due_times()
+        self.pending[model].append(task)
+
+    def get_user(self, email):
+        """Members are already known. Anyone else who did work in the household has since left it,
+        but may still have an account here."""
+        if email not in self.users and self.match_members:
+            self.users[email] = get_user_model().objects.filter(email=email).first()
+        return self.users.get(email)
+
+    def read_work_log(self, record):
+        user = self.get_user(record["user"])
+        if user is None:
+            self.counts["skipped worklogs"] += 1
+            return
+
+        task_id = uuid.UUID(record["task"])
+        work_log = WorkLog(
+            user=user,
+            household=self.household,
+            content_type=ContentType.objects.get_by_natural_key(
+                "tasks", record["type"]
+            ),
+            # Tasks that were deleted before the export keep their old ID
+            object_id=self.task_ids.get(task_id, task_id),
+            task_name=record.get("task_name", ""),
+            task_type=record["type"],
+        )
+        for field_name in WORKLOG_FIELDS:
+            field = WorkLog._meta.get_field(field_name)
+            setattr(work_log, field.attname, field.to_python(record[field_name]))
+        self.pending[WorkLog].append(work_log)
+
+        rollup = self.rollups[(user.pk, timezone.localdate(work_log.timestamp))]
+        rollup[0] += work_log.brownie_points
+        rollup[1] += 1
+
+    def flush_members(self):
+        records = self.pending.pop("member", [])
+        if not records:
+            return
+        if not self.match_members:
+            self.counts["skipped members"] += sum(
+                record["email"] not in self.users for record in records
+            )
+            return
+
+        User = get_user_model()
+        emails = [record["email"] for record in records]
+        users = {user.email: user for user in User.objects.filter(email__in=emails)}
+        if self.create_users:
+            for record in records:
+                if record["email"] not in users:
+                    # They'll need to reset their password to log in
+                    users[record["email"]] = User.objects.create_user(
+                        email=record["email"], username=record["username"]
+                    )
+                    self.counts["created users"] += 1
+
+        self.users.update(users)
+        self.household.users.add(*users.values())
+        self.counts["members"] += len(users)
+        self.counts["skipped members"] += len(set(emails) - set(users))
+
+    def flush_tasks(self):
+        for model in TASK_TYPES.values():
+            tasks = self.pending.pop(model, [])
+            if tasks:
+                model.objects.bulk_create(tasks)
+                register_tasks(tasks)
+                self.counts["tasks"] += len(tasks)
+
+    def flush(self):
+        self.flush_members()
+        self.flush_tasks()
+
+        work_logs = self.pending.pop(WorkLog, [])
+        if work_logs:
+            WorkLog.objects.bulk_create(work_logs)
+            record_task_completion_stats(work_logs)
+            self.counts["worklogs"] += len(work_logs)
+
+        for record in self.pending.pop("balance", []):
+            user = self.get_user(record["user"])
+            if user is not None:
+                BrowniePointBalance.objects.filter(
+                    user=user, household=self.household
+                ).update(credit=record["credit"], debit=record["debit"])
+
+    def finish(self):
+        BrowniePointRollup.objects.bulk_create(
+            [
+                BrowniePointRollup(
+                    user_id=user_id,
+                    household=self.household,
+                    day=day,
+                    points=points,
+                    count=count,
+                )
+                for (user_id, day), (points, count) in self.rollups.items()
+            ],
+            batch_size=CHUNK_SIZE,
+        )
+
+
+def import_household(
+    lines, name=None, create_users=False, members=(), match_members=False
+):
+    """Read an export into a new household, and return it. The users in members are added to the
+    household, and keep their work logs and balances. Everyone else in the export is left out, with
+    their work logs and balances, unless match_members is set. Then members are matched to existing
+    users by email address, and, if create_users is set, given accounts if they don't have one.
+    """
+    return HouseholdImporter(name, create_users, members, match_members).run(lines)
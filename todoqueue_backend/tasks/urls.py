@@ -14,11 +14,23 @@ urlpatterns = [
     path("", include(router.urls)),
     path("toggle_frozen/<uuid:taskId>/", views.toggle_frozen, name="toggle_frozen"),
     path("dismiss_task/<uuid:taskId>/", views.dismiss_task, name="dismiss_task"),
+    path("events/", views.event_stream, name="event_stream"),
+    path("events/ticket/", views.event_stream_ticket, name="event_stream_ticket"),
     path(
         "calculate_brownie_points/",
         views.calculate_brownie_points_view,
         name="calculate_brownie_points",
     ),
+    path(
+        "score_brownie_points/",
+        views.score_brownie_points_view,
+        name="score_brownie_points",
+    ),
+    path(
+        "response_cache_metrics/",
+        views.response_cache_metrics,
+        name="response_cache_metrics",
+    ),
     path(
         "user_statistics/", views.UserStatisticsView.as_view(), name="user_statistics"
     ),
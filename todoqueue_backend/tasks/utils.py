@@ -1,12 +1,19 @@
-from datetime import timedelta
-from typing import List
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Tuple
 from logging import getLogger
-import math
-from profanity_check import predict as is_profane
-import random
+
+import croniter
+import numpy as np
+from django.utils import timezone
+
+from todoqueue_backend.profanity import is_profane
 
 logger = getLogger(__name__)
 
+# How many times a task must have been done before its history affects brownie points
+MIN_HISTORY = 5
+
 
 def renormalize(value, old_range, new_range):
     old_range_width = old_range[1] - old_range[0]
@@ -34,6 +41,30 @@ def parse_duration(duration_str):
     return timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
 
 
+@lru_cache(maxsize=1024)
+def _cron_due_times(cron_schedule: str, bucket: datetime) -> Tuple[datetime, datetime]:
+    # Cron only has minute resolution, so every instant strictly inside the bucket gives the same answer.
+    # Evaluate at the middle of the minute to stay clear of the boundary itself.
+    start = bucket + timedelta(seconds=30)
+    last_due = croniter.croniter(cron_schedule, start, ret_type=datetime).get_prev()
+    next_due = croniter.croniter(cron_schedule, start, ret_type=datetime).get_next()
+    logger.debug(
+        f"Evaluated cron {cron_schedule} at {bucket}: {last_due} -> {next_due}"
+    )
+    return last_due, next_due
+
+
+def get_cron_due_times(
+    cron_schedule: str, now: datetime = None
+) -> Tuple[datetime, datetime]:
+    """Returns the previous and next times a cron schedule fires, relative to now (or the given time).
+
+    Results are cached per schedule and minute, so tasks that share a schedule only parse it once a minute.
+    """
+    now = (now or timezone.now()).astimezone()
+    return _cron_due_times(cron_schedule, now.replace(second=0, microsecond=0))
+
+
 def piecewise_linear(x, gradient1, gradient2, threshold):
     """
     A piecewise linear function that increases with gradient1 up to a threshold,
@@ -55,60 +86,77 @@ def piecewise_linear(x, gradient1, gradient2, threshold):
 
 
 def sigmoid(x):
-    return 1 / (1 + math.exp(-x))
+    return 1 / (1 + np.exp(-x))
 
 
-def bp_function(
-    completion_time_minutes: float,
-    grossness: float,
-    grossnesses: List[float] = None,
-    completion_times: List[float] = None,
-) -> float:
-    """Return the brownie points for a given completion time and grossness. Optionally, pass in a list of
-    grossnesses and completion times to calculate the brownie points in the context of the history of how
-    long it has taken to complete this task in the past.
+def bp_function_batch(
+    completion_minutes,
+    grossness,
+    history=None,
+    rng: np.random.Generator = None,
+) -> np.ndarray:
+    """Return the brownie points for any number of completions at once. The completion times and
+    grossnesses can be scalars or arrays of any shape that broadcast together, and the result has their
+    broadcast shape. Optionally, pass in the task's TaskCompletionStats to calculate the brownie points
+    in the context of the history of how long it has taken to complete this task in the past.
 
     Args:
-        completion_time_minutes (float): The time it took to complete the task in minutes.
-        grossness (float): The grossness of the task.
-        grossnesses (List[float], optional): A list of grossnesses for this task. Defaults to None.
-        completion_times (List[float], optional): A list of completion times for this task. Defaults to None.
+        completion_minutes (array_like): The times it took to complete the task in minutes.
+        grossness (array_like): The grossnesses of the task.
+        history (TaskCompletionStats, optional): Running totals of the task's past completions. Defaults to None.
+        rng (np.random.Generator, optional): Source of the random part of the points. Pass a seeded
+            generator for repeatable results. Defaults to a fresh, unseeded generator.
 
     Returns:
-        float: The brownie points
+        np.ndarray: The brownie points, as integers
     """
-
-    if completion_time_minutes == 0:
-        logger.debug("Completion time is 0, returning 0 brownie points")
-        return 0
+    completion_minutes, grossness = np.broadcast_arrays(
+        np.asarray(completion_minutes, dtype=np.float64),
+        np.asarray(grossness, dtype=np.float64),
+    )
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Once a task has some history, taking far longer than usual doesn't earn any more points
+    if history is not None and history.count >= MIN_HISTORY:
+        cap = history.completion_time_mean + 2 * history.completion_time_std
+        logger.debug(f"Capping completion times at {cap:.2f} minutes")
+        capped_minutes = np.minimum(completion_minutes, cap)
+    else:
+        capped_minutes = completion_minutes
 
     user_gross_scale_range = [0, 5]
     output_gross_scale_range = [0, 100]
 
     # grossness = piecewise_linear(grossness, 1.0, 4.0, 2.5)
-    grossness = renormalize(
-        float(grossness), user_gross_scale_range, output_gross_scale_range
-    )
+    grossness = renormalize(grossness, user_gross_scale_range, output_gross_scale_range)
 
     # completion_time_minutes = piecewise_linear(completion_time_minutes, 2.0, 0.75, 30)
 
     random_factor = 1  # random.uniform(1.0, 1.1)
-    random_base = random.uniform(0, 50)
+    random_base = rng.uniform(0, 50, size=completion_minutes.shape)
 
     # Calculate the brownie points
     # The sigmoid scales are just hand tuned to make the graph look nice
-    brownie_points = 200 * sigmoid(completion_time_minutes / 20) + grossness - 100
+    brownie_points = 200 * sigmoid(capped_minutes / 20) + grossness - 100
     brownie_points = (brownie_points * random_factor) + random_base
 
-    logger.debug(f"  Completion time: {completion_time_minutes}")
-    logger.debug(f"  Grossness: {grossness}")
-    logger.debug(f"  Random factor: {random_factor:.2f}")
-    logger.debug(f"  Random base: {random_base:.2f}")
-    logger.debug(f"  Brownie points: {brownie_points}")
+    logger.debug(f"Calculated brownie points for {brownie_points.size} completions")
 
-    return int(brownie_points)
+    # Nothing for no time at all. Truncates towards zero, like int()
+    return np.where(completion_minutes == 0, 0, brownie_points).astype(np.int64)
+
+
+def bp_function(
+    completion_time_minutes: float,
+    grossness: float,
+    history=None,
+    rng: np.random.Generator = None,
+) -> int:
+    """Return the brownie points for a single completion. See bp_function_batch for the arguments."""
+    return int(bp_function_batch(completion_time_minutes, grossness, history, rng))
 
 
 def validate_profanity(value):
     logger.info("Validating profanity")
-    return is_profane([value])[0] == 1
+    return is_profane(value)
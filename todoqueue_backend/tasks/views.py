@@ -1,12 +1,21 @@
-from datetime import timedelta
+import json
+import math
+import time
+import uuid
 from logging import getLogger
 
+import numpy as np
 from accounts.serializers import CustomUserWithBrowniePointsSerializer
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Q
-from django.db.models.functions import Coalesce
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import (
@@ -15,11 +24,11 @@ from rest_framework.decorators import (
     permission_classes,
     authentication_classes,
 )
-from rest_framework.generics import ListAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 
 
 from .models import (
@@ -35,18 +44,161 @@ from .models import (
     ScheduledTask,
     ScheduledTaskSerializer,
     AllTasksSerializer,
+    TaskCompletionStats,
+    TaskIndex,
     UserStatisticsSerializer,
     WorkLog,
     WorkLogSerializer,
+    WorkLogItemSerializer,
+    bump_household_version,
+    create_work_logs,
+    credit_brownie_points,
     get_task_by_id,
+    get_task_list_context,
+    get_tasks_by_ids,
+    get_user_statistics,
+    rolling_brownie_points,
 )
 
-from .utils import bp_function, parse_duration
+from .batch import apply_task_operations, validate_task_operations
+from .events import get_broker, household_channel, user_channel
+from .fast_serializers import get_task_fields, project_tasks
+from .membership import get_member_ids, is_member
+from .pagination import KeysetPagination
+from .permissions import IsHouseholdMember
+from .response_cache import cached_json_response, get_metrics
+from .snapshots import get_household_tasks, get_task_list, mark_active
+from .transfer import (
+    HouseholdImportError,
+    aexport_household,
+    export_household,
+    import_household,
+)
+from .utils import bp_function_batch, parse_duration
 
 logger = getLogger(__name__)
 
+# The most work logs that can be submitted in one bulk request
+MAX_BULK_WORK_LOGS = 500
+
+# The most task operations that can be applied in one batch
+MAX_BATCH_TASK_OPERATIONS = 500
+
+# How far back user statistics look
+STATISTICS_DAYS = 30
+
+# The most candidate completions that can be scored in one request
+MAX_SCORED_COMPLETIONS = 100000
+
+
+def get_household_etag(household):
+    """An ETag for anything derived from a household's tasks, work logs and members. Staleness drifts
+    with the clock even when nothing is written, so the ETag also changes every STALENESS_ETAG_WINDOW
+    seconds."""
+    window = int(time.time() // settings.STALENESS_ETAG_WINDOW)
+    return f'"{household.id}-{household.version}-{window}"'
+
+
+def household_task_feed(request, household):
+    """Respond with a household's task list, with every type of task tagged with its type. Clients can
+    ask for just some of each task's fields with ?fields=, e.g. ?fields=id,staleness."""
+    fields = request.query_params.get("fields", None)
+    if fields is not None:
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(fields) - get_task_fields()
+        if unknown:
+            return Response(
+                {"detail": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    # Keep this household's snapshot fresh while someone's looking at it
+    mark_active(household.id)
+
+    def get_response():
+        if fields is None:
+            return cached_json_response(
+                "tasks", household, lambda: get_task_list(household)
+            )
+        return Response(project_tasks(get_task_list(household), fields))
+
+    return household_conditional_response(request, household, get_response)
+
+
+def household_task_staleness(request, household):
+    """Respond with the staleness of each of a household's tasks, and the IDs of the tasks that have
+    changed since the household version given by ?since=. This is much smaller than the task feed, so
+    clients can poll it and only fetch the feed again when something other than staleness has changed.
+    Without ?since=, every task counts as changed. Deleted tasks just stop being listed.
+    """
+    since = request.query_params.get("since", None)
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return Response(
+                {"detail": "since must be a household version."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    mark_active(household.id)
+
+    def get_response():
+        tasks = get_task_list(household)
+        if since is None:
+            changed = [task["id"] for task in tasks]
+        else:
+            changed = [
+                str(task_id)
+                for task_id in TaskIndex.objects.filter(
+                    household=household, changed_version__gt=since
+                ).values_list("id", flat=True)
+            ]
+        return Response(
+            {
+                "version": household.version,
+                "staleness": {task["id"]: task["staleness"] for task in tasks},
+                "changed": changed,
+            }
+        )
+
+    return household_conditional_response(request, household, get_response)
+
+
+def household_conditional_response(request, household, get_response):
+    """Respond with 304 Not Modified if the client already has the current version of this household's
+    data, without building the response at all. Otherwise, tag the response from get_response.
+    """
+    etag = get_household_etag(household)
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        logger.debug(f"Household {household.id} is unchanged since {etag}")
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = get_response()
+
+    response["ETag"] = etag
+    # Let browsers keep the response, but always check it's still current
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+class TaskListMixin:
+    """Precomputes per-task values for everything being serialized in a list response, so that
+    serializing a page of tasks costs a fixed number of queries rather than a few per task.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get("many", False) and args:
+            tasks = list(args[0])
+            context = kwargs.setdefault("context", self.get_serializer_context())
+            context.update(get_task_list_context(tasks))
+            args = (tasks,) + args[1:]
 
-class ScheduledTaskViewSet(viewsets.ModelViewSet):
+        return super().get_serializer(*args, **kwargs)
+
+
+class ScheduledTaskViewSet(TaskListMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = ScheduledTask.objects.all().order_by("-task_name")
     serializer_class = ScheduledTaskSerializer
@@ -64,7 +216,7 @@ class ScheduledTaskViewSet(viewsets.ModelViewSet):
 
         household = get_object_or_404(Household, id=household_id)
 
-        if user in household.users.all():
+        if is_member(user, household.id):
             return ScheduledTask.objects.filter(household=household).order_by(
                 "-task_name"
             )
@@ -73,7 +225,7 @@ class ScheduledTaskViewSet(viewsets.ModelViewSet):
             return ScheduledTask.objects.none()
 
 
-class FlexibleTaskViewSet(viewsets.ModelViewSet):
+class FlexibleTaskViewSet(TaskListMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = FlexibleTask.objects.all().order_by("-task_name")
     serializer_class = FlexibleTaskSerializer
@@ -91,7 +243,7 @@ class FlexibleTaskViewSet(viewsets.ModelViewSet):
 
         household = get_object_or_404(Household, id=household_id)
 
-        if user in household.users.all():
+        if is_member(user, household.id):
             return FlexibleTask.objects.filter(household=household).order_by(
                 "-task_name"
             )
@@ -100,7 +252,7 @@ class FlexibleTaskViewSet(viewsets.ModelViewSet):
             return FlexibleTask.objects.none()
 
 
-class OneShotTaskViewSet(viewsets.ModelViewSet):
+class OneShotTaskViewSet(TaskListMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = OneShotTask.objects.all().order_by("-task_name")
     serializer_class = OneShotTaskSerializer
@@ -117,7 +269,7 @@ class OneShotTaskViewSet(viewsets.ModelViewSet):
 
         household = get_object_or_404(Household, id=household_id)
 
-        if user in household.users.all():
+        if is_member(user, household.id):
             return OneShotTask.objects.filter(household=household).order_by(
                 "-task_name"
             )
@@ -125,10 +277,19 @@ class OneShotTaskViewSet(viewsets.ModelViewSet):
             return OneShotTask.objects.none()
 
 
-class AllTasksViewSet(viewsets.ReadOnlyModelViewSet):
+class AllTasksViewSet(TaskListMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = (IsAuthenticated,)
     serializer_class = AllTasksSerializer
 
+    def list(self, request, *args, **kwargs):
+        household_id = request.query_params.get("household", None)
+        if household_id is not None:
+            household = get_object_or_404(Household, id=household_id)
+            if is_member(request.user, household.id):
+                return household_task_feed(request, household)
+
+        return super().list(request, *args, **kwargs)
+
     def get_queryset(self):
         user = self.request.user
         household_id = self.request.query_params.get("household", None)
@@ -139,14 +300,8 @@ class AllTasksViewSet(viewsets.ReadOnlyModelViewSet):
 
         household = get_object_or_404(Household, id=household_id)
 
-        if user in household.users.all():
-            scheduled_tasks = ScheduledTask.objects.filter(household=household)
-            flexible_tasks = FlexibleTask.objects.filter(household=household)
-            # Only incomplete one-shots are listed
-            oneshot_tasks = OneShotTask.objects.filter(
-                household=household, has_completed=False
-            )
-            return list(scheduled_tasks) + list(flexible_tasks) + list(oneshot_tasks)
+        if is_member(user, household.id):
+            return get_household_tasks(household)
         else:
             # Return an empty queryset if the user does not belong to the household
             return []
@@ -231,20 +386,159 @@ class WorkLogViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = WorkLog.objects.all().order_by("-timestamp")
     serializer_class = WorkLogSerializer
+    pagination_class = KeysetPagination
 
+    def get_queryset(self):
+        """Work logs from the user's households, optionally filtered by household, user or task. Only the
+        columns the serializer needs are loaded."""
+        user = self.request.user
+        work_logs = WorkLog.objects.only(
+            "id",
+            "user_id",
+            "timestamp",
+            "grossness",
+            "completion_time",
+            "brownie_points",
+            "content_type_id",
+            "object_id",
+            "household_id",
+            "task_name",
+            "task_type",
+        )
+
+        household_id = self.request.query_params.get("household", None)
+        if household_id is not None:
+            if not is_member(user, household_id):
+                return WorkLog.objects.none()
+            work_logs = work_logs.filter(household_id=household_id)
+        else:
+            work_logs = work_logs.filter(household_id__in=user.households.values("pk"))
+
+        try:
+            user_id = self.request.query_params.get("user", None)
+            if user_id is not None:
+                work_logs = work_logs.filter(user_id=int(user_id))
+
+            task_id = self.request.query_params.get("task", None)
+            if task_id is not None:
+                work_logs = work_logs.filter(object_id=uuid.UUID(task_id))
+        except ValueError:
+            return WorkLog.objects.none()
+
+        return work_logs.order_by("-timestamp", "-id")
+
+    @action(detail=False, methods=["POST"], url_path="bulk")
+    def bulk(self, request):
+        """Log many completions at once, e.g. when a client syncs work done while it was offline. Each
+        item is checked on its own, and the response has a result for every item, in order. The valid
+        ones are all saved together. Items can give the time the task was done as a timestamp.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a list of work logs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > MAX_BULK_WORK_LOGS:
+            return Response(
+                {"detail": f"No more than {MAX_BULK_WORK_LOGS} work logs at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = WorkLogItemSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": serializer.errors,
+                }
+
+        tasks = get_tasks_by_ids(data["task_id"] for data in valid.values())
+
+        work_logs = {}
+        for index, data in valid.items():
+            task = tasks.get(data["task_id"])
+            if task is None:
+                results[index] = {
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "errors": {"task_id": ["Task with the given ID does not exist."]},
+                }
+            elif not is_member(request.user, task.household_id):
+                results[index] = {
+                    "status": status.HTTP_403_FORBIDDEN,
+                    "errors": {"detail": "Not allowed."},
+                }
+            elif data["user"] not in get_member_ids(task.household_id):
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {
+                        "user": ["User is not a member of the task's household."]
+                    },
+                }
+            else:
+                work_log = WorkLog(
+                    user_id=data["user"],
+                    content_object=task,
+                    completion_time=data["completion_time"],
+                    grossness=data["grossness"],
+                    brownie_points=data["brownie_points"],
+                )
+                if "timestamp" in data:
+                    work_log.timestamp = data["timestamp"]
+                work_logs[index] = work_log
+
+        create_work_logs(list(work_logs.values()))
+        for index, work_log in work_logs.items():
+            results[index] = {
+                "status": status.HTTP_201_CREATED,
+                "work_log": WorkLogSerializer(work_log).data,
+            }
+
+        if len(work_logs) == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif work_logs:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=response_status)
+
+
+class UserStatisticsView(APIView):
+    """Work done over the last 30 days by each user in the caller's households, or in the one given by
+    ?household="""
 
-class UserStatisticsView(ListAPIView):
     permission_classes = (IsAuthenticated,)
-    queryset = get_user_model().objects.all()
-    serializer_class = UserStatisticsSerializer
+
+    def get(self, request):
+        household_id = request.query_params.get("household", None)
+        if household_id is not None:
+            if not is_member(request.user, household_id):
+                return Response(
+                    {"detail": "You are not a member of this household."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            household_ids = [int(household_id)]
+        else:
+            household_ids = list(request.user.households.values_list("pk", flat=True))
+
+        statistics = get_user_statistics(household_ids, days=STATISTICS_DAYS)
+        return Response(UserStatisticsSerializer(statistics, many=True).data)
 
 
 class HouseholdViewSet(viewsets.ModelViewSet):
     serializer_class = HouseholdSerializer
     queryset = Household.objects.all()
-    permission_classes = (IsAuthenticated,)
+    permission_classes = (IsAuthenticated, IsHouseholdMember)
 
     def get_queryset(self):
+        if self.action != "list":
+            # Membership of a single household is checked by IsHouseholdMember
+            return Household.objects.all()
+
         # Only return households where the user is a member
         user = self.request.user
         logger.debug(f"Getting households for user: {user}")
@@ -258,47 +552,21 @@ class HouseholdViewSet(viewsets.ModelViewSet):
         household = serializer.save()
         household.users.add(self.request.user)
 
-    def update(self, request, *args, **kwargs):
-        # Only allow users who are members of the household to update it
-        instance = self.get_object()
-        if request.user not in instance.users.all():
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
-        return super().update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        # Only allow the user to delete a household if they are a member
-        instance = self.get_object()
-        if request.user not in instance.users.all():
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
-        return super().destroy(request, *args, **kwargs)
-
     @action(detail=True, methods=["GET"], url_path="users")
     def list_users(self, request, pk=None):
         """List the users that are members of this household"""
         # First, get the household object
         household = self.get_object()
 
-        # Check if the requesting user is a member of the household
-        if request.user not in household.users.all():
-            return Response(
-                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
-            )
-
-        # Date calculations
-        start_datetime = timezone.now() - timedelta(days=7)
+        return household_conditional_response(
+            request, household, lambda: self.list_users_response(household)
+        )
 
-        # Prefetch worklogs from the last 7 days and annotate the sum of brownie points
+    def list_users_response(self, household):
+        # Sum the daily rollups of brownie points from the last 7 days
         users = household.users.annotate(
-            rolling_brownie_points=Coalesce(
-                Sum(
-                    "worklog__brownie_points",
-                    filter=Q(worklog__timestamp__gte=start_datetime),
-                ),
-                0,
-            )
-        )
+            rolling_brownie_points=rolling_brownie_points(household)
+        ).prefetch_related("brownie_point_balances")
 
         # Serialize the users of the household
         user_serializer = CustomUserWithBrowniePointsSerializer(users, many=True)
@@ -311,26 +579,101 @@ class HouseholdViewSet(viewsets.ModelViewSet):
         # First, get the household object
         household = self.get_object()
 
-        # Check if the requesting user is a member of the household
-        if request.user not in household.users.all():
+        return household_task_feed(request, household)
+
+    @action(detail=True, methods=["GET"], url_path="tasks/staleness")
+    def task_staleness(self, request, pk=None):
+        """The staleness of each of the household's tasks, and which have changed since ?since="""
+        household = self.get_object()
+
+        return household_task_staleness(request, household)
+
+    @action(detail=True, methods=["POST"], url_path="tasks/batch")
+    def batch_tasks(self, request, pk=None):
+        """Create, update and delete many of the household's tasks at once. Either every operation is
+        applied, or, if any of them are invalid, none are and the errors for each are returned.
+        """
+        household = self.get_object()
+
+        operations = request.data
+        if not isinstance(operations, list):
             return Response(
-                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
+                {"detail": "Expected a list of task operations."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+        if len(operations) > MAX_BATCH_TASK_OPERATIONS:
+            return Response(
+                {
+                    "detail": f"No more than {MAX_BATCH_TASK_OPERATIONS} task operations at once."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        validated, errors = validate_task_operations(household, operations)
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = apply_task_operations(household, validated)
+
+        kept = [task for (op, _), task in zip(validated, tasks) if op != "delete"]
+        context = self.get_serializer_context()
+        context.update(get_task_list_context(kept))
+
+        results = []
+        for (op, _), task in zip(validated, tasks):
+            if op == "delete":
+                results.append({"status": status.HTTP_204_NO_CONTENT, "id": task.id})
+            else:
+                results.append(
+                    {
+                        "status": status.HTTP_201_CREATED
+                        if op == "create"
+                        else status.HTTP_200_OK,
+                        "task": AllTasksSerializer(task, context=context).data,
+                    }
+                )
+        return Response(results, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["GET"], url_path="export")
+    def export(self, request, pk=None):
+        """Download the household's tasks, work logs and members, as JSON Lines"""
+        household = self.get_object()
 
-        # Serialize the tasks of the household
-        tasks = []
+        # Each server needs its own kind of iterator to stream without holding the whole export
+        if isinstance(request._request, ASGIRequest):
+            lines = aexport_household(household)
+        else:
+            lines = export_household(household)
+
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="household-{household.id}.jsonl"'
+        return response
+
+    @action(detail=False, methods=["POST"], url_path="import")
+    def create_from_export(self, request):
+        """Create a new household from an export. The request body is the export, which is read a
+        line at a time. Only the user importing it is made a member, and only their work logs and
+        balance are kept."""
+        if request.stream is None:
+            return Response(
+                {"detail": "Expected a household export."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        flexible_task_serializer = FlexibleTaskSerializer(
-            household.flexible_tasks.all(), many=True
-        )
-        tasks.extend(flexible_task_serializer.data)
+        try:
+            household = import_household(
+                request.stream,
+                name=request.query_params.get("name"),
+                members=[request.user],
+            )
+        except HouseholdImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        scheduled_task_serializer = ScheduledTaskSerializer(
-            household.scheduled_tasks.all(), many=True
+        return Response(
+            HouseholdSerializer(household).data, status=status.HTTP_201_CREATED
         )
-        tasks.extend(scheduled_task_serializer.data)
-
-        return Response(tasks)
 
 
 class CreateHouseholdView(APIView):
@@ -445,7 +788,16 @@ class PendingInvitationsView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request):
-        invitations = Invitation.objects.filter(recipient=request.user, accepted=False)
+        # This is polled, so fetch everything that's serialized up front rather than per invitation
+        invitations = (
+            Invitation.objects.filter(recipient=request.user, accepted=False)
+            .select_related("household", "sender", "recipient")
+            .prefetch_related(
+                "household__users",
+                "sender__brownie_point_balances",
+                "recipient__brownie_point_balances",
+            )
+        )
         serializer = InvitationSerializer(invitations, many=True)
         return Response(serializer.data)
 
@@ -513,6 +865,32 @@ class RemoveUserFromHouseholdView(APIView):
         return Response("OK", 200)
 
 
+def get_task_history(user, task_id):
+    """The completion stats of a task in one of the user's households, for scoring completions of it.
+    Returns the stats, which are None if the task hasn't been done yet, and an error response, which is
+    None unless the task can't be found or the user isn't a member of its household."""
+    try:
+        household_id = (
+            TaskIndex.objects.filter(pk=task_id)
+            .values_list("household_id", flat=True)
+            .first()
+        )
+    except ValidationError:
+        return None, Response(
+            {"error": "Invalid task ID"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if household_id is None:
+        return None, Response(
+            {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
+        )
+    if not is_member(user, household_id):
+        return None, Response(
+            {"error": "Not allowed"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    return TaskCompletionStats.objects.filter(pk=task_id).first(), None
+
+
 @api_view(["POST"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
@@ -528,17 +906,14 @@ def calculate_brownie_points_view(request):
             )
 
         brownie_points = None
-        grossnesses = None
-        completion_times = None
-        try:
-            if task_id is not None:
-                # Get all the work logs associated with this task
-                work_logs = WorkLog.objects.filter(object_id=task_id)
-                grossnesses = [work_log.grossness for work_log in work_logs]
-                completion_times = [
-                    work_log.completion_time.seconds / 60 for work_log in work_logs
-                ]
+        history = None
+        if task_id is not None:
+            # The running totals of the task's work logs, rather than the logs themselves
+            history, error = get_task_history(request.user, task_id)
+            if error is not None:
+                return error
 
+        try:
             # Convert completion time to a timedelta. It's a string formatted for a DurationField ("[-]DD HH:MM:SS")
             completion_time_td = parse_duration(completion_time)
             completion_time_minutes = completion_time_td.seconds / 60
@@ -550,12 +925,78 @@ def calculate_brownie_points_view(request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        brownie_points = bp_function(
-            completion_time_minutes, grossness, grossnesses, completion_times
+        brownie_points = int(
+            bp_function_batch(completion_time_minutes, grossness, history)
         )
         return Response({"brownie_points": brownie_points}, status=status.HTTP_200_OK)
 
 
+@api_view(["POST"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def score_brownie_points_view(request):
+    """Score many candidate completions in one go, for trying out the brownie point curve.
+
+    Takes lists of completion times, in minutes, and grossnesses. They are paired up, unless grid is set,
+    in which case every combination is scored, with one row per grossness. Either can be a single value
+    instead of a list. Pass a task_id to score in the context of that task's history, and a seed to get
+    the same points every time.
+    """
+    completion_times = request.data.get("completion_times")
+    grossness = request.data.get("grossness")
+    if completion_times is None or grossness is None:
+        return Response(
+            {"error": "Missing parameters"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        completion_times = np.asarray(completion_times, dtype=np.float64)
+        grossness = np.asarray(grossness, dtype=np.float64)
+        if completion_times.ndim > 1 or grossness.ndim > 1:
+            raise ValueError("Expected a number or a list of numbers")
+        # Form data sends booleans as strings
+        grid = str(request.data.get("grid", False)).lower() in ("true", "1", "t")
+        # Work out the size of the result before building anything that big
+        if grid:
+            shape = (grossness.size, completion_times.size)
+        else:
+            shape = np.broadcast_shapes(completion_times.shape, grossness.shape)
+        seed = request.data.get("seed")
+        rng = np.random.default_rng(None if seed is None else int(seed))
+    except (TypeError, ValueError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if math.prod(shape) > MAX_SCORED_COMPLETIONS:
+        return Response(
+            {
+                "error": f"No more than {MAX_SCORED_COMPLETIONS} completions can be scored at once"
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if grid:
+        completion_times, grossness = np.meshgrid(completion_times, grossness)
+
+    history = None
+    task_id = request.data.get("task_id")
+    if task_id is not None:
+        history, error = get_task_history(request.user, task_id)
+        if error is not None:
+            return error
+
+    brownie_points = bp_function_batch(completion_times, grossness, history, rng)
+    return Response(
+        {"brownie_points": brownie_points.tolist()}, status=status.HTTP_200_OK
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminUser])
+def response_cache_metrics(request):
+    """Hits and misses of the household response cache"""
+    return Response(get_metrics())
+
+
 @api_view(["GET"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
@@ -605,15 +1046,12 @@ def award_brownie_points(request, pk):
         Household, pk=pk
     )  # It'll return 404 if the household does not exist
 
-    if user not in household.users.all():
+    if not is_member(user, household.id):
         return Response({"error": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
     try:
-        user.brownie_point_credit.setdefault(
-            str(household.id), 0
-        )  # This ensures the key exists
-        user.brownie_point_credit[str(household.id)] += brownie_points
-        user.save()
+        credit_brownie_points(user.id, household.id, brownie_points)
+        bump_household_version(household.id)
     except:
         return Response(
             {"error": "Failed to credit brownie points"},
@@ -621,3 +1059,108 @@ def award_brownie_points(request, pk):
         )
 
     return Response({"success": "Credited brownie points"}, status=status.HTTP_200_OK)
+
+
+def _event_stream_signer():
+    # The salt stops tickets being accepted as anything else that's signed
+    return signing.TimestampSigner(salt="tasks.event_stream")
+
+
+@api_view(["POST"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def event_stream_ticket(request):
+    """A ticket for opening an event stream, valid for EVENT_STREAM_TICKET_MAX_AGE seconds. EventSource
+    can't set headers, so browsers put this in the stream's URL instead of their access token, which
+    would otherwise be written to every access log between them and the server."""
+    ticket = _event_stream_signer().sign(str(request.user.pk))
+    return Response(
+        {"ticket": ticket, "expires_in": settings.EVENT_STREAM_TICKET_MAX_AGE}
+    )
+
+
+def authenticate_event_stream(request):
+    """Accepts a ticket from event_stream_ticket as the ticket query parameter, or an access token in
+    the Authorization header."""
+    ticket = request.GET.get("ticket")
+    if ticket is not None:
+        try:
+            user_id = _event_stream_signer().unsign(
+                ticket, max_age=settings.EVENT_STREAM_TICKET_MAX_AGE
+            )
+        except signing.BadSignature:
+            return None
+        return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    try:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def stream_events(channels):
+    subscription = await get_broker().subscribe(channels)
+    # Django doesn't tell a streaming response when its client goes away, so a stream nobody is reading
+    # would hold its subscription forever. Ending every stream after a while bounds how long that can
+    # last, and clients that are still there reconnect.
+    deadline = time.monotonic() + settings.EVENT_STREAM_MAX_AGE
+    try:
+        # Tell the client how long to wait before reconnecting if the stream drops
+        yield "retry: 5000\n\n"
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await subscription.get(
+                timeout=min(settings.EVENT_STREAM_HEARTBEAT, remaining)
+            )
+            if event is None:
+                # Comments keep proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        await subscription.close()
+
+
+@require_GET
+def event_stream(request):
+    """Streams change events for a household, and for the requesting user, as server-sent events. Clients
+    refetch whatever an event says has changed, instead of polling for it."""
+    # Under WSGI the stream would hold a worker for as long as the client is connected
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Event streams need an ASGI server."},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    user = authenticate_event_stream(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Not authenticated."}, status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    channels = [user_channel(user.id)]
+
+    household_id = request.GET.get("household", None)
+    if household_id is not None:
+        household = get_object_or_404(Household, id=household_id)
+        if not is_member(user, household.id):
+            return JsonResponse(
+                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
+            )
+        channels.append(household_channel(household.id))
+
+    logger.info(f"Opening event stream for {user} on channels {channels}")
+    response = StreamingHttpResponse(
+        stream_events(channels), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
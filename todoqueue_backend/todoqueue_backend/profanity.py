@@ -0,0 +1,94 @@
+"""Profanity checks, shared by every validator in the project.
+
+The classifier is only loaded the first time something needs checking, since loading it dominates worker
+startup. Verdicts are remembered in a bounded LRU keyed by a hash of the text, and serializers using
+ProfanityBatchMixin classify all of their incoming strings in one model call before any field validators
+run, so the validators themselves only ever hit the cache.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from logging import getLogger
+
+from django.conf import settings
+from rest_framework.fields import empty
+
+logger = getLogger(__name__)
+
+# predict() in profanity_check flags a text when its probability of being profane is over a half
+PROFANITY_THRESHOLD = 0.5
+
+_lock = threading.Lock()
+_scores = OrderedDict()
+_predict_prob = None
+
+
+def _get_classifier():
+    global _predict_prob
+    if _predict_prob is None:
+        logger.info("Loading profanity model")
+        from profanity_check import predict_prob
+
+        _predict_prob = predict_prob
+    return _predict_prob
+
+
+def _key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def profanity_scores(texts):
+    """Returns the probability that each of the texts is profane. Any that aren't already cached are
+    classified together, in a single model call."""
+    keys = [_key(text) for text in texts]
+
+    scores = {}
+    with _lock:
+        for key in keys:
+            if key in _scores:
+                _scores.move_to_end(key)
+                scores[key] = _scores[key]
+
+    unseen = {key: text for key, text in zip(keys, texts) if key not in scores}
+    if unseen:
+        logger.debug(f"Classifying {len(unseen)} texts for profanity")
+        probabilities = _get_classifier()(list(unseen.values()))
+        new_scores = dict(zip(unseen, (float(p) for p in probabilities)))
+        scores.update(new_scores)
+
+        with _lock:
+            _scores.update(new_scores)
+            while len(_scores) > settings.PROFANITY_CACHE_SIZE:
+                _scores.popitem(last=False)
+
+    return [scores[key] for key in keys]
+
+
+def prime(texts):
+    """Classify a batch of texts up front, so that checking any of them later is a cache lookup."""
+    texts = [text for text in texts if isinstance(text, str)]
+    if texts:
+        profanity_scores(texts)
+
+
+def is_profane(text):
+    score = profanity_scores([text])[0]
+    logger.debug(f"Profanity score for {text}: {score}")
+    return score > PROFANITY_THRESHOLD
+
+
+def clear_cache():
+    with _lock:
+        _scores.clear()
+
+
+class ProfanityBatchMixin:
+    """Serializer mixin that classifies every string in the incoming data in one go, before the field
+    validators check them one at a time."""
+
+    def run_validation(self, data=empty):
+        if isinstance(data, Mapping):
+            prime(data.values())
+        return super().run_validation(data)
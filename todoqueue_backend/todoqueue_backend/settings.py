@@ -200,6 +200,46 @@ else:
         }
     }
 
+# Change events pushed to clients. Redis pub/sub reaches subscribers in every worker, whereas the
+# in-process broker only reaches subscribers in the worker that made the change.
+if cache_engine == "redis":
+    EVENT_BROKER = {
+        "BACKEND": "tasks.events.RedisBroker",
+        "LOCATION": redis_cache_location,
+    }
+else:
+    EVENT_BROKER = {
+        "BACKEND": "tasks.events.InProcessBroker",
+    }
+
+# Seconds between keepalive messages on idle event streams
+EVENT_STREAM_HEARTBEAT = get_env_variable("EVENT_STREAM_HEARTBEAT", 15, int)
+
+# Seconds that an event stream stays open for before the client has to reconnect
+EVENT_STREAM_MAX_AGE = get_env_variable("EVENT_STREAM_MAX_AGE", 300, int)
+
+# Seconds that a ticket for opening an event stream is valid for
+EVENT_STREAM_TICKET_MAX_AGE = get_env_variable("EVENT_STREAM_TICKET_MAX_AGE", 60, int)
+
+# Seconds that a household's ETag stays valid for when nothing has changed. Staleness keeps drifting
+# with the clock, so this bounds how out of date a client's staleness values can get.
+STALENESS_ETAG_WINDOW = get_env_variable("STALENESS_ETAG_WINDOW", 10, int)
+
+# How many profanity verdicts to remember, so repeated strings skip the classifier
+PROFANITY_CACHE_SIZE = get_env_variable("PROFANITY_CACHE_SIZE", 4096, int)
+
+# Seconds to cache household member lists for. Changes are invalidated in the shared cache straight
+# away, but other workers can keep using their own copy for up to MEMBERSHIP_LOCAL_TTL seconds.
+MEMBERSHIP_CACHE_TIMEOUT = get_env_variable("MEMBERSHIP_CACHE_TIMEOUT", 3600, int)
+MEMBERSHIP_LOCAL_TTL = get_env_variable("MEMBERSHIP_LOCAL_TTL", 5, int)
+
+# Households whose tasks have been listed in the last HOUSEHOLD_ACTIVE_TIMEOUT seconds have their task
+# lists recomputed every STALENESS_SNAPSHOT_INTERVAL seconds by the run_staleness_scheduler command.
+# Snapshots older than STALENESS_SNAPSHOT_MAX_AGE seconds are recomputed on the request instead.
+HOUSEHOLD_ACTIVE_TIMEOUT = get_env_variable("HOUSEHOLD_ACTIVE_TIMEOUT", 120, int)
+STALENESS_SNAPSHOT_INTERVAL = get_env_variable("STALENESS_SNAPSHOT_INTERVAL", 5, int)
+STALENESS_SNAPSHOT_MAX_AGE = get_env_variable("STALENESS_SNAPSHOT_MAX_AGE", 10, int)
+
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 # Password validation
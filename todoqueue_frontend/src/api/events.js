@@ -0,0 +1,141 @@
+import axios from './axiosConfig';
+import { backend_url } from './backend_url';
+
+
+// How often to poll when the server can push changes to us, and when it can't
+export const PUSH_POLL_INTERVAL = 15000;
+export const FALLBACK_POLL_INTERVAL = 1000;
+
+
+// How long to wait before opening a new stream when the server closes one, e.g. because its ticket expired
+const RECONNECT_DELAY = 5000;
+
+
+// EventSource can't set headers, so the stream is opened with a short-lived ticket in its URL rather than
+// the access token. Returns null if we couldn't get one.
+const fetchEventStreamTicket = async () => {
+    try {
+        const response = await axios.post(`${backend_url}/api/events/ticket/`, {}, {
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+        if (!response || response.status !== 200) {
+            console.log("Failed to get an event stream ticket.");
+            return null;
+        }
+        return response.data.ticket;
+    } catch (error) {
+        console.error("Error getting an event stream ticket:", error);
+        return null;
+    }
+};
+
+
+// The open streams, by household (or '' for just this user), each shared by everything subscribed to it
+const streams = new Map();
+
+
+// Open a stream for a household and keep it open, with new tickets as needed, until it's closed. Every
+// event and change in connection state is passed on to the stream's current listeners.
+const openStream = (selectedHousehold) => {
+    const stream = { listeners: new Set(), connected: false };
+    let source = null;
+    let reconnectTimeout = null;
+    let closed = false;
+
+    const setConnected = (connected) => {
+        stream.connected = connected;
+        stream.listeners.forEach((listener) => listener.onConnectedChange(connected));
+    };
+
+    const handleEvent = (message) => {
+        try {
+            const event = JSON.parse(message.data);
+            console.log("Received event: ", event);
+            stream.listeners.forEach((listener) => listener.onEvent(event));
+        } catch (error) {
+            console.error("Failed to parse event:", error);
+        }
+    };
+
+    const connect = async () => {
+        const ticket = await fetchEventStreamTicket();
+        if (closed) {
+            return;
+        }
+        if (ticket === null) {
+            setConnected(false);
+            reconnectTimeout = setTimeout(connect, RECONNECT_DELAY);
+            return;
+        }
+
+        let events_url = `${backend_url}/api/events/?ticket=${encodeURIComponent(ticket)}`;
+        if (selectedHousehold) {
+            events_url += `&household=${selectedHousehold}`;
+        }
+
+        console.log("Subscribing to events...");
+        source = new EventSource(events_url);
+
+        source.onopen = () => {
+            console.log("Event stream open");
+            setConnected(true);
+        };
+        source.onerror = () => {
+            console.log("Event stream dropped");
+            setConnected(false);
+            // The server ends streams after a while, and the browser retries by itself with the same URL,
+            // which stops working once the ticket expires. When it gives up, start again with a new ticket.
+            if (source.readyState === EventSource.CLOSED) {
+                reconnectTimeout = setTimeout(connect, RECONNECT_DELAY);
+            }
+        };
+
+        ['task', 'worklog', 'invitation'].forEach(
+            (eventType) => source.addEventListener(eventType, handleEvent)
+        );
+    };
+
+    stream.close = () => {
+        closed = true;
+        clearTimeout(reconnectTimeout);
+        if (source !== null) {
+            source.close();
+        }
+    };
+
+    connect();
+    return stream;
+};
+
+
+// Subscribe to the server's change events for a household (or just this user, if no household is given).
+// onEvent is called with each event, and onConnectedChange with whether the stream is currently open.
+// Everything subscribed to the same household shares one stream. Returns a function that unsubscribes,
+// closing the stream once nothing else is using it.
+export const subscribeToEvents = (selectedHousehold, onEvent, onConnectedChange = () => { }) => {
+    if (localStorage.getItem('access_token') === null || typeof EventSource === 'undefined') {
+        onConnectedChange(false);
+        return () => { };
+    }
+
+    const key = selectedHousehold || '';
+    let stream = streams.get(key);
+    if (stream === undefined) {
+        stream = openStream(selectedHousehold);
+        streams.set(key, stream);
+    }
+    const listener = { onEvent, onConnectedChange };
+    stream.listeners.add(listener);
+    onConnectedChange(stream.connected);
+
+    return () => {
+        stream.listeners.delete(listener);
+        if (stream.listeners.size === 0) {
+            stream.close();
+            streams.delete(key);
+        }
+        onConnectedChange(false);
+    };
+};
@@ -1,10 +1,12 @@
 // Importing API functions from individual resource files
+import * as eventsAPI from './events';
 import * as householdsAPI from './households';
 import * as tasksAPI from './tasks';
 import * as usersAPI from './users';
 
 // Exporting all the API functions
 export {
+  eventsAPI,
   householdsAPI,
   tasksAPI,
   usersAPI
@@ -42,6 +42,35 @@ export const fetchTasks = async (selectedHousehold) => {
 };
 
 
+// Get the staleness of each task in this household, and which tasks have changed since the household
+// version we last saw. Much smaller than the full task list, so it can be polled often. Returns null if
+// it couldn't be fetched.
+export const fetchTaskStaleness = async (selectedHousehold, since) => {
+    let staleness_url = `${backend_url}/api/households/${selectedHousehold}/tasks/staleness/`;
+    if (since !== null && since !== undefined) {
+        staleness_url += `?since=${since}`;
+    }
+
+    try {
+        const response = await axios.get(staleness_url, {
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+
+        if (response.status !== 200 || !response.data) {
+            console.log("Failed to fetch task staleness.");
+            return null;
+        }
+        return response.data;
+
+    } catch (error) {
+        console.error("Error fetching task staleness:", error);
+        return null;
+    }
+};
+
+
 // Get information about a specific task
 export const fetchSelectedTask = async (selectedTaskId, selectedHousehold) => {
     const list_tasks_url = `${backend_url}/api/all-tasks/${selectedTaskId}/?household=${selectedHousehold}`;
@@ -100,6 +129,32 @@ export const fetchBrowniePointValue = async (
 }
 
 
+// Submit a batch of worklogs in one request. Returns true if every one of them was created.
+const postWorkLogs = async (worklogs) => {
+    console.log("Creating worklogs: ", worklogs);
+
+    try {
+        const response = await axios.post(
+            `${backend_url}/api/worklogs/bulk/`,
+            JSON.stringify(worklogs),
+            {
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+            });
+        if (response.status !== 201) {
+            console.log("Failed to create some worklogs: ", response.data);
+            return false;
+        }
+        console.log('WorkLogs created: ', response.data);
+        return true;
+    } catch (error) {
+        console.error('Error: ', error);
+        return false;
+    }
+};
+
+
 export const createWorkLog = async (
     selectedHousehold,
     selectedTaskId,
@@ -119,36 +174,16 @@ export const createWorkLog = async (
         grossness,
     );
 
-    // pop each user off the list of completionUsers and create a worklog for each
-    for (const completionUser of completionUsers) {
-        const worklog = {
-            task_id: selectedTaskId,
-            user: completionUser,
-            completion_time: completionTimeString,
-            grossness,
-            brownie_points
-        };
-
-        console.log("Creating worklog: ", worklog);
-
-        // Make a POST request to create a new WorkLog entry
-        try {
-            const response = await axios.post(
-                `${backend_url}/api/worklogs/`,
-                JSON.stringify(worklog),
-                {
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                });
-            if (response.status !== 201) {
-                console.log("Failed to create worklog.");
-                return;
-            }
-            console.log('WorkLog created: ', response.data);
-        } catch (error) {
-            console.error('Error: ', error);
-        }
+    // Create a worklog for each of the completionUsers, all in one request
+    const worklogs = completionUsers.map((completionUser) => ({
+        task_id: selectedTaskId,
+        user: completionUser,
+        completion_time: completionTimeString,
+        grossness,
+        brownie_points
+    }));
+    if (!await postWorkLogs(worklogs)) {
+        return;
     }
 
     // Clear the list of completionUsers and close the popup
@@ -178,36 +213,16 @@ export const awardBrowniePoints = async (
         return error.response ? error.response.data : error.message;
     }
 
-    // pop each user off the list of completionUsers and create a worklog for each
-    for (const completionUser of completionUsers) {
-        const worklog = {
-            task_id,
-            user: completionUser,
-            completion_time: "0:00:00",
-            grossness: 0,
-            brownie_points: browniePoints,
-        };
-
-        console.log("Creating dummy worklog: ", worklog);
-
-        // Make a POST request to create a new WorkLog entry
-        try {
-            const response = await axios.post(
-                `${backend_url}/api/worklogs/`,
-                JSON.stringify(worklog),
-                {
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                });
-            if (response.status !== 201) {
-                console.log("Failed to create dummy worklog.");
-                return;
-            }
-            console.log('Dummy workLog created: ', response.data);
-        } catch (error) {
-            console.error('Error: ', error);
-        }
+    // Create a dummy worklog for each of the completionUsers, all in one request
+    const worklogs = completionUsers.map((completionUser) => ({
+        task_id,
+        user: completionUser,
+        completion_time: "0:00:00",
+        grossness: 0,
+        brownie_points: browniePoints,
+    }));
+    if (!await postWorkLogs(worklogs)) {
+        return;
     }
 
     // Clear the list of completionUsers and close the popup
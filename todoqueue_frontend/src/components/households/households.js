@@ -4,6 +4,7 @@ import useAuthCheck from '../../hooks/authCheck';
 import AlertMessage from "../popups/AlertPopup";
 
 import { createHousehold, fetchPendingInvitations, acceptInvitation, declineInvitation } from '../../api/households';
+import { subscribeToEvents } from '../../api/events';
 import HouseholdDetailsPopup from "../popups/HouseholdDetailsPopup";
 
 import './households.css';
@@ -12,6 +13,7 @@ import '../../utils/inputs.css';
 export const ManageHouseholds = ({ households, updateHouseholds, setShowHouseholdSelector }) => {
     const [selectedHousehold, setSelectedHousehold] = useState("");
     const [invitations, setInvitations] = useState([]);
+    const [pushConnected, setPushConnected] = useState(false);
 
     const [name, setName] = useState("");
 
@@ -30,7 +32,26 @@ export const ManageHouseholds = ({ households, updateHouseholds, setShowHousehol
 
     useEffect(() => {
         setShowHouseholdSelector(false);
+
+        // Invitations are sent to us directly, so there's no household to subscribe to
+        return subscribeToEvents(
+            null,
+            (event) => {
+                if (event.type === "invitation") {
+                    loadPendingInvitations();
+                }
+            },
+            setPushConnected,
+        );
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, []);
+
+    // Only poll for invitations if they can't be pushed to us
+    useEffect(() => {
         loadPendingInvitations();
+        if (pushConnected) {
+            return;
+        }
 
         const invitationCheckInterval = setInterval(() => {
             loadPendingInvitations();
@@ -39,7 +60,7 @@ export const ManageHouseholds = ({ households, updateHouseholds, setShowHousehol
         // Clear the interval when the component unmounts
         return () => clearInterval(invitationCheckInterval);
         // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, []);
+    }, [pushConnected]);
 
 
     const loadPendingInvitations = async () => {
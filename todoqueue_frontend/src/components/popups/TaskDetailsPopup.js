@@ -1,11 +1,13 @@
-import React, { useEffect, useRef } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import BasePopup from './BasePopup';
 import { formatDuration, getTimeSince } from '../../utils';
 import { deleteTask, freezeTask, dismissTask, fetchSelectedTask } from '../../api/tasks';
+import { subscribeToEvents, PUSH_POLL_INTERVAL, FALLBACK_POLL_INTERVAL } from '../../api/events';
 import './popups.css';
 
 const TaskDetailsPopup = React.forwardRef((props, ref) => {
     const updateSelectedTaskTimer = useRef(null);
+    const [pushConnected, setPushConnected] = useState(false);
     const innerClass = props.selectedTask && props.selectedTask.frozen ? 'frozen' : '';
 
 
@@ -14,6 +16,20 @@ const TaskDetailsPopup = React.forwardRef((props, ref) => {
         props.setSelectedTask(data);
     };
 
+    // Refetch the selected task as soon as the server says it changed
+    useEffect(() => {
+        return subscribeToEvents(
+            props.selectedHousehold,
+            (event) => {
+                if (event.id === props.selectedTaskId || event.task === props.selectedTaskId) {
+                    fetchSetSelectedTask();
+                }
+            },
+            setPushConnected,
+        );
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [props.selectedTaskId, props.selectedHousehold]);
+
     // Fetch selected task at regular intervals
     useEffect(() => {
 
@@ -23,7 +39,10 @@ const TaskDetailsPopup = React.forwardRef((props, ref) => {
         }
 
         fetchSetSelectedTask();
-        updateSelectedTaskTimer.current = setInterval(fetchSetSelectedTask, 1000);
+        updateSelectedTaskTimer.current = setInterval(
+            fetchSetSelectedTask,
+            pushConnected ? PUSH_POLL_INTERVAL : FALLBACK_POLL_INTERVAL
+        );
 
 
         return () => {
@@ -32,7 +51,7 @@ const TaskDetailsPopup = React.forwardRef((props, ref) => {
             }
         };
         // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [props.selectedTaskId]);
+    }, [props.selectedTaskId, pushConnected]);
 
     const handleDeleteTask = async (taskId) => {
         const succeeded = await deleteTask(taskId, props.selectedHousehold);
@@ -16,7 +16,8 @@ import EditScheduledTaskPopup from '../popups/EditScheduledTaskPopup';
 import CreateOneShotTaskPopup from '../popups/CreateOneShotTaskPopup';
 // import EditOneShotTaskPopup from '../popups/EditOneShotTask';
 
-import { fetchTasks } from '../../api/tasks';
+import { subscribeToEvents, PUSH_POLL_INTERVAL, FALLBACK_POLL_INTERVAL } from '../../api/events';
+import { fetchTasks, fetchTaskStaleness } from '../../api/tasks';
 import { fetchHouseholdUsers } from '../../api/users';
 
 
@@ -33,10 +34,13 @@ const Tasks = ({ households, selectedHousehold, setSelectedHousehold, showSelect
     const [showSidebar, setShowSidebar] = useState(false);
 
     const isInitialRender = useRef(true);
+    // The tasks we last fetched in full, and the household version they're from
+    const knownTasks = useRef({ household: null, version: null, tasks: [] });
     const [browniePoints, setBrowniePoints] = useState(0);
     const [showFlipAnimation, setShowFlipAnimation] = useState(false);
     const [viewMode, setViewMode] = useState('total');  // Toggle scoreboard between 'total' or 'rolling'
     const [windowWidth, setWindowWidth] = useState(window.innerWidth);
+    const [pushConnected, setPushConnected] = useState(false);
 
     // Define an enumeration for the popups
     const PopupType = {
@@ -91,8 +95,25 @@ const Tasks = ({ households, selectedHousehold, setSelectedHousehold, showSelect
     }, [showSelectedHouseholdSelector]);
 
 
-    // Fetch tasks, and users at regular intervals
-    // TODO: Is it wise to make these requests so often? Can it be offloaded to the client?
+    // Refetch tasks and users whenever the server tells us something in the household changed
+    useEffect(() => {
+        if (!selectedHousehold) {
+            return;
+        }
+        return subscribeToEvents(
+            selectedHousehold,
+            () => {
+                fetchSetTasks();
+                fetchSetUsers();
+            },
+            setPushConnected,
+        );
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [selectedHousehold]);
+
+
+    // Fetch tasks, and users at regular intervals. Staleness drifts with time, so this is still needed
+    // when changes are pushed to us, just much less often.
     useEffect(() => {
         try {
             fetchSetTasks();
@@ -103,10 +124,10 @@ const Tasks = ({ households, selectedHousehold, setSelectedHousehold, showSelect
         const interval = setInterval(() => {
             fetchSetTasks();
             fetchSetUsers();
-        }, 1000);
+        }, pushConnected ? PUSH_POLL_INTERVAL : FALLBACK_POLL_INTERVAL);
         return () => clearInterval(interval);
         // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [showSidebar, selectedHousehold]);
+    }, [showSidebar, selectedHousehold, pushConnected]);
 
 
     // If the selectedHousehold is null, hide the sidebar
@@ -168,8 +189,31 @@ const Tasks = ({ households, selectedHousehold, setSelectedHousehold, showSelect
             return;
         }
 
-        console.log("Fetching Tasks...");
-        setTasks(await fetchTasks(selectedHousehold));
+        // Only fetch the full task list if something other than staleness has changed since we last did
+        const known = knownTasks.current;
+        const since = known.household === selectedHousehold ? known.version : null;
+        const delta = await fetchTaskStaleness(selectedHousehold, since);
+        if (
+            delta === null
+            || since === null
+            || delta.changed.length > 0
+            || Object.keys(delta.staleness).length !== known.tasks.length
+            || known.tasks.some((task) => !(task.id in delta.staleness))
+        ) {
+            console.log("Fetching Tasks...");
+            const data = await fetchTasks(selectedHousehold);
+            knownTasks.current = {
+                household: selectedHousehold,
+                version: delta === null ? null : delta.version,
+                tasks: data,
+            };
+            setTasks(data);
+            return;
+        }
+
+        const data = known.tasks.map((task) => ({ ...task, staleness: delta.staleness[task.id] }));
+        knownTasks.current = { household: selectedHousehold, version: delta.version, tasks: data };
+        setTasks(data);
     };
 
 